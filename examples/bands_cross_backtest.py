@@ -6,8 +6,10 @@ from pandas import DataFrame, to_datetime
 
 from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
+from qstrader.strategy.window import SignalWindow
 from qstrader.event import SignalEvent, EventType
 from qstrader.compat import queue
+from qstrader.event_queue import EventDeque
 from qstrader.trading_session import TradingSession
 from strategy.tecnical.tecnical_strategy import TecnicalAnalysisStrategy
 
@@ -39,8 +41,8 @@ class MovingAverageCrossStrategy(AbstractStrategy):
         self.lw_bars = deque(maxlen=self.long_window)
         self.prices = DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume'])
         self.strategy = TecnicalAnalysisStrategy()
-        self.entry_time = None
-        self.signals = DataFrame()
+        self.signals = SignalWindow(size=2, max_field='trailing_stop')
+        self.went_up = 0
 
     def calculate_signals(self, event):
         if (
@@ -48,14 +50,18 @@ class MovingAverageCrossStrategy(AbstractStrategy):
                 event.ticker == self.ticker
         ):
             exit_position = False
-            signal = event.signal[event.signal['symbol'] == event.ticker]
-            self.signals = self.signals.append(signal)
+            signal = event.signal
+            if signal is None:
+                return
+            self.signals.append(signal)
 
             if self.invested:
+                if signal['close'] > signal['bb_middleband']:
+                    self.went_up += 1
                 # exit_position = self.expired_not_profit()
-                if not exit_position and len(self.signals) > 2:
-                    two_ago = self.signals.iloc[-2]
-                    one_ago = self.signals.iloc[-1]
+                if not exit_position and self.signals.count > 2:
+                    two_ago = self.signals[-2]
+                    one_ago = self.signals[-1]
 
                     exit_position = (
                             (one_ago['sma'] < one_ago['bb_middleband']) and
@@ -65,17 +71,18 @@ class MovingAverageCrossStrategy(AbstractStrategy):
                     if exit_position:
                         print('SMA exit')
                 if not exit_position:
-                    entry = self.signals.loc[self.signals['date'] >= self.entry_time]
+                    trailing_stop = self.signals.entry_max
                     # if entry['close'][0] < signal['trailing_stop'][0] and signal['adx'][0] > 10:
-                    if signal['close'][0] < entry['trailing_stop'].max() and signal['adx'][0] > 10:
+                    if signal['close'] < trailing_stop and signal['adx'] > 10:
                         exit_position = True
-                        print('Trailing exit - ' + str(signal['adx'][0]))
+                        print('Trailing exit - ' + str(signal['adx']))
 
 
             # Trading signals based on moving average cross
-            if signal['buy'][0] == 1 and not self.invested:
+            if signal['buy'] == 1 and not self.invested:
                 print("LONG %s: %s" % (self.ticker, event.time))
-                self.entry_time = signal['date'][0]
+                self.signals.enter()
+                self.went_up = 0
                 signal_event = SignalEvent(
                     self.ticker,
                     "BOT",
@@ -84,7 +91,7 @@ class MovingAverageCrossStrategy(AbstractStrategy):
                 self.events_queue.put(signal_event)
                 self.invested = True
 
-            elif (signal['sell'][0] == 1 or exit_position) and self.invested:
+            elif (signal['sell'] == 1 or exit_position) and self.invested:
                 print("SHORT %s: %s" % (self.ticker, event.time))
                 signal_event = SignalEvent(
                     self.ticker,
@@ -93,18 +100,19 @@ class MovingAverageCrossStrategy(AbstractStrategy):
                 )
                 self.events_queue.put(signal_event)
                 self.invested = False
+                self.signals.exit()
 
     def expired_not_profit(self):
-        past = self.signals[self.signals['date'] > self.entry_time]
-        if not past.empty:
-            went_up = past[past['close'] > past['bb_middleband']]
-            if len(went_up) < 1 and len(past) > 25:
-                exit_position = True
-                print('Exit position')
+        # Bars since the entry, and those closing above the middle band
+        past = self.signals.entry_bars - 1
+        exit_position = False
+        if self.went_up < 1 and past > 25:
+            exit_position = True
+            print('Exit position')
         return exit_position
 
 
-def run(config, testing, tickers, filename):
+def run(config, testing, tickers, filename, batched=False):
     # Backtest information
     title = ['BB strategy']
     initial_equity = 10000.0
@@ -112,7 +120,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2014, 1, 1)
 
     # Use the MAC Strategy
-    events_queue = queue.Queue()
+    events_queue = EventDeque() if batched else queue.Queue()
     strategy = MovingAverageCrossStrategy(
         tickers[0], events_queue,
         short_window=100,
@@ -124,7 +132,7 @@ def run(config, testing, tickers, filename):
         config, strategy, tickers,
         initial_equity, start_date, end_date,
         events_queue, title=title,
-        benchmark=tickers[0],
+        benchmark=tickers[0], batched=batched
     )
     results = backtest.start_trading(testing=testing)
     return results
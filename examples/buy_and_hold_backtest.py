@@ -6,6 +6,7 @@ from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
 from qstrader.compat import queue
+from qstrader.event_queue import EventDeque
 from qstrader.trading_session import TradingSession
 
 class BuyAndHoldStrategy(AbstractStrategy):
@@ -39,7 +40,7 @@ class BuyAndHoldStrategy(AbstractStrategy):
             self.bars += 1
 
 
-def run(config, testing, tickers, filename):
+def run(config, testing, tickers, filename, batched=False):
     # Backtest information
     title = ['Buy and Hold Example on %s' % tickers[0]]
     initial_equity = 10000.0
@@ -47,14 +48,14 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2014, 1, 1)
 
     # Use the Buy and Hold Strategy
-    events_queue = queue.Queue()
+    events_queue = EventDeque() if batched else queue.Queue()
     strategy = BuyAndHoldStrategy(tickers[0], events_queue)
 
     # Set up the backtest
     backtest = TradingSession(
         config, strategy, tickers,
         initial_equity, start_date, end_date,
-        events_queue, title=title
+        events_queue, title=title, batched=batched
     )
     results = backtest.start_trading(testing=testing)
     return results
@@ -6,6 +6,7 @@ from qstrader.strategy.base import AbstractStrategy
 from qstrader.position_sizer.rebalance import LiquidateRebalancePositionSizer
 from qstrader.event import SignalEvent, EventType
 from qstrader.compat import queue
+from qstrader.event_queue import EventDeque
 from qstrader.trading_session import TradingSession
 
 
@@ -61,7 +62,7 @@ class MonthlyLiquidateRebalanceStrategy(AbstractStrategy):
             self.tickers_invested[ticker] = True
 
 
-def run(config, testing, tickers, filename):
+def run(config, testing, tickers, filename, batched=False):
     # Backtest information
     title = [
         'Monthly Liquidate/Rebalance on 60%/40% SPY/AGG Portfolio'
@@ -71,7 +72,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2016, 10, 12)
 
     # Use the Monthly Liquidate And Rebalance strategy
-    events_queue = queue.Queue()
+    events_queue = EventDeque() if batched else queue.Queue()
     strategy = MonthlyLiquidateRebalanceStrategy(
         tickers, events_queue
     )
@@ -91,7 +92,7 @@ def run(config, testing, tickers, filename):
         config, strategy, tickers,
         initial_equity, start_date, end_date,
         events_queue, position_sizer=position_sizer,
-        title=title, benchmark=tickers[0],
+        title=title, benchmark=tickers[0], batched=batched
     )
     results = backtest.start_trading(testing=testing)
     return results
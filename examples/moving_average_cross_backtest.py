@@ -7,6 +7,7 @@ from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
 from qstrader.compat import queue
+from qstrader.event_queue import EventDeque
 from qstrader.trading_session import TradingSession
 
 
@@ -71,7 +72,7 @@ class MovingAverageCrossStrategy(AbstractStrategy):
             self.bars += 1
 
 
-def run(config, testing, tickers, filename):
+def run(config, testing, tickers, filename, batched=False):
     # Backtest information
     title = ['Moving Average Crossover Example on AAPL: 100x300']
     initial_equity = 10000.0
@@ -79,7 +80,7 @@ def run(config, testing, tickers, filename):
     end_date = datetime.datetime(2014, 1, 1)
 
     # Use the MAC Strategy
-    events_queue = queue.Queue()
+    events_queue = EventDeque() if batched else queue.Queue()
     strategy = MovingAverageCrossStrategy(
         tickers[0], events_queue,
         short_window=100,
@@ -91,7 +92,7 @@ def run(config, testing, tickers, filename):
         config, strategy, tickers,
         initial_equity, start_date, end_date,
         events_queue, title=title,
-        benchmark=tickers[1],
+        benchmark=tickers[1], batched=batched
     )
     results = backtest.start_trading(testing=testing)
     return results
@@ -0,0 +1,49 @@
+import datetime
+
+from qstrader import settings
+from qstrader.sweep import ParameterSweep
+
+from examples.moving_average_cross_backtest import MovingAverageCrossStrategy
+
+
+def mac_strategy(tickers, events_queue, short_window, long_window):
+    return MovingAverageCrossStrategy(
+        tickers[0], events_queue,
+        short_window=short_window,
+        long_window=long_window
+    )
+
+
+def run(config, testing, tickers, filename, max_workers=None):
+    # Backtest information
+    title = ['Moving Average Crossover Sweep on AAPL']
+    initial_equity = 10000.0
+    start_date = datetime.datetime(2000, 1, 1)
+    end_date = datetime.datetime(2014, 1, 1)
+
+    # Sweep the short and long windows of the MAC Strategy
+    sweep = ParameterSweep(
+        config, mac_strategy, tickers,
+        initial_equity, start_date, end_date,
+        title=title, benchmark=tickers[1]
+    )
+    results = sweep.run({
+        "short_window": [50, 100, 150],
+        "long_window": [200, 300, 400]
+    }, max_workers=max_workers)
+    if not testing:
+        print(results.sort_values("sharpe", ascending=False))
+    if filename is not None:
+        results.to_pickle(filename)
+    return results
+
+
+if __name__ == "__main__":
+    # Configuration data
+    testing = False
+    config = settings.from_file(
+        settings.DEFAULT_CONFIG_FILENAME, testing
+    )
+    tickers = ["AAPL", "SPY"]
+    filename = None
+    run(config, testing, tickers, filename)
@@ -6,13 +6,19 @@ One example can be test individually using:
 $ nosetests -s -v examples/test_examples.py:TestExamples.test_strategy_backtest
 
 """
+import datetime
 import os
 import unittest
 
 from qstrader import settings
+from qstrader.compat import queue
+from qstrader.event_queue import EventDeque
+from qstrader.trading_session import TradingSession
 import examples.buy_and_hold_backtest
 import examples.moving_average_cross_backtest
+import examples.moving_average_cross_sweep
 import examples.monthly_liquidate_rebalance_backtest
+import examples.vectorized_cross_check
 
 
 class TestExamples(unittest.TestCase):
@@ -81,6 +87,97 @@ class TestExamples(unittest.TestCase):
             float(results['sharpe']), 0.2710491397280638
         )
 
+    def test_batched_dispatch(self):
+        """
+        Test the batched dispatcher gives identical results
+        to the queue.Queue session loop on every example
+        """
+        for (example, tickers) in [
+            (examples.buy_and_hold_backtest, ["SPY"]),
+            (examples.moving_average_cross_backtest, ["AAPL", "SPY"]),
+            (examples.monthly_liquidate_rebalance_backtest, ["SPY", "AGG"]),
+        ]:
+            expected = example.run(
+                self.config, self.testing, tickers, None
+            )
+            results = example.run(
+                self.config, self.testing, tickers, None, batched=True
+            )
+            for key in [
+                'sharpe', 'max_drawdown_pct', 'max_drawdown_duration'
+            ]:
+                self.assertEqual(expected[key], results[key])
+            self.assertTrue(expected['equity'].equals(results['equity']))
+
+    def test_moving_average_cross_sweep(self):
+        """
+        Test the parameter sweep matches the standalone
+        backtest, whether run in workers or in process
+        """
+        tickers = ["AAPL", "SPY"]
+        expected = examples.moving_average_cross_backtest.run(
+            self.config, self.testing, tickers, None
+        )
+        results = examples.moving_average_cross_sweep.run(
+            self.config, self.testing, tickers, None, max_workers=2
+        )
+        serial = examples.moving_average_cross_sweep.run(
+            self.config, self.testing, tickers, None, max_workers=1
+        )
+        self.assertEqual(len(results), 9)
+        self.assertTrue(results.equals(serial))
+        row = results[
+            (results["short_window"] == 100) &
+            (results["long_window"] == 300)
+        ].iloc[0]
+        self.assertEqual(row["sharpe"], expected["sharpe"])
+        self.assertEqual(row["max_drawdown"], expected["max_drawdown_pct"])
+
+    def test_vectorized_cross_check(self):
+        """
+        Test the vectorized backtest gives the same equity
+        curve and trades as the event driven backtest
+        """
+        results = examples.vectorized_cross_check.run(
+            self.config, self.testing, ["AAPL", "SPY"], None
+        )
+        self.assertEqual(len(results), 3)
+        for _, row in results.iterrows():
+            self.assertEqual(row["max_equity_diff"], 0.0)
+            self.assertTrue(row["same_dates"])
+            self.assertTrue(row["same_trades"])
+            self.assertTrue(row["same_benchmark"])
+            self.assertEqual(row["sharpe"], row["sharpe_vectorized"])
+        self.assertTrue((results["trades"] > 0).sum() >= 2)
+
+    def test_sample_every(self):
+        """
+        Test sampling the statistics once per timestamp, or once
+        per week, records the same equity as sampling every bar
+        """
+        def run(sample_every, batched):
+            events_queue = EventDeque() if batched else queue.Queue()
+            strategy = examples.moving_average_cross_backtest.\
+                MovingAverageCrossStrategy("AAPL", events_queue)
+            backtest = TradingSession(
+                self.config, strategy, ["AAPL", "SPY"], 10000.0,
+                datetime.datetime(2000, 1, 1), datetime.datetime(2014, 1, 1),
+                events_queue, title=["Sampling"], benchmark="SPY",
+                batched=batched, sample_every=sample_every
+            )
+            return backtest.start_trading(testing=self.testing)
+
+        expected = run("bar", False)
+        for batched in [False, True]:
+            results = run("timestamp", batched)
+            self.assertEqual(expected['sharpe'], results['sharpe'])
+            self.assertTrue(expected['equity'].equals(results['equity']))
+            results = run(datetime.timedelta(days=7), batched)
+            self.assertTrue(len(results['equity']) < len(expected['equity']))
+            self.assertTrue(expected['equity'].reindex(
+                results['equity'].index
+            ).equals(results['equity']))
+
 
 if __name__ == "__main__":
     unittest.main()
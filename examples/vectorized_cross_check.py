@@ -0,0 +1,229 @@
+import contextlib
+import datetime
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from qstrader import settings
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.event import SignalEvent, EventType
+from qstrader.event_queue import EventDeque
+from qstrader.price_handler.iterator.replay import slice_dates
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.trading_session import TradingSession
+from qstrader.vectorized import VectorizedBacktest
+
+from examples.buy_and_hold_backtest import BuyAndHoldStrategy
+from examples.moving_average_cross_backtest import MovingAverageCrossStrategy
+
+
+class SignalFrameStrategy(AbstractStrategy):
+    """
+    Trades the "buy" and "sell" signals of a signals DataFrame,
+    as VectorizedBacktest does, entering a position on a buy
+    signal when there is none and closing it on a sell signal.
+    """
+    def __init__(self, signals, events_queue, base_quantity=100):
+        self.events_queue = events_queue
+        self.base_quantity = base_quantity
+        self.signals = dict(
+            ((date, symbol), (buy, sell)) for date, symbol, buy, sell in zip(
+                signals["date"], signals["symbol"],
+                signals["buy"] == 1, signals["sell"] == 1
+            )
+        )
+        self.invested = set()
+
+    def calculate_signals(self, event):
+        if event.type != EventType.BAR:
+            return
+        buy, sell = self.signals.get((event.time, event.ticker), (0, 0))
+        if buy and event.ticker not in self.invested:
+            self.events_queue.put(SignalEvent(
+                event.ticker, "BOT", suggested_quantity=self.base_quantity
+            ))
+            self.invested.add(event.ticker)
+        elif sell and event.ticker in self.invested:
+            self.events_queue.put(SignalEvent(
+                event.ticker, "SLD", suggested_quantity=self.base_quantity
+            ))
+            self.invested.discard(event.ticker)
+
+
+def bars_frame(price_handler, start_date, end_date):
+    """
+    Returns the bars streamed by the price handler as a
+    signals DataFrame, with no signals, and integer prices.
+    """
+    frames = []
+    for ticker in sorted(price_handler.tickers_columns):
+        bars = slice_dates(
+            price_handler.tickers_columns[ticker], start_date, end_date
+        )
+        valid = bars.valid
+        frames.append(pd.DataFrame({
+            "date": bars.index[valid],
+            "symbol": ticker,
+            "close": bars.close_price[valid],
+            "adj_close": bars.adj_close_price[valid],
+            "buy": 0,
+            "sell": 0,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def buy_and_hold_signals(bars, ticker):
+    """
+    The signals of BuyAndHoldStrategy, buying on the first bar.
+    """
+    signals = bars.copy()
+    first = np.flatnonzero(signals["symbol"] == ticker)[0]
+    signals.loc[first, "buy"] = 1
+    return signals
+
+
+def moving_average_cross_signals(bars, ticker, short_window=100, long_window=300):
+    """
+    The signals of MovingAverageCrossStrategy, from the moving
+    averages of the adjusted close, computed from exact sums
+    so that they compare as the strategy's np.mean do.
+    """
+    signals = bars.copy()
+    rows = np.flatnonzero(signals["symbol"] == ticker)
+    adj_close = signals["adj_close"].values[rows]
+    sums = np.concatenate(([0], np.cumsum(adj_close)))
+    i = np.arange(len(rows))
+    short_sma = (
+        sums[i + 1] - sums[np.maximum(i + 1 - short_window, 0)]
+    ) / float(short_window)
+    long_sma = (
+        sums[i + 1] - sums[np.maximum(i + 1 - long_window, 0)]
+    ) / float(long_window)
+    ready = i > long_window
+    signals.loc[rows, "buy"] = (ready & (short_sma > long_sma)).astype(int)
+    signals.loc[rows, "sell"] = (ready & (short_sma < long_sma)).astype(int)
+    return signals
+
+
+def tecnical_signals(bars, price_handler, ticker):
+    """
+    The buy and sell signals calculated by the price handler
+    (see TecnicalAnalysisStrategy) for ticker.
+    """
+    tecnical = price_handler.signals.reset_index(drop=True)
+    tecnical = tecnical[tecnical["symbol"] == ticker]
+    signals = bars.drop(columns=["buy", "sell"]).merge(
+        tecnical[["date", "symbol", "buy", "sell"]],
+        on=["date", "symbol"], how="left"
+    )
+    signals[["buy", "sell"]] = signals[["buy", "sell"]].fillna(0)
+    return signals
+
+
+def run_session(config, price_handler, strategy, events_queue, tickers, benchmark):
+    """
+    Runs the event driven backtest of strategy, silently.
+    """
+    session = TradingSession(
+        config, strategy, tickers, 10000.0,
+        price_handler.start_date, price_handler.end_date,
+        events_queue, price_handler=price_handler.clone(events_queue),
+        title=["Cross check"], benchmark=benchmark, batched=True
+    )
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            return session.start_trading(testing=True)
+
+
+def compare(name, events, vectorized, t_events, t_vectorized):
+    """
+    Returns a row comparing the results of both backtests.
+    """
+    positions = [
+        r.get("positions", pd.DataFrame()) for r in (events, vectorized)
+    ]
+    return {
+        "strategy": name,
+        "sharpe": events["sharpe"],
+        "sharpe_vectorized": vectorized["sharpe"],
+        "max_drawdown": events["max_drawdown"],
+        "max_drawdown_vectorized": vectorized["max_drawdown"],
+        "trades": len(positions[0]),
+        "trades_vectorized": len(positions[1]),
+        "same_trades": positions[0].equals(positions[1]),
+        "max_equity_diff": np.abs(
+            events["equity"].values - vectorized["equity"].values
+        ).max(),
+        "same_dates": events["equity"].index.equals(
+            vectorized["equity"].index
+        ),
+        "same_benchmark": events["equity_b"].equals(vectorized["equity_b"]),
+        "time": t_events,
+        "time_vectorized": t_vectorized,
+    }
+
+
+def run(config, testing, tickers, filename):
+    """
+    Runs the example strategies both through the event driven
+    TradingSession and the VectorizedBacktest, returning a
+    DataFrame comparing their results.
+
+    The bands strategy is checked on the buy and sell signals
+    of TecnicalAnalysisStrategy alone, as its trailing stop and
+    middle band exits depend on the path of each trade.
+    """
+    start_date = datetime.datetime(2000, 1, 1)
+    end_date = datetime.datetime(2014, 1, 1)
+    price_handler = YahooDailyCsvBarPriceHandler(
+        config.CSV_DATA_DIR, EventDeque(), tickers,
+        start_date=start_date, end_date=end_date,
+        cache_dir=getattr(config, "CACHE_DIR", None)
+    )
+    bars = bars_frame(price_handler, start_date, end_date)
+
+    checks = [
+        ("buy_and_hold", buy_and_hold_signals(bars, tickers[0]),
+            lambda q: BuyAndHoldStrategy(tickers[0], q)),
+        ("moving_average_cross", moving_average_cross_signals(bars, tickers[0]),
+            lambda q: MovingAverageCrossStrategy(tickers[0], q, 100, 300)),
+    ]
+    bands = tecnical_signals(bars, price_handler, tickers[0])
+    checks.append(
+        ("bands_signals", bands, lambda q: SignalFrameStrategy(bands, q))
+    )
+
+    rows = []
+    for name, signals, create_strategy in checks:
+        events_queue = EventDeque()
+        t0 = time.time()
+        events = run_session(
+            config, price_handler, create_strategy(events_queue),
+            events_queue, tickers, tickers[-1]
+        )
+        t1 = time.time()
+        vectorized = VectorizedBacktest(
+            signals, benchmark=tickers[-1]
+        ).run()
+        t2 = time.time()
+        rows.append(compare(name, events, vectorized, t1 - t0, t2 - t1))
+    results = pd.DataFrame(rows)
+    if not testing:
+        with pd.option_context("display.width", 200):
+            print(results)
+    if filename is not None:
+        results.to_csv(filename, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    # Configuration data
+    testing = False
+    config = settings.from_file(
+        settings.DEFAULT_CONFIG_FILENAME, testing
+    )
+    tickers = ["AAPL", "SPY"]
+    filename = None
+    run(config, testing, tickers, filename)
@@ -18,15 +18,22 @@ class Backtest(object):
         self, pairs, data_handler, strategy, 
         strategy_params, portfolio, execution, 
         equity=100000.0, heartbeat=0.0, 
-        max_iters=10000000000
+        max_iters=10000000000, fixed_point=False
     ):
         """
-        Initialises the backtest.
+        Initialises the backtest. If fixed_point is set the prices
+        and balances are ints rather than Decimals (see PriceParser),
+        and fixed_point=True is passed on to the data handler and the
+        portfolio, which must then support it. Otherwise they are
+        created as before, without the keyword.
         """
         self.pairs = pairs
         self.events = queue.Queue()
         self.csv_dir = settings.CSV_DATA_DIR
-        self.ticker = data_handler(self.pairs, self.events, self.csv_dir)
+        fixed_point_kwargs = {"fixed_point": True} if fixed_point else {}
+        self.ticker = data_handler(
+            self.pairs, self.events, self.csv_dir, **fixed_point_kwargs
+        )
         self.strategy_params = strategy_params
         self.strategy = strategy(
             self.pairs, self.events, **self.strategy_params
@@ -35,7 +42,8 @@ class Backtest(object):
         self.heartbeat = heartbeat
         self.max_iters = max_iters
         self.portfolio = portfolio(
-            self.ticker, self.events, equity=self.equity, backtest=True
+            self.ticker, self.events, equity=self.equity, backtest=True,
+            **fixed_point_kwargs
         )
         self.execution = execution()
 
@@ -50,22 +58,27 @@ class Backtest(object):
         """
         print("Running Backtest...")
         iters = 0
-        while iters < self.max_iters and self.ticker.continue_backtest:
-            try:
-                event = self.events.get(False)
-            except queue.Empty:
-                self.ticker.stream_next_tick()
-            else:
-                if event is not None:
-                    if event.type == 'TICK':
-                        self.strategy.calculate_signals(event)
-                        self.portfolio.update_portfolio(event)
-                    elif event.type == 'SIGNAL':
-                        self.portfolio.execute_signal(event)
-                    elif event.type == 'ORDER':
-                        self.execution.execute_order(event)
-            time.sleep(self.heartbeat)
-            iters += 1
+        try:
+            while iters < self.max_iters and self.ticker.continue_backtest:
+                try:
+                    event = self.events.get(False)
+                except queue.Empty:
+                    self.ticker.stream_next_tick()
+                else:
+                    if event is not None:
+                        if event.type == 'TICK':
+                            self.strategy.calculate_signals(event)
+                            self.portfolio.update_portfolio(event)
+                        elif event.type == 'SIGNAL':
+                            self.portfolio.execute_signal(event)
+                        elif event.type == 'ORDER':
+                            self.execution.execute_order(event)
+                time.sleep(self.heartbeat)
+                iters += 1
+        finally:
+            # Stops the price handler loading data ahead
+            if hasattr(self.ticker, "close"):
+                self.ticker.close()
 
     def _output_performance(self):
         """
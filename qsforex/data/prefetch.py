@@ -0,0 +1,97 @@
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+import threading
+
+
+class DayPrefetcher(object):
+    """
+    DayPrefetcher loads the ticks of each day of a backtest on a
+    worker thread, ahead of the day being replayed, so that the
+    backtest does not stall at each day boundary while the CSV
+    files of the next day are read and parsed.
+
+    The days are loaded in order by load(date), whose result is
+    handed over untouched, so that the ticks are replayed in
+    exactly the same order as if each day were loaded when it is
+    reached. The loaded days wait in a queue of at most max_days,
+    bounding the memory used to max_days days ahead of the one
+    being replayed (and the one being loaded).
+
+    An exception raised by load is raised again by next_day, when
+    the day that failed to load is reached.
+    """
+
+    _DONE = object()
+
+    def __init__(self, load, dates, max_days=2):
+        if max_days < 1:
+            raise Exception("max_days must be a positive integer")
+        self.load = load
+        self.dates = list(dates)
+        self.max_days = max_days
+        self._queue = queue.Queue(maxsize=max_days)
+        self._stop = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        """
+        Waits for room in the queue, unless the prefetcher is
+        closed. Returns whether the item was queued.
+        """
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _run(self):
+        for date in self.dates:
+            if self._stop.is_set():
+                return
+            try:
+                item = (date, self.load(date), None)
+            except Exception as e:
+                item = (date, None, e)
+            if not self._put(item) or item[2] is not None:
+                return
+        self._put(self._DONE)
+
+    def next_day(self):
+        """
+        Returns the next (date, ticks) loaded, waiting for it
+        if it is still being loaded, or None after the last day.
+        """
+        if self._done:
+            return None
+        item = self._queue.get()
+        if item is self._DONE:
+            self._done = True
+            return None
+        date, ticks, error = item
+        if error is not None:
+            self._done = True
+            raise error
+        return date, ticks
+
+    def __iter__(self):
+        while True:
+            day = self.next_day()
+            if day is None:
+                return
+            yield day
+
+    def close(self):
+        """
+        Stops loading days ahead and waits for the worker thread
+        to finish the day it is loading.
+        """
+        self._stop.set()
+        self._done = True
+        self._thread.join()
@@ -0,0 +1,183 @@
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from qsforex import settings
+from qsforex.backtest.backtest import Backtest
+from qsforex.data.prefetch import DayPrefetcher
+from qsforex.data.price import HistoricCSVPriceHandler
+
+
+class QueueMock(object):
+    def __init__(self):
+        self.events = []
+
+    def put(self, event):
+        self.events.append(event)
+
+
+class StrategyMock(object):
+    def __init__(self, pairs, events):
+        pass
+
+    def calculate_signals(self, event):
+        pass
+
+
+class PortfolioMock(object):
+    def __init__(self, ticker, events, **kwargs):
+        pass
+
+    def update_portfolio(self, event):
+        pass
+
+
+class ExecutionMock(object):
+    pass
+
+
+class TestDayPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        self.lock = threading.Lock()
+
+    def load(self, date):
+        with self.lock:
+            self.loaded.append(date)
+        return iter(range(date * 10, date * 10 + 3))
+
+    def test_days_in_order(self):
+        loader = DayPrefetcher(self.load, range(20), max_days=3)
+        days = list(loader)
+        self.assertEqual([d for d, _ in days], list(range(20)))
+        self.assertEqual(list(days[5][1]), [50, 51, 52])
+        self.assertIsNone(loader.next_day())
+
+    def test_bounded(self):
+        loader = DayPrefetcher(self.load, range(20), max_days=2)
+        self.addCleanup(loader.close)
+        time.sleep(0.2)
+        # Two days queued, and the third waiting to be queued
+        self.assertEqual(self.loaded, [0, 1, 2])
+        self.assertEqual(loader.next_day()[0], 0)
+        time.sleep(0.2)
+        self.assertEqual(self.loaded, [0, 1, 2, 3])
+
+    def test_load_error(self):
+        def load(date):
+            if date == 2:
+                raise IOError("missing file for day %s" % date)
+            return self.load(date)
+        loader = DayPrefetcher(load, range(5))
+        self.assertEqual(loader.next_day()[0], 0)
+        self.assertEqual(loader.next_day()[0], 1)
+        with self.assertRaises(IOError):
+            loader.next_day()
+        self.assertIsNone(loader.next_day())
+        self.assertEqual(self.loaded, [0, 1])
+
+    def test_close(self):
+        loader = DayPrefetcher(self.load, range(20), max_days=1)
+        loader.next_day()
+        loader.close()
+        self.assertFalse(loader._thread.is_alive())
+        self.assertLess(len(self.loaded), 20)
+
+
+class TestPrefetchedCSVPriceHandler(unittest.TestCase):
+    """
+    Check that the ticks streamed with the days loaded ahead
+    are those streamed loading each day when it is reached.
+    """
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.csv_dir)
+        patcher = mock.patch.object(settings, "CSV_DATA_DIR", self.csv_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pairs = ["GBPUSD", "EURUSD"]
+        random.seed(42)
+        for day in range(1, 5):
+            for pair in self.pairs:
+                self.write_day(pair, datetime.datetime(2015, 1, day))
+
+    def write_day(self, pair, date):
+        path = os.path.join(
+            self.csv_dir, "%s_%s.csv" % (pair, date.strftime("%Y%m%d"))
+        )
+        mid = 1.5 if pair == "GBPUSD" else 1.1
+        with open(path, "w") as out_file:
+            out_file.write("Time,Ask,Bid,AskVolume,BidVolume\n")
+            current_time = date
+            for i in range(200):
+                # Both pairs tick at the same times now and then
+                current_time += datetime.timedelta(
+                    milliseconds=random.choice([100, 500, 1000])
+                )
+                mid += random.gauss(0.0, 0.0001)
+                out_file.write("%s,%0.5f,%0.5f,%0.2f,%0.2f\n" % (
+                    current_time.strftime("%d.%m.%Y %H:%M:%S.%f")[:-3],
+                    mid + 0.0001, mid - 0.0001, 1.0, 1.0
+                ))
+
+    def stream(self, **kwargs):
+        events = QueueMock()
+        handler = HistoricCSVPriceHandler(
+            self.pairs, events, self.csv_dir, **kwargs
+        )
+        while handler.continue_backtest:
+            handler.stream_next_tick()
+        return [
+            (e.time, e.instrument, e.bid, e.ask) for e in events.events
+        ]
+
+    def test_backtest_stopped(self):
+        # Stopped on the first day, with the next days loaded ahead
+        backtest = Backtest(
+            self.pairs, HistoricCSVPriceHandler, StrategyMock, {},
+            PortfolioMock, ExecutionMock, max_iters=100
+        )
+        backtest._run_backtest()
+        self.assertTrue(backtest.ticker.continue_backtest)
+        self.assertFalse(backtest.ticker.day_loader._thread.is_alive())
+
+    def test_handler_without_fixed_point(self):
+        # A handler written before fixed point prices were supported
+        class CSVPriceHandler(HistoricCSVPriceHandler):
+            def __init__(self, pairs, events_queue, csv_dir):
+                super(CSVPriceHandler, self).__init__(
+                    pairs, events_queue, csv_dir
+                )
+
+        backtest = Backtest(
+            self.pairs, CSVPriceHandler, StrategyMock, {},
+            PortfolioMock, ExecutionMock, max_iters=100
+        )
+        backtest._run_backtest()
+        self.assertFalse(backtest.ticker.fixed_point)
+        with self.assertRaises(TypeError):
+            Backtest(
+                self.pairs, CSVPriceHandler, StrategyMock, {},
+                PortfolioMock, ExecutionMock, fixed_point=True
+            )
+
+    def test_same_ticks(self):
+        for fixed_point in (False, True):
+            ticks = self.stream(fixed_point=fixed_point, prefetch_days=0)
+            self.assertEqual(len(ticks), 4 * 2 * 200)
+            self.assertEqual(
+                ticks, sorted(ticks, key=lambda t: t[0])
+            )
+            self.assertEqual(
+                self.stream(fixed_point=fixed_point, prefetch_days=2), ticks
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
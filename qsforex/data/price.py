@@ -5,13 +5,14 @@ from decimal import Decimal, getcontext, ROUND_HALF_DOWN
 import os
 import os.path
 import re
-import time
 
 import numpy as np
 import pandas as pd
 
 from qsforex import settings
+from qsforex.data.prefetch import DayPrefetcher
 from qsforex.event.event import TickEvent
+from qsforex.price_parser import PriceParser
 
 
 class PriceHandler(object):
@@ -29,33 +30,19 @@ class PriceHandler(object):
     backtesting suite.
     """
 
+    # Whether the prices are ints (see PriceParser) or Decimals
+    fixed_point = False
+
     def _set_up_prices_dict(self):
         """
-        Due to the way that the Position object handles P&L
-        calculation, it is necessary to include values for not
-        only base/quote currencies but also their reciprocals.
-        This means that this class will contain keys for, e.g.
-        "GBPUSD" and "USDGBP".
-
-        At this stage they are calculated in an ad-hoc manner,
-        but a future TODO is to modify the following code to
-        be more robust and straightforward to follow.
+        Returns the PriceBook of the pairs. Due to the way that
+        the Position object handles P&L calculation, it is
+        necessary to read not only the prices of the pairs but
+        also of their reciprocals (e.g. "USDGBP" from "GBPUSD")
+        and possibly cross rates, which the PriceBook resolves
+        when they are read.
         """
-        prices_dict = dict(
-            (k, v) for k,v in [
-                (p, {"bid": None, "ask": None, "time": None}) for p in self.pairs
-            ]
-        )
-        inv_prices_dict = dict(
-            (k, v) for k,v in [
-                (
-                    "%s%s" % (p[3:], p[:3]), 
-                    {"bid": None, "ask": None, "time": None}
-                ) for p in self.pairs
-            ]
-        )
-        prices_dict.update(inv_prices_dict)
-        return prices_dict
+        return PriceBook(self.pairs, fixed_point=self.fixed_point)
 
     def invert_prices(self, pair, bid, ask):
         """
@@ -74,6 +61,170 @@ class PriceHandler(object):
         return inv_pair, inv_bid, inv_ask
 
 
+_UNIT_SQUARED = PriceParser.PRICE_MULTIPLIER * PriceParser.PRICE_MULTIPLIER
+
+
+class PriceBook(object):
+    """
+    PriceBook holds the latest bid/ask/time of each streamed currency
+    pair, read as a dictionary of pair -> prices, e.g.
+    book["GBPUSD"]["bid"].
+
+    The prices of the other pairs are only calculated when they are
+    read: the inverse of a streamed pair (e.g. "USDGBP" from "GBPUSD",
+    the bid of one being the inverse of the bid of the other, as the
+    positions expect) or the cross rate through other currencies (e.g.
+    "EURGBP" from "EURUSD" and "GBPUSD", multiplying the bids and the
+    asks of the legs, the bid of an inverted leg being the inverse of
+    the ask and its ask the inverse of the bid, so that the bid of a
+    cross rate is never above its ask). They are cached until the
+    next tick of a pair they are calculated from.
+
+    The prices are Decimals, quantized to 0.00001 half down, or ints
+    if fixed_point is set (see PriceParser).
+    """
+    def __init__(self, pairs, fixed_point=False):
+        self.pairs = pairs
+        self.fixed_point = fixed_point
+        self.quotes = dict(
+            (p, {"bid": None, "ask": None, "time": None}) for p in pairs
+        )
+        self._cache = {}
+        self._routes = {}
+        # The calculated pairs depending on each streamed pair
+        self._dependents = dict((p, []) for p in pairs)
+
+    def update(self, pair, bid, ask, tick_time):
+        """
+        Sets the prices of a streamed pair from its latest tick.
+        """
+        quote = self.quotes[pair]
+        quote["bid"] = bid
+        quote["ask"] = ask
+        quote["time"] = tick_time
+        for dependent in self._dependents[pair]:
+            self._cache.pop(dependent, None)
+
+    def __getitem__(self, pair):
+        quote = self.quotes.get(pair)
+        if quote is not None:
+            return quote
+        prices = self._cache.get(pair)
+        if prices is None:
+            prices = self._cache[pair] = self._resolve(pair)
+        return prices
+
+    def __contains__(self, pair):
+        return pair in self.quotes or self._route(pair) is not None
+
+    def __iter__(self):
+        """
+        Iterates over the streamed pairs and their inverses.
+        """
+        for pair in self.pairs:
+            yield pair
+        for pair in self.pairs:
+            yield "%s%s" % (pair[3:], pair[:3])
+
+    def keys(self):
+        return list(self)
+
+    def _route(self, pair):
+        """
+        Returns how the prices of pair are calculated, as a tuple
+        of the streamed pair it is the inverse of, or of the legs
+        (streamed pairs or their inverses) of its cross rate, going
+        through the fewest currencies, or None if it cannot be priced.
+        """
+        try:
+            return self._routes[pair]
+        except KeyError:
+            pass
+        base, quote = pair[:3], pair[3:]
+        route = None
+        if quote + base in self.quotes:
+            route = (quote + base,)
+        else:
+            # Breadth first search of the currencies, through the
+            # streamed pairs in either direction
+            neighbours = {}
+            for p in self.pairs:
+                neighbours.setdefault(p[:3], set()).add(p[3:])
+                neighbours.setdefault(p[3:], set()).add(p[:3])
+            paths = {base: ()}
+            frontier = [base]
+            while frontier and quote not in paths:
+                next_frontier = []
+                for cur in frontier:
+                    for other in sorted(neighbours.get(cur, ())):
+                        if other not in paths:
+                            paths[other] = paths[cur] + (cur + other,)
+                            next_frontier.append(other)
+                frontier = next_frontier
+            route = paths.get(quote) or None
+        self._routes[pair] = route
+        if route is not None:
+            for leg in route:
+                if leg not in self.quotes:
+                    leg = leg[3:] + leg[:3]
+                self._dependents[leg].append(pair)
+        return route
+
+    def _resolve(self, pair):
+        route = self._route(pair)
+        if route is None:
+            raise KeyError(pair)
+        if len(route) == 1:
+            quote = self.quotes[route[0]]
+            return {
+                "bid": self._invert(quote["bid"]),
+                "ask": self._invert(quote["ask"]),
+                "time": quote["time"],
+            }
+        legs = [self._leg(leg) for leg in route]
+        prices = dict(legs[0])
+        for leg in legs[1:]:
+            prices["bid"] = self._multiply(prices["bid"], leg["bid"])
+            prices["ask"] = self._multiply(prices["ask"], leg["ask"])
+        times = [leg["time"] for leg in legs]
+        prices["time"] = None if None in times else max(times)
+        return prices
+
+    def _leg(self, leg):
+        """
+        Returns the prices of a leg of a cross rate: the quote of a
+        streamed pair, or of its inverse, bought at the inverse of
+        the bid and sold at the inverse of the ask of the pair.
+        """
+        quote = self.quotes.get(leg)
+        if quote is not None:
+            return quote
+        quote = self.quotes[leg[3:] + leg[:3]]
+        return {
+            "bid": self._invert(quote["ask"]),
+            "ask": self._invert(quote["bid"]),
+            "time": quote["time"],
+        }
+
+    def _invert(self, price):
+        if price is None:
+            return None
+        if self.fixed_point:
+            # PriceParser.invert, inlined as it is read on every tick
+            q, r = divmod(_UNIT_SQUARED, price)
+            return q + 1 if r + r > price else q
+        return (Decimal("1.0") / price).quantize(
+            Decimal("0.00001"), ROUND_HALF_DOWN
+        )
+
+    def _multiply(self, price, other):
+        if price is None or other is None:
+            return None
+        if self.fixed_point:
+            return PriceParser.divide(price * other, PriceParser.PRICE_MULTIPLIER)
+        return (price * other).quantize(Decimal("0.00001"), ROUND_HALF_DOWN)
+
+
 class HistoricCSVPriceHandler(PriceHandler):
     """
     HistoricCSVPriceHandler is designed to read CSV files of
@@ -81,7 +232,16 @@ class HistoricCSVPriceHandler(PriceHandler):
     to the provided events queue.
     """
 
-    def __init__(self, pairs, events_queue, csv_dir):
+    # The number of rows of a CSV file parsed at once when the days
+    # are loaded ahead. The worker thread holds the GIL while parsing
+    # (the dates, mostly) so that smaller chunks shorten the pauses
+    # of the streaming thread.
+    prefetch_chunk_size = 4096
+
+    def __init__(
+        self, pairs, events_queue, csv_dir, fixed_point=False,
+        prefetch_days=2
+    ):
         """
         Initialises the historic data handler by requesting
         the location of the CSV files and a list of symbols.
@@ -94,18 +254,34 @@ class HistoricCSVPriceHandler(PriceHandler):
         pairs - The list of currency pairs to obtain.
         events_queue - The events queue to send the ticks to.
         csv_dir - Absolute directory path to the CSV files.
+        fixed_point - Whether the prices are ints (see PriceParser)
+            rather than Decimals. The prices of each day are then
+            converted at once when it is opened.
+        prefetch_days - The number of days loaded ahead of the day
+            being streamed, on a worker thread (see DayPrefetcher).
+            If 0 each day is loaded when it is reached.
         """
         self.pairs = pairs
         self.events_queue = events_queue
         self.csv_dir = csv_dir
+        self.fixed_point = fixed_point
         self.prices = self._set_up_prices_dict()
-        self.pair_frames = {}
         self.file_dates = self._list_all_file_dates()
         self.continue_backtest = True
         self.cur_date_idx = 0
-        self.cur_date_pairs = self._open_convert_csv_files_for_day(
-            self.file_dates[self.cur_date_idx]
-        )
+        self.day_loader = None
+        self.read_chunk_size = None
+        if prefetch_days:
+            self.read_chunk_size = self.prefetch_chunk_size
+            self.day_loader = DayPrefetcher(
+                self._open_convert_csv_files_for_day,
+                self.file_dates, max_days=prefetch_days
+            )
+            _, self.cur_date_pairs = self.day_loader.next_day()
+        else:
+            self.cur_date_pairs = self._open_convert_csv_files_for_day(
+                self.file_dates[self.cur_date_idx]
+            )
 
     def _list_all_csv_files(self):
         files = os.listdir(settings.CSV_DATA_DIR)
@@ -133,17 +309,29 @@ class HistoricCSVPriceHandler(PriceHandler):
         The function then concatenates all of the separate pairs
         for a single day into a single data frame that is time 
         ordered, allowing tick data events to be added to the queue 
-        in a chronological fashion.
+        in a chronological fashion (the ticks at the same time
+        in the order of the pairs).
+
+        With prefetching this is called on the worker thread
+        of the DayPrefetcher, and so only reads the files.
         """
+        pair_frames = []
         for p in self.pairs:
             pair_path = os.path.join(self.csv_dir, '%s_%s.csv' % (p, date_str))
-            self.pair_frames[p] = pd.io.parsers.read_csv(
-                pair_path, header=True, index_col=0, 
+            pair_frame = pd.read_csv(
+                pair_path, header=0, index_col=0, 
                 parse_dates=True, dayfirst=True,
-                names=("Time", "Ask", "Bid", "AskVolume", "BidVolume")
+                names=("Time", "Ask", "Bid", "AskVolume", "BidVolume"),
+                chunksize=self.read_chunk_size
             )
-            self.pair_frames[p]["Pair"] = p
-        return pd.concat(self.pair_frames.values()).sort().iterrows()
+            if self.read_chunk_size is not None:
+                pair_frame = pd.concat(pair_frame)
+            pair_frame["Pair"] = p
+            pair_frames.append(pair_frame)
+        ticks = pd.concat(pair_frames).sort_index(kind="mergesort")
+        if self.fixed_point:
+            return fixed_point_ticks(ticks)
+        return ticks.iterrows()
 
     def _update_csv_for_day(self):
         try:
@@ -151,10 +339,21 @@ class HistoricCSVPriceHandler(PriceHandler):
         except IndexError:  # End of file dates
             return False
         else:
-            self.cur_date_pairs = self._open_convert_csv_files_for_day(dt)
+            if self.day_loader is not None:
+                _, self.cur_date_pairs = self.day_loader.next_day()
+            else:
+                self.cur_date_pairs = self._open_convert_csv_files_for_day(dt)
             self.cur_date_idx += 1
             return True
 
+    def close(self):
+        """
+        Stops loading the days ahead, if they are prefetched, e.g.
+        when the backtest stops before the end of the data.
+        """
+        if self.day_loader is not None:
+            self.day_loader.close()
+
     def stream_next_tick(self):
         """
         The Backtester has now moved over to a single-threaded
@@ -168,35 +367,46 @@ class HistoricCSVPriceHandler(PriceHandler):
         well as updating the current bid/ask and inverse bid/ask.
         """
         try:
-            index, row = next(self.cur_date_pairs)
+            tick = next(self.cur_date_pairs)
         except StopIteration:
             # End of the current days data
             if self._update_csv_for_day():
-                index, row = next(self.cur_date_pairs)
+                tick = next(self.cur_date_pairs)
             else: # End of the data
                 self.continue_backtest = False
                 return
-        
-        getcontext().rounding = ROUND_HALF_DOWN
-        pair = row["Pair"]
-        bid = Decimal(str(row["Bid"])).quantize(
-            Decimal("0.00001")
-        )
-        ask = Decimal(str(row["Ask"])).quantize(
-            Decimal("0.00001")
-        )
 
-        # Create decimalised prices for traded pair
-        self.prices[pair]["bid"] = bid
-        self.prices[pair]["ask"] = ask
-        self.prices[pair]["time"] = index
+        if self.fixed_point:
+            index, pair, bid, ask = tick
+        else:
+            index, row = tick
+            getcontext().rounding = ROUND_HALF_DOWN
+            pair = row["Pair"]
+            bid = Decimal(str(row["Bid"])).quantize(
+                Decimal("0.00001")
+            )
+            ask = Decimal(str(row["Ask"])).quantize(
+                Decimal("0.00001")
+            )
 
-        # Create decimalised prices for inverted pair
-        inv_pair, inv_bid, inv_ask = self.invert_prices(pair, bid, ask)
-        self.prices[inv_pair]["bid"] = inv_bid
-        self.prices[inv_pair]["ask"] = inv_ask
-        self.prices[inv_pair]["time"] = index
+        # The prices of the inverted (and cross) pairs are only
+        # calculated from these when read
+        self.prices.update(pair, bid, ask, index)
 
         # Create the tick event for the queue
         tev = TickEvent(pair, index, bid, ask)
         self.events_queue.put(tev)
+
+
+def fixed_point_ticks(ticks):
+    """
+    Returns an iterator over the (time, pair, bid, ask) of each
+    row of the ticks DataFrame, with the prices as ints (see
+    PriceParser), converted from the whole columns at once. They
+    equal the Decimal prices of the same ticks.
+    """
+    bids = PriceParser.parse_array(ticks["Bid"].values)
+    asks = PriceParser.parse_array(ticks["Ask"].values)
+    return zip(
+        ticks.index, ticks["Pair"].tolist(), bids.tolist(), asks.tolist()
+    )
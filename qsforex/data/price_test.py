@@ -0,0 +1,112 @@
+from decimal import Decimal
+import unittest
+
+from qsforex.data.price import PriceBook, PriceHandler
+from qsforex.portfolio.position import FixedPointPosition, Position
+from qsforex.price_parser import PriceParser
+
+
+class TickerMock(object):
+    def __init__(self, prices):
+        self.prices = prices
+
+
+class TestPriceBook(unittest.TestCase):
+    def setUp(self):
+        self.pairs = ["GBPUSD", "EURUSD", "EURCHF"]
+        self.book = PriceBook(self.pairs)
+        self.fixed = PriceBook(self.pairs, fixed_point=True)
+        self.set_prices("GBPUSD", "1.50328", "1.50349", 1)
+        self.set_prices("EURUSD", "1.07832", "1.07847", 2)
+        self.set_prices("EURCHF", "1.08416", "1.08442", 3)
+
+    def set_prices(self, pair, bid, ask, time):
+        self.book.update(pair, Decimal(bid), Decimal(ask), time)
+        self.fixed.update(
+            pair, PriceParser.parse(bid), PriceParser.parse(ask), time
+        )
+
+    def assertSamePrices(self, pair):
+        prices = self.book[pair]
+        fixed = self.fixed[pair]
+        self.assertEqual(prices["time"], fixed["time"])
+        for side in ("bid", "ask"):
+            self.assertEqual(PriceParser.display(fixed[side]), prices[side])
+
+    def test_inverse(self):
+        _, bid, ask = PriceHandler().invert_prices(
+            "GBPUSD", Decimal("1.50328"), Decimal("1.50349")
+        )
+        self.assertEqual(
+            self.book["USDGBP"], {"bid": bid, "ask": ask, "time": 1}
+        )
+        self.assertSamePrices("USDGBP")
+        self.assertEqual(
+            list(self.book),
+            ["GBPUSD", "EURUSD", "EURCHF", "USDGBP", "USDEUR", "CHFEUR"]
+        )
+
+    def test_cross(self):
+        prices = self.book["EURGBP"]
+        inverse = self.book["USDGBP"]
+        # Sold at the EUR/USD bid, bought back at the GBP/USD ask
+        self.assertEqual(
+            prices["bid"],
+            (Decimal("1.07832") * inverse["ask"]).quantize(Decimal("0.00001"))
+        )
+        self.assertEqual(
+            prices["ask"],
+            (Decimal("1.07847") * inverse["bid"]).quantize(Decimal("0.00001"))
+        )
+        self.assertEqual(prices["time"], 2)
+        self.assertSamePrices("EURGBP")
+        # Through USD/EUR and EUR/CHF
+        self.assertSamePrices("GBPCHF")
+        self.assertEqual(
+            self.book._route("GBPCHF"), ("GBPUSD", "USDEUR", "EURCHF")
+        )
+        self.assertNotIn("GBPJPY", self.book)
+        with self.assertRaises(KeyError):
+            self.book["GBPJPY"]
+
+    def test_cross_wide_spread(self):
+        self.set_prices("EURUSD", "1.10000", "1.10010", 4)
+        self.set_prices("GBPUSD", "1.25000", "1.26000", 5)
+        prices = self.book["EURGBP"]
+        self.assertEqual(prices["bid"], Decimal("0.87301"))
+        self.assertEqual(prices["ask"], Decimal("0.88008"))
+        self.assertSamePrices("EURGBP")
+        for pair in ("EURGBP", "GBPEUR", "GBPCHF", "CHFGBP"):
+            for book in (self.book, self.fixed):
+                self.assertLessEqual(book[pair]["bid"], book[pair]["ask"])
+
+    def test_cached_until_tick(self):
+        prices = self.book["EURGBP"]
+        self.assertIs(self.book["EURGBP"], prices)
+        self.set_prices("EURCHF", "1.08420", "1.08446", 4)
+        self.assertIs(self.book["EURGBP"], prices)
+        self.set_prices("GBPUSD", "1.50486", "1.50586", 5)
+        self.assertIsNot(self.book["EURGBP"], prices)
+        self.assertEqual(self.book["USDGBP"]["time"], 5)
+        self.assertSamePrices("EURGBP")
+
+    def test_home_currency_not_quoted(self):
+        # The quote currency of GBP/USD is converted to CHF
+        # through USD/EUR and EUR/CHF
+        position = Position(
+            "CHF", "long", "GBPUSD", 2000, TickerMock(self.book)
+        )
+        fixed = FixedPointPosition(
+            "CHF", "long", "GBPUSD", 2000, TickerMock(self.fixed)
+        )
+        self.assertEqual(position.quote_home_currency_pair, "USDCHF")
+        self.set_prices("GBPUSD", "1.50486", "1.50586", 6)
+        position.update_position_price()
+        fixed.update_position_price()
+        # 0.00137 pips * 1.00528 USD/CHF * 2000 units
+        self.assertEqual(position.profit_base, Decimal("2.75447"))
+        self.assertEqual(PriceParser.display(fixed.profit_base), position.profit_base)
+
+
+if __name__ == "__main__":
+    unittest.main()
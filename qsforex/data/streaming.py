@@ -81,12 +81,8 @@ class StreamingForexPrices(PriceHandler):
                     ask = Decimal(str(msg["tick"]["ask"])).quantize(
                         Decimal("0.00001")
                     )
-                    self.prices[instrument]["bid"] = bid
-                    self.prices[instrument]["ask"] = ask
-                    # Invert the prices (GBP_USD -> USD_GBP)
-                    inv_pair, inv_bid, inv_ask = self.invert_prices(instrument, bid, ask)
-                    self.prices[inv_pair]["bid"] = inv_bid
-                    self.prices[inv_pair]["ask"] = inv_ask
-                    self.prices[inv_pair]["time"] = time
+                    # The inverted prices (GBP_USD -> USD_GBP) are
+                    # only calculated when read
+                    self.prices.update(instrument, bid, ask, time)
                     tev = TickEvent(instrument, time, bid, ask)
                     self.events_queue.put(tev)
@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
 
+from qstrader.statistics.performance import (
+    drawdown_duration, drawdown_episodes, high_water_mark
+)
+
 
 def create_drawdowns(pnl):
     """
@@ -16,17 +20,12 @@ def create_drawdowns(pnl):
     """
 
     # Calculate the cumulative returns curve 
-    # and set up the High Water Mark
-    hwm = [0]
+    # and set up the High Water Mark, starting from zero
+    values = np.asarray(pnl, dtype=np.float64)
+    hwm = high_water_mark(np.concatenate(([0.0], values[1:])))
 
     # Create the drawdown and duration series
-    idx = pnl.index
-    drawdown = pd.Series(index = idx)
-    duration = pd.Series(index = idx)
-
-    # Loop over the index range
-    for t in range(1, len(idx)):
-        hwm.append(max(hwm[t-1], pnl.ix[t]))
-        drawdown.ix[t]= (hwm[t]-pnl.ix[t])
-        duration.ix[t]= (0 if drawdown.ix[t] == 0 else duration.ix[t-1]+1)
-    return drawdown, drawdown.max(), duration.max()
+    drawdown = pd.Series(hwm - values, index=pnl.index)
+    if len(drawdown):
+        drawdown.iloc[0] = np.nan
+    return drawdown, drawdown.max(), drawdown_duration(drawdown[1:])
@@ -0,0 +1,163 @@
+from decimal import Decimal, getcontext, ROUND_HALF_DOWN
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qsforex.data.price import PriceBook, fixed_point_ticks
+from qsforex.portfolio.portfolio import Portfolio
+from qsforex.portfolio.position import FixedPointPosition, Position
+from qsforex.price_parser import PriceParser
+
+
+class TickerMock(object):
+    """
+    A mock ticker holding the prices of GBP/USD and EUR/USD, both as
+    Decimals and as ints, set as the Decimal and fixed-point price
+    handlers set them.
+    """
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.prices = PriceBook(pairs)
+        self.fixed = FixedTicker(pairs)
+
+    def set_prices(self, pair, bid, ask):
+        getcontext().rounding = ROUND_HALF_DOWN
+        bid = Decimal(str(bid)).quantize(Decimal("0.00001"))
+        ask = Decimal(str(ask)).quantize(Decimal("0.00001"))
+        self.prices.update(pair, bid, ask, None)
+        self.fixed.prices.update(
+            pair, PriceParser.parse(bid), PriceParser.parse(ask), None
+        )
+
+
+class FixedTicker(object):
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.prices = PriceBook(pairs, fixed_point=True)
+
+
+class TestFixedPointPrices(unittest.TestCase):
+    def test_parse(self):
+        getcontext().rounding = ROUND_HALF_DOWN
+        np.random.seed(42)
+        values = np.concatenate([
+            np.random.uniform(0.5, 2.0, 5000),
+            # Ties (and near ties) at the fifth decimal
+            np.round(np.random.uniform(0.5, 2.0, 5000), 6),
+            np.round(np.random.uniform(80.0, 160.0, 5000), 4),
+        ])
+        parsed = PriceParser.parse_array(values)
+        for value, price in zip(values.tolist(), parsed.tolist()):
+            dec = Decimal(str(value)).quantize(Decimal("0.00001"))
+            self.assertEqual(PriceParser.display(price), dec)
+            self.assertEqual(PriceParser.parse(value), price)
+            inv = (Decimal("1.0") / dec).quantize(Decimal("0.00001"))
+            self.assertEqual(PriceParser.display(PriceParser.invert(price)), inv)
+
+    def test_fixed_point_ticks(self):
+        ticks = pd.DataFrame({
+            "Ask": [1.503495, 1.07847, 1.5034849999],
+            "Bid": [1.50328, 1.078325, 1.503275],
+            "Pair": ["GBPUSD", "EURUSD", "GBPUSD"],
+        }, index=pd.date_range("2014-01-01", periods=3, freq="s"))
+        getcontext().rounding = ROUND_HALF_DOWN
+        for (index, row), tick in zip(ticks.iterrows(), fixed_point_ticks(ticks)):
+            bid = Decimal(str(row["Bid"])).quantize(Decimal("0.00001"))
+            ask = Decimal(str(row["Ask"])).quantize(Decimal("0.00001"))
+            self.assertEqual(tick[:2], (index, row["Pair"]))
+            self.assertEqual(
+                [PriceParser.display(p) for p in tick[2:]], [bid, ask]
+            )
+
+
+class TestFixedPointPosition(unittest.TestCase):
+    """
+    Check that a FixedPointPosition follows a Position, with
+    the same prices, to the last decimal.
+    """
+    def setUp(self):
+        self.ticker = TickerMock(["GBPUSD", "EURUSD"])
+        self.mid = {"GBPUSD": 1.50338, "EURUSD": 1.07840}
+        random.seed(42)
+        self.move()
+
+    def move(self):
+        for pair in self.ticker.pairs:
+            self.mid[pair] += random.gauss(0.0, 0.0005)
+            spread = random.choice([0.0001, 0.00015, 0.0002])
+            self.ticker.set_prices(
+                pair, round(self.mid[pair] - spread / 2.0, 6),
+                round(self.mid[pair] + spread / 2.0, 6)
+            )
+
+    def assertSamePosition(self, position, fixed):
+        self.assertEqual(position.units, fixed.units)
+        self.assertEqual(
+            position.calculate_pips(),
+            PriceParser.display(fixed.calculate_pips())
+        )
+        self.assertEqual(position.profit_base, PriceParser.display(fixed.profit_base))
+        self.assertEqual(position.profit_perc, PriceParser.display(fixed.profit_perc))
+
+    def check_position(self, position_type, currency_pair):
+        position = Position(
+            "GBP", position_type, currency_pair, 2000, self.ticker
+        )
+        fixed = FixedPointPosition(
+            "GBP", position_type, currency_pair, 2000, self.ticker.fixed
+        )
+        self.assertEqual(PriceParser.display(fixed.avg_price), position.avg_price)
+        for i in range(300):
+            self.move()
+            position.update_position_price()
+            fixed.update_position_price()
+            self.assertSamePosition(position, fixed)
+            if i % 50 == 10:
+                position.add_units(1000 + i)
+                fixed.add_units(1000 + i)
+                self.assertSamePosition(position, fixed)
+            elif i % 50 == 30:
+                self.assertEqual(
+                    position.remove_units(700),
+                    PriceParser.display(fixed.remove_units(700), 2)
+                )
+                self.assertSamePosition(position, fixed)
+        self.assertEqual(
+            position.close_position(),
+            PriceParser.display(fixed.close_position(), 2)
+        )
+
+    def test_long_gbpusd(self):
+        self.check_position("long", "GBPUSD")
+
+    def test_short_gbpusd(self):
+        self.check_position("short", "GBPUSD")
+
+    def test_long_eurusd(self):
+        self.check_position("long", "EURUSD")
+
+    def test_short_eurusd(self):
+        self.check_position("short", "EURUSD")
+
+    def test_portfolio(self):
+        portfolio = Portfolio(self.ticker, {}, backtest=False)
+        fixed = Portfolio(self.ticker.fixed, {}, backtest=False, fixed_point=True)
+        self.assertEqual(fixed.balance, PriceParser.parse(portfolio.balance))
+        for p in (portfolio, fixed):
+            p.add_new_position("short", "EURUSD", 2000, p.ticker)
+        for i in range(20):
+            self.move()
+        for p in (portfolio, fixed):
+            p.add_position_units("EURUSD", 500)
+            p.remove_position_units("EURUSD", 300)
+        self.move()
+        for p in (portfolio, fixed):
+            p.close_position("EURUSD")
+        self.assertNotEqual(portfolio.balance, Decimal("100000.00"))
+        self.assertEqual(PriceParser.display(fixed.balance, 2), portfolio.balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,15 @@ from decimal import Decimal, getcontext, ROUND_HALF_DOWN
 import logging
 import os
 
-import pandas as pd
+import numpy as np
 
 from qsforex.event.event import OrderEvent
-from qsforex.performance.performance import create_drawdowns
-from qsforex.portfolio.position import Position
+from qsforex.performance.performance import (
+    create_drawdowns, drawdown_episodes
+)
+from qsforex.portfolio.position import FixedPointPosition, Position
+from qsforex.portfolio.recorder import EquityRecorder
+from qsforex.price_parser import PriceParser
 from qsforex.settings import OUTPUT_RESULTS_DIR
 
 
@@ -17,20 +21,42 @@ class Portfolio(object):
     def __init__(
         self, ticker, events, home_currency="GBP", 
         leverage=20, equity=Decimal("100000.00"), 
-        risk_per_trade=Decimal("0.02"), backtest=True
+        risk_per_trade=Decimal("0.02"), backtest=True,
+        fixed_point=False, echo=False, sample_every=1,
+        equity_filename=None
     ):
+        """
+        If fixed_point is set, the prices of the ticker are ints (see
+        PriceParser), as are the balance and the PnL of the positions
+        (FixedPointPosition), the results being those of Decimals.
+
+        In a backtest the balance and the PnL of every pair are kept,
+        tick by tick (or one tick in sample_every), by an EquityRecorder,
+        flushed to the binary file equity_filename (in the output
+        results directory) if set. If echo is set they are also
+        printed on every tick.
+        """
         self.ticker = ticker
         self.events = events
         self.home_currency = home_currency
         self.leverage = leverage
         self.equity = equity
-        self.balance = deepcopy(self.equity)
+        self.fixed_point = fixed_point
+        if self.fixed_point:
+            self.balance = PriceParser.parse(self.equity)
+            self.position_class = FixedPointPosition
+        else:
+            self.balance = deepcopy(self.equity)
+            self.position_class = Position
         self.risk_per_trade = risk_per_trade
         self.backtest = backtest
+        self.echo = echo
         self.trade_units = self.calc_risk_position_size()
         self.positions = {}
         if self.backtest:
-            self.backtest_file = self.create_equity_file()
+            self.equity_recorder = self.create_equity_recorder(
+                sample_every, equity_filename
+            )
         self.logger = logging.getLogger(__name__)
 
     def calc_risk_position_size(self):
@@ -39,7 +65,7 @@ class Portfolio(object):
     def add_new_position(
         self, position_type, currency_pair, units, ticker
     ):
-        ps = Position(
+        ps = self.position_class(
             self.home_currency,
             position_type,
             currency_pair,
@@ -75,30 +101,40 @@ class Portfolio(object):
             del[self.positions[currency_pair]]
             return True
 
-    def create_equity_file(self):
-        filename = "backtest.csv"
-        out_file = open(os.path.join(OUTPUT_RESULTS_DIR, filename), "w")
-        header = "Timestamp,Balance"
-        for pair in self.ticker.pairs:
-            header += ",%s" % pair
-        header += "\n"
-        out_file.write(header)
-        if self.backtest:
-            print(header[:-2])
-        return out_file
+    def create_equity_recorder(self, sample_every=1, filename=None):
+        columns = ["Balance"] + list(self.ticker.pairs)
+        if filename is not None:
+            filename = os.path.join(OUTPUT_RESULTS_DIR, filename)
+        if self.fixed_point:
+            recorder = EquityRecorder(
+                columns, dtype=np.int64, sample_every=sample_every,
+                filename=filename, scale=PriceParser.PRICE_MULTIPLIER
+            )
+        else:
+            recorder = EquityRecorder(
+                columns, sample_every=sample_every, filename=filename
+            )
+        if self.echo:
+            print("Timestamp,%s" % ",".join(columns))
+        return recorder
+
+    def equity_frame(self):
+        """
+        Returns the recorded balance and PnL of every pair as a
+        DataFrame, also written out as backtest.csv for later
+        runs of scripts/test_performance.py.
+        """
+        self.equity_recorder.close()
+        df = self.equity_recorder.to_frame()
+        df.to_csv(os.path.join(OUTPUT_RESULTS_DIR, "backtest.csv"))
+        return df
 
     def output_results(self):
-        # Closes off the Backtest.csv file so it can be 
-        # read via Pandas without problems
-        self.backtest_file.close()
-        
-        in_filename = "backtest.csv"
         out_filename = "equity.csv" 
-        in_file = os.path.join(OUTPUT_RESULTS_DIR, in_filename)
         out_file = os.path.join(OUTPUT_RESULTS_DIR, out_filename)
 
         # Create equity curve dataframe
-        df = pd.read_csv(in_file, index_col=0)
+        df = self.equity_frame()
         df.dropna(inplace=True)
         df["Total"] = df.sum(axis=1)
         df["Returns"] = df["Total"].pct_change()
@@ -108,6 +144,10 @@ class Portfolio(object):
         drawdown, max_dd, dd_duration = create_drawdowns(df["Equity"])
         df["Drawdown"] = drawdown
         df.to_csv(out_file, index=True)
+
+        # One row per drawdown episode
+        episodes_file = os.path.join(OUTPUT_RESULTS_DIR, "drawdowns.csv")
+        drawdown_episodes(drawdown[1:]).to_csv(episodes_file, index=False)
         
         print("Simulation complete and results exported to %s" % out_filename)
 
@@ -121,15 +161,35 @@ class Portfolio(object):
             ps = self.positions[currency_pair]
             ps.update_position_price()
         if self.backtest:
-            out_line = "%s,%s" % (tick_event.time, self.balance)
+            positions = self.positions
+            values = [self.balance]
             for pair in self.ticker.pairs:
-                if pair in self.positions:
-                    out_line += ",%s" % self.positions[pair].profit_base
+                if pair in positions:
+                    values.append(positions[pair].profit_base)
                 else:
-                    out_line += ",0.00"
-            out_line += "\n"
-            print(out_line[:-2])
-            self.backtest_file.write(out_line)
+                    values.append(0)
+            self.equity_recorder.append(tick_event.time, values)
+            if self.echo:
+                self.echo_equity(tick_event.time)
+
+    def echo_equity(self, time):
+        """
+        Prints the balance and the PnL of every pair, as
+        they are recorded.
+        """
+        balance = self.balance
+        if self.fixed_point:
+            balance = PriceParser.display(balance, 2)
+        out_line = "%s,%s" % (time, balance)
+        for pair in self.ticker.pairs:
+            if pair in self.positions:
+                profit_base = self.positions[pair].profit_base
+                if self.fixed_point:
+                    profit_base = PriceParser.display(profit_base)
+                out_line += ",%s" % profit_base
+            else:
+                out_line += ",0.00"
+        print(out_line)
 
     def execute_signal(self, signal_event):
         # Check that the prices ticker contains all necessary
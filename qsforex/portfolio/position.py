@@ -1,4 +1,7 @@
 from decimal import Decimal, getcontext, ROUND_HALF_DOWN
+from math import gcd
+
+from qsforex.price_parser import PriceParser
 
 
 class Position(object):
@@ -106,3 +109,105 @@ class Position(object):
         pnl = self.calculate_pips() * qh_close * self.units
         getcontext().rounding = ROUND_HALF_DOWN
         return pnl.quantize(Decimal("0.01"))
+
+
+class FixedPointPosition(Position):
+    """
+    FixedPointPosition is a Position whose prices, profits and
+    PnLs are all ints, in the units of PriceParser (0.00001), as
+    are the prices of a fixed-point price handler. Units are ints.
+
+    The results are those of Position, quantized the same way. The
+    average price is kept as the exact ratio avg_cost / avg_units
+    (avg_price only being its rounded value), so that the pips and
+    profits computed from it are rounded once, as Position rounds
+    them from its (28 digit) Decimal average price.
+    """
+    def set_up_currencies(self):
+        self.base_currency = self.currency_pair[:3]
+        self.quote_currency = self.currency_pair[3:]
+        self.quote_home_currency_pair = "%s%s" % (self.quote_currency, self.home_currency)
+
+        ticker_cur = self.ticker.prices[self.currency_pair]
+        if self.position_type == "long":
+            self.mult = 1
+            self.avg_price = ticker_cur["ask"]
+            self.cur_price = ticker_cur["bid"]
+        else:
+            self.mult = -1
+            self.avg_price = ticker_cur["bid"]
+            self.cur_price = ticker_cur["ask"]
+        self.avg_cost = self.avg_price
+        self.avg_units = 1
+
+    def calculate_pips(self):
+        return PriceParser.divide(
+            self.mult * (self.cur_price * self.avg_units - self.avg_cost),
+            self.avg_units
+        )
+
+    def calculate_profit_base(self):
+        ticker_qh = self.ticker.prices[self.quote_home_currency_pair]
+        if self.position_type == "long":
+            qh_close = ticker_qh["bid"]
+        else:
+            qh_close = ticker_qh["ask"]
+        return PriceParser.divide(
+            self.calculate_pips() * qh_close * self.units,
+            PriceParser.PRICE_MULTIPLIER
+        )
+
+    def calculate_profit_perc(self):
+        return PriceParser.divide(self.profit_base * 100, self.units)
+
+    def update_position_price(self):
+        ticker_cur = self.ticker.prices[self.currency_pair]
+        if self.position_type == "long":
+            self.cur_price = ticker_cur["bid"]
+        else:
+            self.cur_price = ticker_cur["ask"]
+        self.profit_base = self.calculate_profit_base()
+        self.profit_perc = self.calculate_profit_perc()
+
+    def add_units(self, units):
+        cp = self.ticker.prices[self.currency_pair]
+        if self.position_type == "long":
+            add_price = cp["ask"]
+        else:
+            add_price = cp["bid"]
+        new_total_units = self.units + units
+        cost = self.avg_cost * self.units + add_price * units * self.avg_units
+        cost_units = self.avg_units * new_total_units
+        divisor = gcd(cost, cost_units)
+        self.avg_cost = cost // divisor
+        self.avg_units = cost_units // divisor
+        self.avg_price = PriceParser.divide(self.avg_cost, self.avg_units)
+        self.units = new_total_units
+        self.update_position_price()
+
+    def _pnl(self, qh_close, units):
+        # The PnL in PriceParser units, rounded to 0.01
+        cent = PriceParser.PRICE_MULTIPLIER // 100
+        return PriceParser.divide(
+            self.calculate_pips() * qh_close * units,
+            PriceParser.PRICE_MULTIPLIER * cent
+        ) * cent
+
+    def remove_units(self, units):
+        ticker_qh = self.ticker.prices[self.quote_home_currency_pair]
+        if self.position_type == "long":
+            qh_close = ticker_qh["ask"]
+        else:
+            qh_close = ticker_qh["bid"]
+        self.units -= units
+        self.update_position_price()
+        return self._pnl(qh_close, units)
+
+    def close_position(self):
+        ticker_qh = self.ticker.prices[self.quote_home_currency_pair]
+        if self.position_type == "long":
+            qh_close = ticker_qh["ask"]
+        else:
+            qh_close = ticker_qh["bid"]
+        self.update_position_price()
+        return self._pnl(qh_close, self.units)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+
+class EquityRecorder(object):
+    """
+    EquityRecorder records the balance and the unrealised PnL of
+    every pair of the portfolio, tick by tick, in preallocated
+    columnar NumPy chunks (an int64 timestamp, in nanoseconds, and
+    one value per column) rather than as lines of a CSV file.
+
+    A full chunk is kept in memory, or appended to the binary file
+    filename (as records of the time and the columns, see dtype)
+    and reused, so that memory is bounded in a long backtest. With
+    sample_every = n only one tick in n is recorded.
+
+    The values are floats (Decimals are converted as they are
+    recorded) or, for the fixed-point portfolio, int64 prices that
+    are divided by scale when the frame is built.
+    """
+    def __init__(
+        self, columns, dtype=np.float64, chunk_size=65536,
+        sample_every=1, filename=None, scale=None
+    ):
+        if sample_every < 1:
+            raise Exception("sample_every must be a positive integer")
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.sample_every = sample_every
+        self.filename = filename
+        self.scale = scale
+        self.dtype = np.dtype(
+            [("time", np.int64)] + [(c, dtype) for c in self.columns]
+        )
+        self._chunks = []
+        self._times = np.empty(chunk_size, dtype=np.int64)
+        self._values = np.empty((chunk_size, len(self.columns)), dtype=dtype)
+        self._pos = 0
+        self._flushed = 0
+        self._ticks = 0
+        self._tz = None
+        self._file = None
+        if self.filename is not None:
+            self._file = open(self.filename, "wb")
+
+    def __len__(self):
+        return (
+            self._flushed + len(self._chunks) * self.chunk_size + self._pos
+        )
+
+    def append(self, time, values):
+        """
+        Records the values of the columns, in order, at the
+        given time, a pandas Timestamp (or anything it can be
+        built from).
+        """
+        ticks = self._ticks
+        self._ticks = ticks + 1
+        if ticks % self.sample_every:
+            return
+        if not isinstance(time, pd.Timestamp):
+            time = pd.Timestamp(time)
+        if self._tz is None:
+            self._tz = time.tz
+        if self._pos == self.chunk_size:
+            self._store_chunk()
+        self._times[self._pos] = time.value
+        self._values[self._pos] = values
+        self._pos += 1
+
+    def _records(self, times, values):
+        records = np.empty(len(times), dtype=self.dtype)
+        records["time"] = times
+        for i, column in enumerate(self.columns):
+            records[column] = values[:, i]
+        return records
+
+    def _store_chunk(self):
+        """
+        Keeps the full chunk in memory, or writes it to the
+        file and reuses its arrays.
+        """
+        if self._file is None:
+            self._chunks.append((self._times, self._values))
+            self._times = np.empty_like(self._times)
+            self._values = np.empty_like(self._values)
+        else:
+            self._records(self._times, self._values).tofile(self._file)
+            self._flushed += self._pos
+        self._pos = 0
+
+    def flush(self):
+        """
+        Writes the samples recorded so far to the file, if any.
+        """
+        if self._file is not None:
+            self._records(
+                self._times[:self._pos], self._values[:self._pos]
+            ).tofile(self._file)
+            self._flushed += self._pos
+            self._pos = 0
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def arrays(self):
+        """
+        Returns the recorded times, in nanoseconds, as an int64
+        array and the values as a 2D array, one column per column.
+        """
+        chunks = self._chunks + [
+            (self._times[:self._pos], self._values[:self._pos])
+        ]
+        if self.filename is not None and self._flushed:
+            if self._file is not None:
+                self._file.flush()
+            records = np.fromfile(self.filename, dtype=self.dtype)
+            chunks.insert(0, (
+                records["time"],
+                np.column_stack([records[c] for c in self.columns])
+            ))
+        times = np.concatenate([c[0] for c in chunks])
+        values = np.concatenate([c[1] for c in chunks])
+        return times, values
+
+    def to_frame(self):
+        """
+        Returns the recorded values as a DataFrame indexed
+        by Timestamp, with one column per column.
+        """
+        times, values = self.arrays()
+        if self.scale is not None:
+            values = values / float(self.scale)
+        index = pd.DatetimeIndex(pd.to_datetime(times, unit="ns"))
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+        index.name = "Timestamp"
+        return pd.DataFrame(values, index=index, columns=self.columns)
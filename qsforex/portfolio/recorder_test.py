@@ -0,0 +1,194 @@
+from decimal import Decimal
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from qsforex.event.event import TickEvent
+from qsforex.portfolio import portfolio as portfolio_module
+from qsforex.portfolio.fixed_point_test import TickerMock
+from qsforex.portfolio.portfolio import Portfolio
+from qsforex.portfolio.recorder import EquityRecorder
+from qsforex.price_parser import PriceParser
+
+
+class TestEquityRecorder(unittest.TestCase):
+    def setUp(self):
+        random.seed(42)
+        self.columns = ["Balance", "GBPUSD", "EURUSD"]
+        self.times = pd.date_range("2014-01-01", periods=1000, freq="s")
+        self.rows = []
+        for i, time in enumerate(self.times):
+            self.rows.append([
+                Decimal("100000.00") + Decimal(i // 100),
+                Decimal(random.randint(-50000, 50000)).scaleb(-5),
+                Decimal("0.00") if i < 300 else Decimal(i).scaleb(-5),
+            ])
+
+    def csv_frame(self, rows, times):
+        """
+        The frame as read back from the lines of backtest.csv,
+        as they were written tick by tick.
+        """
+        out_file = io.StringIO()
+        out_file.write("Timestamp,%s\n" % ",".join(self.columns))
+        for time, row in zip(times, rows):
+            out_file.write("%s,%s\n" % (time, ",".join(str(v) for v in row)))
+        out_file.seek(0)
+        return pd.read_csv(out_file, index_col=0)
+
+    def assertSameFrame(self, df, expected):
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(
+            [str(t) for t in df.index], list(expected.index)
+        )
+        np.testing.assert_array_equal(df.values, expected.values)
+
+    def test_decimal(self):
+        recorder = EquityRecorder(self.columns, chunk_size=64)
+        for time, row in zip(self.times, self.rows):
+            recorder.append(time, row)
+        self.assertEqual(len(recorder), 1000)
+        self.assertSameFrame(
+            recorder.to_frame(), self.csv_frame(self.rows, self.times)
+        )
+
+    def test_fixed_point(self):
+        recorder = EquityRecorder(
+            self.columns, dtype=np.int64, chunk_size=64,
+            scale=PriceParser.PRICE_MULTIPLIER
+        )
+        for time, row in zip(self.times, self.rows):
+            recorder.append(time, [PriceParser.parse(v) for v in row])
+        self.assertSameFrame(
+            recorder.to_frame(), self.csv_frame(self.rows, self.times)
+        )
+
+    def test_flush_sampled(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        filename = os.path.join(tmp_dir, "equity.bin")
+        recorder = EquityRecorder(
+            self.columns, chunk_size=64, sample_every=10, filename=filename
+        )
+        for time, row in zip(self.times, self.rows):
+            recorder.append(time, row)
+        # Every full chunk has been written out to the file
+        self.assertEqual(os.path.getsize(filename), 64 * recorder.dtype.itemsize)
+        expected = self.csv_frame(self.rows[::10], self.times[::10])
+        self.assertSameFrame(recorder.to_frame(), expected)
+        recorder.close()
+        self.assertEqual(
+            os.path.getsize(filename), 100 * recorder.dtype.itemsize
+        )
+        records = np.fromfile(filename, dtype=recorder.dtype)
+        np.testing.assert_array_equal(
+            records["time"], [t.value for t in self.times[::10]]
+        )
+        self.assertSameFrame(recorder.to_frame(), expected)
+
+
+class TestPortfolioOutputResults(unittest.TestCase):
+    """
+    Check that the results of the recorded backtest are those
+    of the Decimal PnL, written and read back as backtest.csv.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        patcher = mock.patch.object(
+            portfolio_module, "OUTPUT_RESULTS_DIR", self.tmp_dir
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ticker = TickerMock(["GBPUSD", "EURUSD"])
+
+    def run_backtest(self, fixed_point, **kwargs):
+        random.seed(42)
+        self.mid = {"GBPUSD": 1.50338, "EURUSD": 1.07840}
+        self.move()
+        portfolio = Portfolio(
+            self.ticker.fixed if fixed_point else self.ticker, {},
+            fixed_point=fixed_point, **kwargs
+        )
+        lines = ["Timestamp,Balance,GBPUSD,EURUSD"]
+        times = pd.date_range("2014-01-01", periods=500, freq="s")
+        for i, time in enumerate(times):
+            pair = self.move()
+            if i == 10:
+                portfolio.add_new_position("long", "GBPUSD", 2000, portfolio.ticker)
+            elif i == 200:
+                portfolio.add_new_position("short", "EURUSD", 3000, portfolio.ticker)
+            elif i == 300:
+                portfolio.close_position("GBPUSD")
+            portfolio.update_portfolio(TickEvent(pair, time, None, None))
+            lines.append(self.csv_line(portfolio, time))
+        portfolio.output_results()
+        return lines
+
+    def csv_line(self, portfolio, time):
+        display = PriceParser.display if portfolio.fixed_point else (
+            lambda x, dp=5: x
+        )
+        line = "%s,%s" % (time, display(portfolio.balance, 2))
+        for pair in self.ticker.pairs:
+            if pair in portfolio.positions:
+                line += ",%s" % display(portfolio.positions[pair].profit_base)
+            else:
+                line += ",0.00"
+        return line
+
+    def move(self):
+        pair = random.choice(self.ticker.pairs)
+        self.mid[pair] += random.gauss(0.0, 0.0005)
+        self.ticker.set_prices(
+            pair, round(self.mid[pair] - 0.00005, 6),
+            round(self.mid[pair] + 0.00005, 6)
+        )
+        return pair
+
+    def read_results(self):
+        return (
+            pd.read_csv(os.path.join(self.tmp_dir, "equity.csv"), index_col=0),
+            pd.read_csv(os.path.join(self.tmp_dir, "drawdowns.csv"))
+        )
+
+    def expected_results(self, lines):
+        df = pd.read_csv(io.StringIO("\n".join(lines)), index_col=0)
+        df["Total"] = df.sum(axis=1)
+        df["Returns"] = df["Total"].pct_change()
+        df["Equity"] = (1.0+df["Returns"]).cumprod()
+        drawdown, _, _ = portfolio_module.create_drawdowns(df["Equity"])
+        df["Drawdown"] = drawdown
+        return df, portfolio_module.drawdown_episodes(drawdown[1:])
+
+    def assertSameResults(self, lines):
+        equity, episodes = self.read_results()
+        expected, expected_episodes = self.expected_results(lines)
+        self.assertEqual(list(equity.index), list(expected.index))
+        pd.testing.assert_frame_equal(
+            equity.reset_index(drop=True), expected.reset_index(drop=True)
+        )
+        self.assertEqual(len(episodes), len(expected_episodes))
+        self.assertGreater(len(episodes), 0)
+
+    def test_decimal(self):
+        self.assertSameResults(self.run_backtest(False))
+
+    def test_fixed_point(self):
+        self.assertSameResults(self.run_backtest(True))
+
+    def test_equity_file(self):
+        lines = self.run_backtest(False, equity_filename="equity.bin")
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "equity.bin")))
+        self.assertSameResults(lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
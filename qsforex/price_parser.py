@@ -0,0 +1,97 @@
+from decimal import Decimal, ROUND_HALF_DOWN
+
+import numpy as np
+
+
+class PriceParser(object):
+    """
+    PriceParser converts the prices of QSForex to and from an
+    integer fixed-point form, counting in units of 0.00001 (a tenth
+    of a pip), as qstrader's PriceParser does for equities. Prices,
+    profits and balances in this form are exact, and are added and
+    multiplied as plain ints rather than Decimals.
+
+    Every rounding (parse, invert and divide) is half down, to the
+    nearest unit with ties towards zero, so that the results are
+    those of quantizing the same Decimal values to 0.00001 with
+    ROUND_HALF_DOWN, as the Decimal price handler and Position do.
+    """
+
+    # 0.00001
+    PRICE_MULTIPLIER = 100000
+
+    @staticmethod
+    def parse(x):
+        """
+        Returns x as an int price. Ints are passed through
+        untouched, Decimals, floats and strings are quantized
+        (floats through their str, as Decimal(str(x)) does).
+        """
+        if isinstance(x, (int, np.integer)):
+            return int(x)
+        if not isinstance(x, Decimal):
+            x = Decimal(str(x))
+        return int(x.scaleb(5).to_integral_value(ROUND_HALF_DOWN))
+
+    @staticmethod
+    def parse_array(x):
+        """
+        Vectorised parse of an array of float prices, returning
+        int64 prices equal to those of parse. The few values too
+        close to a tie for the float product to be trusted are
+        parsed one by one.
+
+        Raises ValueError if x contains NaN or infinite values.
+        """
+        values = np.asarray(x, dtype=np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("cannot convert non-finite prices to integer")
+        scaled = values * PriceParser.PRICE_MULTIPLIER
+        parsed = np.rint(scaled)
+        frac = np.abs(scaled - np.trunc(scaled))
+        parsed = parsed.astype(np.int64)
+        for i in np.flatnonzero(np.abs(frac - 0.5) < 1e-6):
+            parsed[i] = PriceParser.parse(float(values[i]))
+        return parsed
+
+    @staticmethod
+    def display(x, dp=5):
+        """
+        Returns the int price x as a Decimal with dp decimal
+        places (as quantized by the Decimal price handler).
+        """
+        return Decimal(x).scaleb(-5).quantize(Decimal(1).scaleb(-dp))
+
+    @staticmethod
+    def divide(num, den):
+        """
+        Returns num / den rounded half down to an int, for
+        an int num and positive int den.
+        """
+        q, r = divmod(num, den)
+        # q is the floor, so a tie rounds up (towards zero) if negative
+        r += r
+        if r > den or (r == den and num < 0):
+            q += 1
+        return q
+
+    @staticmethod
+    def invert(x):
+        """
+        Returns the inverse of the int price x, e.g. the bid of
+        USD/GBP from that of GBP/USD.
+        """
+        return PriceParser.divide(
+            PriceParser.PRICE_MULTIPLIER * PriceParser.PRICE_MULTIPLIER, x
+        )
+
+    @staticmethod
+    def invert_array(x):
+        """
+        Vectorised invert of an int64 array of (positive) prices.
+        """
+        values = np.asarray(x, dtype=np.int64)
+        q, r = np.divmod(
+            PriceParser.PRICE_MULTIPLIER * PriceParser.PRICE_MULTIPLIER, values
+        )
+        return q + (2 * r > values)
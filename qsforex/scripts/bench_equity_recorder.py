@@ -0,0 +1,125 @@
+"""
+Benchmarks the cost per tick of keeping the equity curve of a
+backtest in Portfolio.update_portfolio: writing (and printing) a
+line of backtest.csv on every tick, as it used to, or recording
+the balance and PnL in an EquityRecorder, and the time taken by
+output_results (reading back backtest.csv, or writing it out).
+
+Usage: python -m qsforex.scripts.bench_equity_recorder [nb_ticks]
+"""
+from __future__ import print_function
+
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pandas as pd
+
+from qsforex.event.event import TickEvent
+from qsforex.portfolio import portfolio as portfolio_module
+from qsforex.portfolio.fixed_point_test import TickerMock
+from qsforex.portfolio.portfolio import Portfolio
+from qsforex.price_parser import PriceParser
+
+
+class CSVPortfolio(Portfolio):
+    """
+    The Portfolio writing a line of backtest.csv, and printing
+    it, on every tick.
+    """
+    def create_equity_recorder(self, sample_every=1, filename=None):
+        self.backtest_file = open(
+            os.path.join(portfolio_module.OUTPUT_RESULTS_DIR, "backtest.csv"), "w"
+        )
+        self.backtest_file.write(
+            "Timestamp,Balance,%s\n" % ",".join(self.ticker.pairs)
+        )
+
+    def update_portfolio(self, tick_event):
+        currency_pair = tick_event.instrument
+        if currency_pair in self.positions:
+            ps = self.positions[currency_pair]
+            ps.update_position_price()
+        balance = self.balance
+        if self.fixed_point:
+            balance = PriceParser.display(balance, 2)
+        out_line = "%s,%s" % (tick_event.time, balance)
+        for pair in self.ticker.pairs:
+            if pair in self.positions:
+                profit_base = self.positions[pair].profit_base
+                if self.fixed_point:
+                    profit_base = PriceParser.display(profit_base)
+                out_line += ",%s" % profit_base
+            else:
+                out_line += ",0.00"
+        out_line += "\n"
+        print(out_line[:-2])
+        self.backtest_file.write(out_line)
+
+    def equity_frame(self):
+        self.backtest_file.close()
+        return pd.read_csv(
+            os.path.join(portfolio_module.OUTPUT_RESULTS_DIR, "backtest.csv"),
+            index_col=0
+        )
+
+
+def time_portfolio(portfolio_class, nb_ticks, fixed_point, **kwargs):
+    """
+    Returns the time per tick of update_portfolio, with an open
+    GBP/USD position, and the time taken by output_results.
+    """
+    ticker = TickerMock(["GBPUSD", "EURUSD"])
+    ticker.set_prices("GBPUSD", 1.50328, 1.50349)
+    ticker.set_prices("EURUSD", 1.07832, 1.07847)
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            portfolio = portfolio_class(
+                ticker.fixed if fixed_point else ticker, {},
+                fixed_point=fixed_point, **kwargs
+            )
+            portfolio.add_new_position(
+                "long", "GBPUSD", 2000, portfolio.ticker
+            )
+            events = [
+                TickEvent("GBPUSD", t, None, None) for t in
+                pd.date_range("2014-01-01", periods=nb_ticks, freq="s")
+            ]
+            t0 = time.time()
+            for event in events:
+                portfolio.update_portfolio(event)
+            t1 = time.time()
+            portfolio.output_results()
+            t2 = time.time()
+    return (t1 - t0) / nb_ticks, t2 - t1
+
+
+if __name__ == "__main__":
+    try:
+        nb_ticks = int(sys.argv[1])
+    except IndexError:
+        nb_ticks = 200000
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with mock.patch.object(portfolio_module, "OUTPUT_RESULTS_DIR", tmp_dir):
+            results = [
+                ("CSV line per tick", time_portfolio(CSVPortfolio, nb_ticks, False)),
+                ("recorder", time_portfolio(Portfolio, nb_ticks, False)),
+                ("recorder, fixed point", time_portfolio(Portfolio, nb_ticks, True)),
+                ("recorder, binary file", time_portfolio(
+                    Portfolio, nb_ticks, False, equity_filename="equity.bin"
+                )),
+            ]
+    finally:
+        shutil.rmtree(tmp_dir)
+    print("%-30s %14s %14s %14s" % (
+        "equity curve", "time (us/tick)", "ticks/minute", "output (s)"
+    ))
+    for name, (per_tick, output) in results:
+        print("%-30s %14.2f %14.0f %14.2f" % (
+            name, per_tick * 1e6, 60.0 / per_tick, output
+        ))
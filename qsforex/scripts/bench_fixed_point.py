@@ -0,0 +1,130 @@
+"""
+Benchmarks the cost per tick of the Decimal and fixed-point prices:
+converting the bid and ask of the tick, as the HistoricCSVPriceHandler
+does, and updating an open position (reading the inverse prices).
+
+Usage: python -m qsforex.scripts.bench_fixed_point [nb_ticks]
+"""
+from __future__ import print_function
+
+from decimal import Decimal, getcontext, ROUND_HALF_DOWN
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from qsforex.data.price import HistoricCSVPriceHandler, fixed_point_ticks
+from qsforex.event.event import TickEvent
+from qsforex.portfolio.position import FixedPointPosition, Position
+
+
+class NullQueue(object):
+    def put(self, event):
+        pass
+
+
+def make_ticks(nb_ticks, pair="GBPUSD", seed=42):
+    """
+    Creates a DataFrame of nb_ticks random walk ticks of pair,
+    laid out as the handler reads them.
+    """
+    np.random.seed(seed)
+    mid = 1.5 + np.cumsum(np.random.normal(0.0, 0.00005, nb_ticks))
+    return pd.DataFrame({
+        "Ask": np.round(mid + 0.0001, 5),
+        "Bid": np.round(mid - 0.0001, 5),
+        "Pair": pair,
+    }, index=pd.date_range("2014-01-01", periods=nb_ticks, freq="s"))
+
+
+def create_handler(pairs, fixed_point):
+    handler = HistoricCSVPriceHandler.__new__(HistoricCSVPriceHandler)
+    handler.pairs = pairs
+    handler.events_queue = NullQueue()
+    handler.fixed_point = fixed_point
+    handler.prices = handler._set_up_prices_dict()
+    return handler
+
+
+def decimal_ticks(ticks):
+    """
+    The rows of ticks as (time, pair, bid, ask), without the
+    cost of iterrows.
+    """
+    return zip(
+        ticks.index, ticks["Pair"].tolist(),
+        ticks["Bid"].tolist(), ticks["Ask"].tolist()
+    )
+
+
+def iterrows_ticks(ticks):
+    """
+    The rows of ticks as (time, pair, bid, ask), as iterated
+    by the Decimal handler.
+    """
+    for index, row in ticks.iterrows():
+        yield index, row["Pair"], row["Bid"], row["Ask"]
+
+
+def stream_decimal(handler, position, ticks, rows=decimal_ticks):
+    """
+    The Decimal handler's stream_next_tick, and the position
+    update of each tick.
+    """
+    for index, pair, bid, ask in rows(ticks):
+        getcontext().rounding = ROUND_HALF_DOWN
+        bid = Decimal(str(bid)).quantize(Decimal("0.00001"))
+        ask = Decimal(str(ask)).quantize(Decimal("0.00001"))
+        handler.prices.update(pair, bid, ask, index)
+        handler.events_queue.put(TickEvent(pair, index, bid, ask))
+        position.update_position_price()
+
+
+def stream_fixed_point(handler, position, ticks):
+    """
+    The fixed-point handler's stream_next_tick, including the
+    conversion of the ticks, and the position update of each tick.
+    """
+    for index, pair, bid, ask in fixed_point_ticks(ticks):
+        handler.prices.update(pair, bid, ask, index)
+        handler.events_queue.put(TickEvent(pair, index, bid, ask))
+        position.update_position_price()
+
+
+def time_stream(stream, position_class, ticks, fixed_point):
+    pairs = ["GBPUSD"]
+    handler = create_handler(pairs, fixed_point)
+    # Set the prices the position is opened at
+    stream(handler, NullPosition(), ticks.iloc[:1])
+    position = position_class("GBP", "long", "GBPUSD", 2000, handler)
+    t0 = time.time()
+    stream(handler, position, ticks)
+    return (time.time() - t0) / len(ticks)
+
+
+class NullPosition(object):
+    def update_position_price(self):
+        pass
+
+
+if __name__ == "__main__":
+    try:
+        nb_ticks = int(sys.argv[1])
+    except IndexError:
+        nb_ticks = 500000
+    ticks = make_ticks(nb_ticks)
+    iterrows = time_stream(
+        lambda handler, position, ticks: stream_decimal(
+            handler, position, ticks, iterrows_ticks
+        ), Position, ticks, False
+    )
+    decimal = time_stream(stream_decimal, Position, ticks, False)
+    fixed = time_stream(stream_fixed_point, FixedPointPosition, ticks, True)
+    print("%-30s %14s %8s" % ("prices", "time (us/tick)", "speed up"))
+    for name, per_tick in [
+        ("Decimal (iterrows)", iterrows),
+        ("Decimal (arrays)", decimal),
+        ("fixed point", fixed),
+    ]:
+        print("%-30s %14.2f %7.1fx" % (name, per_tick * 1e6, per_tick / fixed))
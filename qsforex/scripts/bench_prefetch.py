@@ -0,0 +1,100 @@
+"""
+Benchmarks streaming the ticks of several days with the
+HistoricCSVPriceHandler, loading each day when it is reached or
+loading the days ahead on a worker thread (DayPrefetcher), and
+the longest stall of stream_next_tick (at a day boundary).
+
+Usage: python -m qsforex.scripts.bench_prefetch [nb_days] [nb_ticks]
+"""
+from __future__ import print_function
+
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from qsforex import settings
+from qsforex.data.price import HistoricCSVPriceHandler
+
+
+class NullQueue(object):
+    def put(self, event):
+        pass
+
+
+def write_days(csv_dir, pairs, nb_days, nb_ticks, seed=42):
+    """
+    Writes nb_days CSV files of nb_ticks random walk ticks
+    for each pair, in the format of generate_simulated_pair.
+    """
+    np.random.seed(seed)
+    for day in range(nb_days):
+        date = datetime.datetime(2015, 1, 1) + datetime.timedelta(days=day)
+        for pair in pairs:
+            times = date + pd.to_timedelta(
+                np.cumsum(np.random.randint(1, 500, nb_ticks)), unit="ms"
+            )
+            mid = 1.5 + np.cumsum(np.random.normal(0.0, 0.00005, nb_ticks))
+            pd.DataFrame({
+                "Time": times.strftime("%d.%m.%Y %H:%M:%S.%f").str[:-3],
+                "Ask": np.round(mid + 0.0001, 5),
+                "Bid": np.round(mid - 0.0001, 5),
+                "AskVolume": 1.0,
+                "BidVolume": 1.0,
+            }).to_csv(
+                os.path.join(csv_dir, "%s_%s.csv" % (
+                    pair, date.strftime("%Y%m%d")
+                )), index=False, float_format="%0.5f"
+            )
+
+
+def time_stream(pairs, csv_dir, prefetch_days, fixed_point):
+    """
+    Returns the time taken to stream every tick, and the
+    longest call to stream_next_tick.
+    """
+    t0 = time.time()
+    handler = HistoricCSVPriceHandler(
+        pairs, NullQueue(), csv_dir, fixed_point=fixed_point,
+        prefetch_days=prefetch_days
+    )
+    stall = 0.0
+    while handler.continue_backtest:
+        t = time.time()
+        handler.stream_next_tick()
+        stall = max(stall, time.time() - t)
+    return time.time() - t0, stall
+
+
+if __name__ == "__main__":
+    try:
+        nb_days = int(sys.argv[1])
+        nb_ticks = int(sys.argv[2])
+    except IndexError:
+        nb_days = 5
+        nb_ticks = 20000
+    pairs = ["GBPUSD", "EURUSD"]
+    csv_dir = tempfile.mkdtemp()
+    try:
+        write_days(csv_dir, pairs, nb_days, nb_ticks)
+        with mock.patch.object(settings, "CSV_DATA_DIR", csv_dir):
+            print("%-30s %10s %16s" % ("days", "total (s)", "max stall (ms)"))
+            for fixed_point in (False, True):
+                for prefetch_days in (0, 2):
+                    total, stall = time_stream(
+                        pairs, csv_dir, prefetch_days, fixed_point
+                    )
+                    print("%-30s %10.2f %16.1f" % (
+                        "%s, %s" % (
+                            "fixed point" if fixed_point else "Decimal",
+                            "prefetched" if prefetch_days else "on demand"
+                        ), total, stall * 1e3
+                    ))
+    finally:
+        shutil.rmtree(csv_dir)
@@ -10,6 +10,11 @@ class AbstractCompliance(object):
     be required for regulatory or audit (or debugging)
     purposes. Extended versions can write trades to a
     CSV, or a database.
+
+    A compliance may also define on_price(event), which the
+    trading session then calls with every price event, e.g.
+    to write out trades it holds on a timer, and close(), which
+    it calls once the session has ended, even if it failed.
     """
 
     __metaclass__ = ABCMeta
@@ -25,3 +30,10 @@ class AbstractCompliance(object):
         trade that has just been executed.
         """
         raise NotImplementedError("Should implement record_trade()")
+
+    def close(self):
+        """
+        Called once the trading session has ended, so that
+        any trades still held can be written out.
+        """
+        pass
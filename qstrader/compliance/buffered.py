@@ -0,0 +1,154 @@
+import csv
+import datetime
+import os
+import time
+
+from qstrader.price_parser import PriceParser
+
+from .base import AbstractCompliance
+
+FIELDNAMES = [
+    "timestamp", "ticker",
+    "action", "quantity",
+    "exchange", "price",
+    "commission"
+]
+
+
+class BufferedCompliance(AbstractCompliance):
+    """
+    A compliance module which writes trades to a trade log in
+    the output directory, as ExampleCompliance does, but keeps
+    the file open and buffers the trades in memory, writing
+    them out in batches rather than reopening the file for
+    every fill.
+
+    The buffered trades are written once flush_size of them
+    are held, or once flush_interval seconds (of wall clock
+    time) have passed since the last write, if it is set, and
+    when the compliance is closed at the end of the session.
+    The interval is checked on every fill and, through
+    on_price, on every price event of the trading session, so
+    that trades are not held back while no fills arrive.
+
+    The trade log is either a CSV file, with the same layout
+    as that of ExampleCompliance, or, with fmt="parquet", a
+    Parquet file holding one row group per batch, which
+    requires pyarrow to be installed.
+    """
+
+    def __init__(
+        self, config, flush_size=1000, flush_interval=None, fmt="csv"
+    ):
+        """
+        Wipe the existing trade log for the day and open
+        a new one.
+        """
+        if fmt not in ("csv", "parquet"):
+            raise Exception("Unsupported trade log format '%s'" % fmt)
+        self.config = config
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.fmt = fmt
+        today = datetime.datetime.utcnow().date()
+        self.filename = "tradelog_" + today.strftime("%Y-%m-%d") + "." + fmt
+        self.fname = os.path.expanduser(
+            os.path.join(config.OUTPUT_DIR, self.filename)
+        )
+        try:
+            os.remove(self.fname)
+        except (IOError, OSError):
+            print("No tradelog files to clean.")
+
+        self.rows = []
+        self.last_flush = time.time()
+        self.closed = False
+        self._file = None
+        if fmt == "csv":
+            self._file = open(self.fname, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(FIELDNAMES)
+        else:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise Exception(
+                    "Writing the trade log as Parquet requires pyarrow"
+                )
+            self._pa = pyarrow
+
+    def record_trade(self, fill):
+        """
+        Buffers the details of the FillEvent, writing out
+        the buffer if it is due.
+        """
+        self.rows.append((
+            fill.timestamp, fill.ticker,
+            fill.action, fill.quantity,
+            fill.exchange, PriceParser.display(fill.price, 4),
+            PriceParser.display(fill.commission, 4)
+        ))
+        if len(self.rows) >= self.flush_size or self._flush_due():
+            self.flush()
+
+    def _flush_due(self):
+        return (
+            self.flush_interval is not None and
+            time.time() - self.last_flush >= self.flush_interval
+        )
+
+    def on_price(self, event):
+        """
+        Called by the trading session with every price event,
+        writing out the buffered trades if flush_interval has
+        passed since the last write.
+        """
+        if self.rows and self._flush_due():
+            self.flush()
+
+    def flush(self):
+        """
+        Writes out the buffered trades.
+        """
+        if self.closed:
+            raise Exception("The trade log has already been closed")
+        if self.rows:
+            if self.fmt == "csv":
+                self._writer.writerows(self.rows)
+                self._file.flush()
+            else:
+                self._write_parquet()
+            self.rows = []
+        self.last_flush = time.time()
+
+    def _write_parquet(self):
+        """
+        Writes the buffered trades as a row group, opening the
+        Parquet file with the schema of the first batch.
+        """
+        columns = dict(
+            (name, list(values))
+            for name, values in zip(FIELDNAMES, zip(*self.rows))
+        )
+        if self._file is None:
+            table = self._pa.Table.from_pydict(columns)
+            self._file = self._pa.parquet.ParquetWriter(
+                self.fname, table.schema
+            )
+        else:
+            table = self._pa.Table.from_pydict(
+                columns, schema=self._file.schema
+            )
+        self._file.write_table(table)
+
+    def close(self):
+        """
+        Writes out any buffered trades and closes the trade log.
+        """
+        if self.closed:
+            return
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+        self.closed = True
@@ -0,0 +1,20 @@
+from .base import AbstractCompliance
+
+
+class NullCompliance(AbstractCompliance):
+    """
+    A compliance module which discards every trade.
+
+    It is used where many backtests run side by side, such as
+    parameter sweeps, so that they do not all write to (and
+    wipe) the same trade log.
+    """
+
+    def __init__(self, config=None):
+        self.config = config
+
+    def record_trade(self, fill):
+        """
+        Ignores the FillEvent.
+        """
+        pass
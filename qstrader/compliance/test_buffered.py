@@ -0,0 +1,119 @@
+"""
+Test the buffered compliance writes the same trade log
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+import pandas as pd
+
+from qstrader.compliance.buffered import BufferedCompliance
+from qstrader.compliance.example import ExampleCompliance
+from qstrader.event import FillEvent
+from qstrader.price_parser import PriceParser
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+def make_fills(nb_fills):
+    times = pd.date_range("2016-01-04 09:30", periods=nb_fills, freq="min")
+    return [
+        FillEvent(
+            time, "GOOG", "BOT" if i % 2 else "SLD", 100, "ARCA",
+            PriceParser.parse(101.25 + 0.01 * i), PriceParser.parse(1.3)
+        )
+        for i, time in enumerate(times)
+    ]
+
+
+class TestBufferedCompliance(unittest.TestCase):
+    def setUp(self):
+        self.dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        self.fills = make_fills(250)
+
+    def tearDown(self):
+        for outdir in self.dirs:
+            shutil.rmtree(outdir)
+
+    def test_same_trade_log(self):
+        example = ExampleCompliance(munchify({"OUTPUT_DIR": self.dirs[0]}))
+        buffered = BufferedCompliance(
+            munchify({"OUTPUT_DIR": self.dirs[1]}), flush_size=100
+        )
+        for fill in self.fills:
+            example.record_trade(fill)
+            buffered.record_trade(fill)
+        # The last 50 fills are only held in memory until closed
+        self.assertEqual(len(buffered.rows), 50)
+        buffered.close()
+        with self.assertRaises(Exception):
+            buffered.flush()
+
+        logs = []
+        for outdir in self.dirs:
+            with open(os.path.join(outdir, example.csv_filename)) as f:
+                logs.append(f.read())
+        self.assertEqual(logs[0], logs[1])
+        self.assertEqual(len(logs[1].splitlines()), len(self.fills) + 1)
+
+    def test_flush_interval(self):
+        buffered = BufferedCompliance(
+            munchify({"OUTPUT_DIR": self.dirs[0]}),
+            flush_size=1000, flush_interval=0
+        )
+        buffered.record_trade(self.fills[0])
+        self.assertEqual(buffered.rows, [])
+        buffered.close()
+
+    def test_flush_interval_without_fills(self):
+        buffered = BufferedCompliance(
+            munchify({"OUTPUT_DIR": self.dirs[0]}),
+            flush_size=1000, flush_interval=3600
+        )
+        buffered.record_trade(self.fills[0])
+        buffered.on_price(None)
+        self.assertEqual(len(buffered.rows), 1)
+        # The interval passes with no other fill
+        buffered.flush_interval = 0
+        buffered.on_price(None)
+        self.assertEqual(buffered.rows, [])
+        with open(buffered.fname) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        buffered.close()
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet(self):
+        example = ExampleCompliance(munchify({"OUTPUT_DIR": self.dirs[0]}))
+        buffered = BufferedCompliance(
+            munchify({"OUTPUT_DIR": self.dirs[1]}), flush_size=100,
+            fmt="parquet"
+        )
+        for fill in self.fills:
+            example.record_trade(fill)
+            buffered.record_trade(fill)
+        buffered.close()
+
+        # One row group per batch of trades written out
+        parquet_file = pq.ParquetFile(buffered.fname)
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        df = parquet_file.read().to_pandas()
+        expected = pd.read_csv(
+            os.path.join(self.dirs[0], example.csv_filename),
+            parse_dates=["timestamp"]
+        )
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(len(df), len(self.fills))
+        for column in expected.columns:
+            self.assertEqual(
+                [str(v) for v in df[column]],
+                [str(v) for v in expected[column]]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,13 +5,37 @@ from enum import Enum
 
 EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL SENTIMENT")
 
+# Human-readable names of the common bar periods, in seconds
+PERIOD_LUT = {
+    1: "1sec",
+    5: "5sec",
+    10: "10sec",
+    15: "15sec",
+    30: "30sec",
+    60: "1min",
+    300: "5min",
+    600: "10min",
+    900: "15min",
+    1800: "30min",
+    3600: "1hr",
+    86400: "1day",
+    604800: "1wk"
+}
+
 
 class Event(object):
     """
     Event is base class providing an interface for all subsequent
     (inherited) events, that will trigger further events in the
     trading infrastructure.
+
+    Events are created for every tick or bar of a backtest, so
+    each subclass lists its attributes in __slots__ rather than
+    keeping a per-instance __dict__, and holds its type as a
+    class attribute.
     """
+    __slots__ = ()
+
     @property
     def typename(self):
         return self.type.name
@@ -23,6 +47,9 @@ class TickEvent(Event):
     which is defined as a ticker symbol and associated best
     bid and ask from the top of the order book.
     """
+    type = EventType.TICK
+    __slots__ = ("ticker", "time", "bid", "ask")
+
     def __init__(self, ticker, time, bid, ask):
         """
         Initialises the TickEvent.
@@ -33,7 +60,6 @@ class TickEvent(Event):
         bid - The best bid price at the time of the tick.
         ask - The best ask price at the time of the tick.
         """
-        self.type = EventType.TICK
         self.ticker = ticker
         self.time = time
         self.bid = bid
@@ -55,6 +81,13 @@ class BarEvent(Event):
     open-high-low-close-volume bar, as would be generated
     via common data providers such as Yahoo Finance.
     """
+    type = EventType.BAR
+    __slots__ = (
+        "ticker", "time", "period",
+        "open_price", "high_price", "low_price",
+        "close_price", "volume", "adj_close_price", "signal"
+    )
+
     def __init__(
         self, ticker, time, period,
         open_price, high_price, low_price,
@@ -79,7 +112,6 @@ class BarEvent(Event):
         of 'open_price', 'close_price' as 'open' is a reserved
         word in Python.
         """
-        self.type = EventType.BAR
         self.ticker = ticker
         self.time = time
         self.period = period
@@ -89,9 +121,16 @@ class BarEvent(Event):
         self.close_price = close_price
         self.volume = volume
         self.adj_close_price = adj_close_price
-        self.period_readable = self._readable_period()
         self.signal = signal
 
+    @property
+    def period_readable(self):
+        """
+        The human-readable period, see _readable_period, which
+        is only looked up when it is used (e.g. by __str__).
+        """
+        return self._readable_period()
+
     def _readable_period(self):
         """
         Creates a human-readable period from the number
@@ -107,25 +146,10 @@ class BarEvent(Event):
         readable period is simply passed through from period,
         in seconds.
         """
-        lut = {
-            1: "1sec",
-            5: "5sec",
-            10: "10sec",
-            15: "15sec",
-            30: "30sec",
-            60: "1min",
-            300: "5min",
-            600: "10min",
-            900: "15min",
-            1800: "30min",
-            3600: "1hr",
-            86400: "1day",
-            604800: "1wk"
-        }
-        if self.period in lut:
-            return lut[self.period]
-        else:
+        period = PERIOD_LUT.get(self.period)
+        if period is None:
             return "%ssec" % str(self.period)
+        return period
 
     def __str__(self):
         format_str = "Type: %s, Ticker: %s, Time: %s, Period: %s, " \
@@ -148,6 +172,9 @@ class SignalEvent(Event):
     Handles the event of sending a Signal from a Strategy object.
     This is received by a Portfolio object and acted upon.
     """
+    type = EventType.SIGNAL
+    __slots__ = ("ticker", "action", "suggested_quantity")
+
     def __init__(self, ticker, action, suggested_quantity=None):
         """
         Initialises the SignalEvent.
@@ -160,7 +187,6 @@ class SignalEvent(Event):
             of an asset to transact in, which is used by the
             PositionSizer and RiskManager.
         """
-        self.type = EventType.SIGNAL
         self.ticker = ticker
         self.action = action
         self.suggested_quantity = suggested_quantity
@@ -172,6 +198,9 @@ class OrderEvent(Event):
     The order contains a ticker (e.g. GOOG), action (BOT or SLD)
     and quantity.
     """
+    type = EventType.ORDER
+    __slots__ = ("ticker", "action", "quantity")
+
     def __init__(self, ticker, action, quantity):
         """
         Initialises the OrderEvent.
@@ -181,7 +210,6 @@ class OrderEvent(Event):
         action - 'BOT' (for long) or 'SLD' (for short).
         quantity - The quantity of shares to transact.
         """
-        self.type = EventType.ORDER
         self.ticker = ticker
         self.action = action
         self.quantity = quantity
@@ -208,6 +236,11 @@ class FillEvent(Event):
     different prices. This will be simulated by averaging
     the cost.
     """
+    type = EventType.FILL
+    __slots__ = (
+        "timestamp", "ticker", "action", "quantity",
+        "exchange", "price", "commission"
+    )
 
     def __init__(
         self, timestamp, ticker,
@@ -226,7 +259,6 @@ class FillEvent(Event):
         price - The price at which the trade was filled
         commission - The brokerage commission for carrying out the trade.
         """
-        self.type = EventType.FILL
         self.timestamp = timestamp
         self.ticker = ticker
         self.action = action
@@ -242,6 +274,9 @@ class SentimentEvent(Event):
     with a ticker. Can be used for a generic "date-ticker-sentiment"
     service, often provided by many data vendors.
     """
+    type = EventType.SENTIMENT
+    __slots__ = ("timestamp", "ticker", "sentiment")
+
     def __init__(self, timestamp, ticker, sentiment):
         """
         Initialises the SentimentEvent.
@@ -252,7 +287,6 @@ class SentimentEvent(Event):
         sentiment - A string, float or integer value of "sentiment",
             e.g. "bullish", -1, 5.4, etc.
         """
-        self.type = EventType.SENTIMENT
         self.timestamp = timestamp
         self.ticker = ticker
         self.sentiment = sentiment
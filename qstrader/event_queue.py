@@ -0,0 +1,41 @@
+from collections import deque
+
+from .compat import queue
+
+
+class EventDeque(object):
+    """
+    EventDeque is a backtest-only replacement for queue.Queue
+    as the events queue of a TradingSession.
+
+    It exposes the subset of the queue.Queue interface used by
+    the components (put, get, empty, qsize), backed by a
+    collections.deque. There is no locking, as appends and pops
+    of a deque are atomic and a backtest runs in a single thread,
+    and get raises queue.Empty in the same manner as queue.Queue
+    so that it can be passed to any existing component.
+    """
+    def __init__(self):
+        self._events = deque()
+        self.put = self._events.append
+        self.popleft = self._events.popleft
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the oldest event, raising
+        queue.Empty if there are none. As the deque is
+        never filled by another thread, it does not block.
+        """
+        try:
+            return self._events.popleft()
+        except IndexError:
+            raise queue.Empty
+
+    def empty(self):
+        return not self._events
+
+    def qsize(self):
+        return len(self._events)
+
+    def __len__(self):
+        return len(self._events)
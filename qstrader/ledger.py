@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+from .position import Position
+
+# The integer attributes of a Position, in the order they are set
+POSITION_FIELDS = (
+    "quantity", "init_price", "init_commission",
+    "realised_pnl", "unrealised_pnl",
+    "buys", "sells", "avg_bot", "avg_sld",
+    "total_bot", "total_sld", "total_commission",
+    "avg_price", "cost_basis",
+    "net", "net_total", "net_incl_comm", "market_value"
+)
+
+ACTIONS = ("BOT", "SLD")
+
+POSITION_DTYPE = np.dtype(
+    [("action", np.int8)] + [(name, np.int64) for name in POSITION_FIELDS]
+)
+
+
+def _grow(array, size):
+    """
+    Returns array with room for at least size rows,
+    doubling its capacity as often as required.
+    """
+    capacity = max(len(array), 1)
+    if size <= capacity:
+        return array
+    while capacity < size:
+        capacity *= 2
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class _TickerCodes(object):
+    """
+    Assigns a stable integer id to each ticker symbol.
+    """
+    def __init__(self):
+        self.tickers = []
+        self.ids = {}
+
+    def get_id(self, ticker):
+        ticker_id = self.ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = len(self.tickers)
+            self.ids[ticker] = ticker_id
+            self.tickers.append(ticker)
+        return ticker_id
+
+
+class PositionView(object):
+    """
+    The open position in a ticker of a PositionLedger, exposing
+    the attributes and methods of a Position, read from and
+    written to the ledger's arrays.
+    """
+    def __init__(self, ledger, ticker, ticker_id):
+        self.__dict__["_ledger"] = ledger
+        self.__dict__["ticker"] = ticker
+        self.__dict__["_id"] = ticker_id
+
+    def __getattr__(self, name):
+        data = self._ledger.data
+        if name == "action":
+            return ACTIONS[data["action"][self._id]]
+        if name in POSITION_DTYPE.names:
+            return data[name][self._id]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        data = self._ledger.data
+        if name == "action":
+            data["action"][self._id] = ACTIONS.index(value)
+        elif name in POSITION_DTYPE.names:
+            data[name][self._id] = value
+        else:
+            raise AttributeError(name)
+
+    def to_position(self):
+        """
+        Returns the position as a (detached) Position object.
+        """
+        position = Position.__new__(Position)
+        row = self._ledger.data[self._id]
+        position.__dict__.update(
+            (name, row[name].item()) for name in POSITION_FIELDS
+        )
+        position.action = ACTIONS[row["action"]]
+        position.ticker = self.ticker
+        return position
+
+    def update_market_value(self, bid, ask):
+        """
+        See Position.update_market_value.
+        """
+        data = self._ledger.data
+        i = self._id
+        midpoint = (bid + ask) // 2
+        market_value = (
+            data["quantity"][i] * midpoint * np.sign(data["net"][i])
+        )
+        data["market_value"][i] = market_value
+        data["unrealised_pnl"][i] = market_value - data["cost_basis"][i]
+
+    def transact_shares(self, action, quantity, price, commission):
+        """
+        See Position.transact_shares, which is applied to a
+        Position holding the values of the ledger.
+        """
+        position = self.to_position()
+        position.transact_shares(action, quantity, price, commission)
+        self._ledger._store(self._id, position)
+
+
+class PositionLedger(object):
+    """
+    PositionLedger holds the open positions of a Portfolio as one
+    row per ticker of a structured NumPy array, rather than as a
+    dict of Position objects, and is used as Portfolio.positions
+    by the ledger backend.
+
+    It behaves as a dict mapping each ticker with an open position
+    to a PositionView. Positions are added as Position objects,
+    whose values are copied into the array, and popped back out
+    as Position objects once they are closed.
+    """
+    def __init__(self, capacity=64):
+        self.codes = _TickerCodes()
+        self.data = np.zeros(capacity, dtype=POSITION_DTYPE)
+        self.is_open = np.zeros(capacity, dtype=bool)
+        self._views = {}
+
+    def _store(self, ticker_id, position):
+        row = self.data[ticker_id]
+        row["action"] = ACTIONS.index(position.action)
+        for name in POSITION_FIELDS:
+            row[name] = getattr(position, name)
+
+    def __setitem__(self, ticker, position):
+        ticker_id = self.codes.get_id(ticker)
+        self.data = _grow(self.data, ticker_id + 1)
+        self.is_open = _grow(self.is_open, ticker_id + 1)
+        self._store(ticker_id, position)
+        self.is_open[ticker_id] = True
+        self._views[ticker] = PositionView(self, ticker, ticker_id)
+
+    def __getitem__(self, ticker):
+        return self._views[ticker]
+
+    def get(self, ticker, default=None):
+        return self._views.get(ticker, default)
+
+    def pop(self, ticker):
+        """
+        Closes the position in ticker, returning it as a Position.
+        """
+        view = self._views.pop(ticker)
+        position = view.to_position()
+        self.data[view._id] = 0
+        self.is_open[view._id] = False
+        return position
+
+    def __contains__(self, ticker):
+        return ticker in self._views
+
+    def __iter__(self):
+        return iter(list(self._views))
+
+    def __len__(self):
+        return len(self._views)
+
+    def keys(self):
+        return list(self._views)
+
+    def values(self):
+        return list(self._views.values())
+
+    def items(self):
+        return list(self._views.items())
+
+
+class TradeTable(object):
+    """
+    TradeTable is a columnar record of closed positions, used as
+    Portfolio.closed_positions by the ledger backend.
+
+    Each closed position is appended as a row of a preallocated
+    structured NumPy array, which doubles in size when full, so
+    that a strategy making hundreds of thousands of round trips
+    does not keep a Position object alive for each of them, and
+    the trades can be turned into a DataFrame in one go.
+    """
+    def __init__(self, capacity=1024):
+        self.codes = _TickerCodes()
+        self.data = np.zeros(capacity, dtype=POSITION_DTYPE)
+        self.ticker_ids = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def append(self, position):
+        """
+        Appends a closed Position (or PositionView) to the table.
+        """
+        i = self.size
+        self.data = _grow(self.data, i + 1)
+        self.ticker_ids = _grow(self.ticker_ids, i + 1)
+        row = self.data[i]
+        row["action"] = ACTIONS.index(position.action)
+        for name in POSITION_FIELDS:
+            row[name] = getattr(position, name)
+        self.ticker_ids[i] = self.codes.get_id(position.ticker)
+        self.size = i + 1
+
+    def __len__(self):
+        return self.size
+
+    def to_frame(self):
+        """
+        Returns the closed positions as a DataFrame, with one
+        column per Position attribute, as integer prices.
+        """
+        data = self.data[:self.size]
+        df = pd.DataFrame({
+            "action": np.asarray(ACTIONS, dtype=object)[data["action"]],
+            "ticker": np.asarray(
+                self.codes.tickers, dtype=object
+            )[self.ticker_ids[:self.size]],
+        })
+        for name in POSITION_FIELDS:
+            df[name] = data[name]
+        return df
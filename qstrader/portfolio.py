@@ -1,8 +1,9 @@
+from .ledger import PositionLedger, TradeTable
 from .position import Position
 
 
 class Portfolio(object):
-    def __init__(self, price_handler, cash):
+    def __init__(self, price_handler, cash, debug=False, ledger=False):
         """
         On creation, the Portfolio object contains no
         positions and all values are "reset" to the initial
@@ -11,14 +12,37 @@ class Portfolio(object):
         Note that realised_pnl is the running tally pnl from closed
         positions (closed_pnl), as well as realised_pnl
         from currently open positions.
+
+        If debug is True every incremental update of a single
+        position is checked against a full revaluation.
+
+        If ledger is True the open positions are held in a
+        PositionLedger and the closed positions in a TradeTable,
+        both array backed, rather than as Position objects.
         """
         self.price_handler = price_handler
         self.init_cash = cash
         self.equity = cash
         self.cur_cash = cash
-        self.positions = {}
-        self.closed_positions = []
+        if ledger:
+            self.positions = PositionLedger()
+            self.closed_positions = TradeTable()
+        else:
+            self.positions = {}
+            self.closed_positions = []
         self.realised_pnl = 0
+        self.unrealised_pnl = 0
+        self.debug = debug
+
+    def _get_bid_ask(self, ticker):
+        """
+        Returns the latest bid and ask of ticker, both
+        being the last close for a bar price handler.
+        """
+        if self.price_handler.istick():
+            return self.price_handler.get_best_bid_ask(ticker)
+        close_price = self.price_handler.get_last_close(ticker)
+        return close_price, close_price
 
     def _update_portfolio(self):
         """
@@ -31,18 +55,51 @@ class Portfolio(object):
 
         for ticker in self.positions:
             pt = self.positions[ticker]
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             pt.update_market_value(bid, ask)
             self.unrealised_pnl += pt.unrealised_pnl
             self.equity += (
                 pt.market_value - pt.cost_basis + pt.realised_pnl
             )
 
+    def _update_position(self, ticker):
+        """
+        Updates the value of the position in ticker alone, if
+        there is one, after a change in the price of ticker.
+
+        Only the market value of the position changes, so the
+        difference is applied to the running equity and unrealised
+        PnL, rather than revaluing every other open position.
+        """
+        pt = self.positions.get(ticker)
+        if pt is None:
+            return
+        market_value = pt.market_value
+        unrealised_pnl = pt.unrealised_pnl
+        bid, ask = self._get_bid_ask(ticker)
+        pt.update_market_value(bid, ask)
+        self.unrealised_pnl += pt.unrealised_pnl - unrealised_pnl
+        self.equity += pt.market_value - market_value
+        if self.debug:
+            self._check_portfolio()
+
+    def _check_portfolio(self):
+        """
+        Checks the running equity and unrealised PnL against a
+        full revaluation of every open position.
+        """
+        equity = self.equity
+        unrealised_pnl = self.unrealised_pnl
+        self._update_portfolio()
+        if equity != self.equity or unrealised_pnl != self.unrealised_pnl:
+            raise Exception(
+                "Incremental portfolio update (equity %s, unrealised "
+                "PnL %s) does not match the full revaluation (equity %s, "
+                "unrealised PnL %s)" % (
+                    equity, unrealised_pnl, self.equity, self.unrealised_pnl
+                )
+            )
+
     def _add_position(
         self, action, ticker,
         quantity, price, commission
@@ -57,12 +114,7 @@ class Portfolio(object):
         are updated.
         """
         if ticker not in self.positions:
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             position = Position(
                 action, ticker, quantity,
                 price, commission, bid, ask
@@ -92,12 +144,7 @@ class Portfolio(object):
             self.positions[ticker].transact_shares(
                 action, quantity, price, commission
             )
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             self.positions[ticker].update_market_value(bid, ask)
 
             if self.positions[ticker].quantity == 0:
@@ -5,7 +5,8 @@ from .portfolio import Portfolio
 class PortfolioHandler(object):
     def __init__(
         self, initial_cash, events_queue,
-        price_handler, position_sizer, risk_manager
+        price_handler, position_sizer, risk_manager,
+        debug=False, ledger=False
     ):
         """
         The PortfolioHandler is designed to interact with the
@@ -24,13 +25,20 @@ class PortfolioHandler(object):
         The PortfolioHandler also takes a handle to the
         RiskManager, which is used to modify any generated
         Orders to remain in line with risk parameters.
+
+        If debug is True the incremental updates of the
+        Portfolio value are checked against a full revaluation,
+        and if ledger is True the Portfolio uses the array backed
+        ledger of positions (see Portfolio).
         """
         self.initial_cash = initial_cash
         self.events_queue = events_queue
         self.price_handler = price_handler
         self.position_sizer = position_sizer
         self.risk_manager = risk_manager
-        self.portfolio = Portfolio(price_handler, initial_cash)
+        self.portfolio = Portfolio(
+            price_handler, initial_cash, debug=debug, ledger=ledger
+        )
 
     def _create_order_from_signal(self, signal_event):
         """
@@ -120,9 +128,15 @@ class PortfolioHandler(object):
         """
         self._convert_fill_to_portfolio_update(fill_event)
 
-    def update_portfolio_value(self):
+    def update_portfolio_value(self, ticker=None):
         """
         Update the portfolio to reflect current market value as
         based on last bid/ask of each ticker.
+
+        If a ticker is given only its price is assumed to have
+        changed, and only its position is revalued.
         """
-        self.portfolio._update_portfolio()
+        if ticker is None:
+            self.portfolio._update_portfolio()
+        else:
+            self.portfolio._update_position(ticker)
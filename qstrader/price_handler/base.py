@@ -25,13 +25,34 @@ class AbstractPriceHandler(object):
         """
         try:
             self.tickers.pop(ticker, None)
-            self.tickers_data.pop(ticker, None)
+            if hasattr(self, "tickers_data"):
+                self.tickers_data.pop(ticker, None)
+            if hasattr(self, "tickers_columns"):
+                self.tickers_columns.pop(ticker, None)
         except KeyError:
             print(
                 "Could not unsubscribe ticker %s "
                 "as it was never subscribed." % ticker
             )
 
+    def next_event_time(self):
+        """
+        Returns the time of the next price event to be streamed,
+        as an integer (nanoseconds since the epoch for dated
+        events), or None once there are none left. Only handlers
+        replaying a known history can look ahead.
+        """
+        raise NotImplementedError("Should implement next_event_time()")
+
+    def clone(self, events_queue):
+        """
+        Returns a new handler streaming the same prices from the
+        start into events_queue, e.g. for each backtest of a
+        parameter sweep. Only handlers replaying a known history
+        can be cloned.
+        """
+        raise NotImplementedError("Should implement clone()")
+
     def get_last_timestamp(self, ticker):
         """
         Returns the most recent actual timestamp for a given ticker
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .iterator.replay import BarColumns, TickColumns, datetime_ns
+
+
+class PriceCache(object):
+    """
+    PriceCache keeps a binary, columnar copy of each ticker's price
+    CSV file in cache_dir, so that the CSV only has to be parsed
+    (dates and all) the first time it is subscribed to.
+
+    Each ticker is stored as a fixed-width file of little-endian
+    int64 columns, one after another: the timestamps in nanoseconds,
+    the prices already multiplied by PriceParser.PRICE_MULTIPLIER,
+    any other integer fields (e.g. volume) and a validity flag per
+    row. A JSON file alongside records the layout together with the
+    size, modification time and SHA-1 hash of the source CSV.
+
+    Later runs open the binary file with numpy.memmap and replay
+    directly from it. A cached file is used while the source size
+    and modification time are unchanged. If only the modification
+    time has changed, the source is hashed and the cache is kept if
+    the hash still matches. Any other change rebuilds the cache.
+    Setting check_hash hashes the source on every open.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir, check_hash=False):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.check_hash = check_hash
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def load_bars(self, source_path, ticker, read_frame, adj_close_col="Adj Close"):
+        """
+        Returns the BarColumns of ticker, read from the cache, or
+        built from the DataFrame returned by read_frame() (and then
+        cached) if the cache is missing or stale.
+        """
+        return self._load(
+            BarColumns, source_path, ticker,
+            lambda: BarColumns.from_frame(
+                read_frame(), ticker=ticker, adj_close_col=adj_close_col
+            )
+        )
+
+    def load_ticks(self, source_path, ticker, read_frame):
+        """
+        Returns the TickColumns of ticker, read from the cache, or
+        built from the DataFrame returned by read_frame() (and then
+        cached) if the cache is missing or stale.
+        """
+        return self._load(
+            TickColumns, source_path, ticker,
+            lambda: TickColumns.from_frame(read_frame(), ticker=ticker)
+        )
+
+    def _paths(self, source_path, kind):
+        """
+        Returns the binary and JSON cache paths of a source file.
+        The absolute source path is hashed into the name so that
+        files of the same name in different directories differ.
+        """
+        source_path = os.path.abspath(source_path)
+        name = "%s-%s.%s" % (
+            os.path.basename(source_path),
+            hashlib.sha1(source_path.encode("utf-8")).hexdigest()[:12],
+            kind
+        )
+        base = os.path.join(self.cache_dir, name)
+        return base + ".bin", base + ".json"
+
+    def _source_info(self, source_path):
+        stat = os.stat(source_path)
+        return {
+            "path": os.path.abspath(source_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime
+        }
+
+    def _hash(self, source_path):
+        sha1 = hashlib.sha1()
+        with open(source_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(block)
+        return sha1.hexdigest()
+
+    def _is_fresh(self, meta, kind, columns, source_path, info):
+        """
+        Checks whether the cached layout and source file match,
+        updating the recorded modification time if the source was
+        only touched. Returns whether the cache is fresh and whether
+        its modification time was updated.
+        """
+        if (
+            meta.get("version") != self.VERSION or
+            meta.get("kind") != kind or
+            meta.get("columns") != columns
+        ):
+            return False, False
+        source = meta["source"]
+        if source["size"] != info["size"]:
+            return False, False
+        touched = source["mtime"] != info["mtime"]
+        if not touched and not self.check_hash:
+            return True, False
+        if source["sha1"] != self._hash(source_path):
+            return False, False
+        source["mtime"] = info["mtime"]
+        return True, touched
+
+    def _load(self, cls, source_path, ticker, build):
+        kind = cls.__name__
+        columns = ["time"] + list(cls.arrays) + ["valid"]
+        bin_path, meta_path = self._paths(source_path, kind)
+        info = self._source_info(source_path)
+        meta = None
+        if os.path.exists(bin_path) and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            fresh, touched = self._is_fresh(
+                meta, kind, columns, source_path, info
+            )
+            if fresh:
+                if touched:
+                    self._write_meta(meta_path, meta)
+                return self._open(cls, bin_path, meta, ticker)
+        block = build()
+        info["sha1"] = self._hash(source_path)
+        meta = {
+            "version": self.VERSION,
+            "kind": kind,
+            "columns": columns,
+            "rows": len(block),
+            "source": info
+        }
+        self._write(bin_path, block, columns)
+        self._write_meta(meta_path, meta)
+        return self._open(cls, bin_path, meta, ticker)
+
+    def _tmp_path(self, path):
+        """
+        A temporary file name of its own for each process and
+        thread writing path, so that concurrent writers of the
+        same cache entry do not write into the same file.
+        """
+        return "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+
+    def _write(self, bin_path, block, columns):
+        """
+        Writes the columns of block one after another as
+        little-endian int64, replacing the file atomically.
+        """
+        tmp_path = self._tmp_path(bin_path)
+        with open(tmp_path, "wb") as f:
+            for col in columns:
+                if col == "time":
+                    values = datetime_ns(pd.DatetimeIndex(block.index))
+                else:
+                    values = getattr(block, col)
+                np.ascontiguousarray(values, dtype="<i8").tofile(f)
+        os.replace(tmp_path, bin_path)
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = self._tmp_path(meta_path)
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _open(self, cls, bin_path, meta, ticker):
+        """
+        Memory-maps the binary file and returns its columns as a
+        block of type cls. The price arrays remain memory-mapped.
+        """
+        columns = meta["columns"]
+        rows = meta["rows"]
+        if rows == 0:
+            data = np.zeros((len(columns), 0), dtype="<i8")
+        else:
+            data = np.memmap(
+                bin_path, dtype="<i8", mode="r",
+                shape=(len(columns), rows)
+            )
+        values = dict(zip(columns, data))
+        arrays = dict((name, values[name]) for name in cls.arrays)
+        return cls(
+            pd.DatetimeIndex(values["time"].view("datetime64[ns]")),
+            [ticker], np.zeros(rows, dtype=np.int64),
+            valid=values["valid"].astype(bool), **arrays
+        )
@@ -26,6 +26,9 @@ class AbstractGenericHandler(AbstractPriceHandler):
         self._store_event(price_event)
         self.events_queue.put(price_event)
 
+    def next_event_time(self):
+        return self.price_event_iterator.peek_time()
+
     @property
     def tickers_lst(self):
         return self.price_event_iterator.tickers_lst
@@ -1,12 +1,17 @@
 from __future__ import print_function
 
+import copy
 import os
 
 import pandas as pd
 
 from .base import AbstractTickPriceHandler
-from ..event import TickEvent
-from ..price_parser import PriceParser
+from .cache import PriceCache
+from .iterator.replay import (
+    TickColumns, TickReplayEventIterator, MergedReplayEventIterator,
+    CsvReplayBlocks, slice_dates
+)
+from ..exception import EmptyTickEvent
 
 
 class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
@@ -15,17 +20,32 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
     tick data for each requested financial instrument and
     stream those to the provided events queue as TickEvents.
     """
-    def __init__(self, csv_dir, events_queue, init_tickers=None):
+    def __init__(
+        self, csv_dir, events_queue, init_tickers=None, cache_dir=None,
+        chunksize=65536
+    ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols, then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If a cache_dir is given the CSV files are cached there
+        in a binary form (see PriceCache) for subsequent runs.
+        Otherwise each CSV file is read chunksize rows at a time
+        as its ticks are streamed (see CsvReplayBlocks). Its rows
+        must then be in time order, or out of order from its first
+        chunk (e.g. in reverse order), in which case the whole file
+        is read and sorted, as with a cache.
         """
         self.csv_dir = csv_dir
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
-        self.tickers_data = {}
+        self.tickers_columns = {}
+        self.chunksize = chunksize
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = PriceCache(cache_dir)
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
@@ -34,28 +54,63 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
     def _open_ticker_price_csv(self, ticker):
         """
         Opens the CSV files containing the equities ticks from
-        the specified CSV data directory, converting them into
-        them into a pandas DataFrame, stored in a dictionary.
+        the specified CSV data directory, keeping the columnar
+        blocks of their ticks, read chunk by chunk as they are
+        replayed, in a dictionary.
+
+        If a cache is used the columnar form of the whole file
+        is read from the (memory-mapped) cache instead.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
-        self.tickers_data[ticker] = pd.io.parsers.read_csv(
-            ticker_path, header=0, parse_dates=True,
-            dayfirst=True, index_col=1,
-            names=("Ticker", "Time", "Bid", "Ask")
-        )
+
+        def read_frame(**kwargs):
+            return pd.io.parsers.read_csv(
+                ticker_path, header=0, parse_dates=True,
+                dayfirst=True, index_col=1,
+                names=("Ticker", "Time", "Bid", "Ask"), **kwargs
+            )
+
+        if self.cache is None:
+            self.tickers_columns[ticker] = CsvReplayBlocks(
+                [ticker], lambda: read_frame(chunksize=self.chunksize),
+                lambda df: TickColumns.from_frame(df, ticker=ticker)
+            )
+        else:
+            self.tickers_columns[ticker] = self.cache.load_ticks(
+                ticker_path, ticker, read_frame
+            )
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Creates a replay iterator over each ticker's ticks and
+        merges them into a single stream, ordered by timestamp
+        and then ticker, allowing tick data events to be added to
+        the queue in a chronological and deterministic fashion.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        return pd.concat(
-            self.tickers_data.values()
-        ).sort_index().iterrows()
+        return MergedReplayEventIterator([
+            TickReplayEventIterator(
+                slice_dates(self.tickers_columns[ticker]), tickers=[ticker]
+            ) for ticker in sorted(self.tickers_columns)
+        ])
+
+    def clone(self, events_queue):
+        """
+        Returns a new handler streaming the same ticks from the
+        start into events_queue. The cached columns are shared
+        with this handler rather than copied, while the CSV files
+        read chunk by chunk are read again by the new handler.
+        """
+        handler = copy.copy(self)
+        handler.events_queue = events_queue
+        handler.continue_backtest = True
+        handler.tickers = dict(
+            (ticker, dict(prices)) for ticker, prices in self.tickers.items()
+        )
+        handler.tick_stream = handler._merge_sort_ticker_data()
+        return handler
 
     def subscribe_ticker(self, ticker):
         """
@@ -64,12 +119,13 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         if ticker not in self.tickers:
             try:
                 self._open_ticker_price_csv(ticker)
-                dft = self.tickers_data[ticker]
-                row0 = dft.iloc[0]
+                ticks = self.tickers_columns[ticker]
+                if isinstance(ticks, CsvReplayBlocks):
+                    ticks = ticks.first_block()
                 ticker_prices = {
-                    "bid": PriceParser.parse(row0["Bid"]),
-                    "ask": PriceParser.parse(row0["Ask"]),
-                    "timestamp": dft.index[0]
+                    "bid": ticks.bid.item(0),
+                    "ask": ticks.ask.item(0),
+                    "timestamp": ticks.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
             except OSError:
@@ -83,26 +139,23 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
                 "as is already subscribed." % ticker
             )
 
-    def _create_event(self, index, ticker, row):
+    def next_event_time(self):
         """
-        Obtain all elements of the bar a row of dataframe
-        and return a TickEvent
+        Returns the time of the next tick to be streamed, as
+        nanoseconds since the epoch, or None at the end of the data.
         """
-        bid = PriceParser.parse(row["Bid"])
-        ask = PriceParser.parse(row["Ask"])
-        tev = TickEvent(ticker, index, bid, ask)
-        return tev
+        return self.tick_stream.peek_time()
 
     def stream_next(self):
         """
         Place the next TickEvent onto the event queue.
         """
         try:
-            index, row = next(self.tick_stream)
+            tev = next(self.tick_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        ticker = row["Ticker"]
-        tev = self._create_event(index, ticker, row)
+        except EmptyTickEvent:
+            return
         self._store_event(tev)
         self.events_queue.put(tev)
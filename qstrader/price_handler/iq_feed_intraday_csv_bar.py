@@ -1,10 +1,15 @@
+import copy
 import os
 
 import pandas as pd
 
-from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
-from ..event import BarEvent
+from .cache import PriceCache
+from .iterator.replay import (
+    BarColumns, BarReplayEventIterator, MergedReplayEventIterator,
+    CsvReplayBlocks, slice_dates
+)
+from ..exception import EmptyBarEvent
 
 
 class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
@@ -18,18 +23,31 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
     def __init__(
         self, csv_dir, events_queue,
         init_tickers=None,
-        start_date=None, end_date=None
+        start_date=None, end_date=None, cache_dir=None,
+        chunksize=65536
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If a cache_dir is given the CSV files are cached there
+        in a binary form (see PriceCache) for subsequent runs.
+        Otherwise each CSV file is read chunksize rows at a time
+        as its bars are streamed (see CsvReplayBlocks). Its rows
+        must then be in time order, or out of order from its first
+        chunk (e.g. in reverse order), in which case the whole file
+        is read and sorted, as with a cache.
         """
         self.csv_dir = csv_dir
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
-        self.tickers_data = {}
+        self.tickers_columns = {}
+        self.chunksize = chunksize
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = PriceCache(cache_dir)
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
@@ -40,46 +58,75 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
     def _open_ticker_price_csv(self, ticker):
         """
         Opens the CSV files containing the equities ticks from
-        the specified CSV data directory, converting them into
-        them into a pandas DataFrame, stored in a dictionary.
+        the specified CSV data directory, keeping the columnar
+        blocks of their bars, read chunk by chunk as they are
+        replayed, in a dictionary.
+
+        If a cache is used the columnar form of the whole file
+        is read from the (memory-mapped) cache instead.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
 
-        self.tickers_data[ticker] = pd.read_csv(
-            ticker_path,
-            names=[
-                "Date", "Open", "Low", "High",
-                "Close", "Volume", "OpenInterest"
-            ],
-            index_col="Date", parse_dates=True
-        )
-        self.tickers_data[ticker]["Ticker"] = ticker
+        def read_frame(**kwargs):
+            df = pd.read_csv(
+                ticker_path,
+                names=[
+                    "Date", "Open", "Low", "High",
+                    "Close", "Volume", "OpenInterest"
+                ],
+                index_col="Date", parse_dates=True, **kwargs
+            )
+            if "chunksize" not in kwargs:
+                df["Ticker"] = ticker
+            return df
+
+        if self.cache is None:
+            self.tickers_columns[ticker] = CsvReplayBlocks(
+                [ticker], lambda: read_frame(chunksize=self.chunksize),
+                lambda df: BarColumns.from_frame(
+                    df, ticker=ticker, adj_close_col="Close"
+                )
+            )
+        else:
+            self.tickers_columns[ticker] = self.cache.load_bars(
+                ticker_path, ticker, read_frame, adj_close_col="Close"
+            )
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Creates a replay iterator over each ticker's bars and
+        merges them into a single stream, ordered by timestamp
+        and then ticker, allowing bar data events to be added to
+        the queue in a chronological and deterministic fashion.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
-        start = None
-        end = None
-        if self.start_date is not None:
-            start = df.index.searchsorted(self.start_date)
-        if self.end_date is not None:
-            end = df.index.searchsorted(self.end_date)
-        # Determine how to slice
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end].iterrows()
+        return MergedReplayEventIterator([
+            BarReplayEventIterator(
+                slice_dates(
+                    self.tickers_columns[ticker],
+                    self.start_date, self.end_date
+                ), 60,  # Seconds in a minute
+                tickers=[ticker]
+            ) for ticker in sorted(self.tickers_columns)
+        ])
+
+    def clone(self, events_queue):
+        """
+        Returns a new handler streaming the same bars from the
+        start into events_queue. The cached columns are shared
+        with this handler rather than copied, while the CSV files
+        read chunk by chunk are read again by the new handler.
+        """
+        handler = copy.copy(self)
+        handler.events_queue = events_queue
+        handler.continue_backtest = True
+        handler.tickers = dict(
+            (ticker, dict(prices)) for ticker, prices in self.tickers.items()
+        )
+        handler.bar_stream = handler._merge_sort_ticker_data()
+        return handler
 
     def subscribe_ticker(self, ticker):
         """
@@ -88,15 +135,13 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
         if ticker not in self.tickers:
             try:
                 self._open_ticker_price_csv(ticker)
-                dft = self.tickers_data[ticker]
-                row0 = dft.iloc[0]
-
-                close = PriceParser.parse(row0["Close"])
-
+                bars = self.tickers_columns[ticker]
+                if isinstance(bars, CsvReplayBlocks):
+                    bars = bars.first_block()
                 ticker_prices = {
-                    "close": close,
-                    "adj_close": close,
-                    "timestamp": dft.index[0]
+                    "close": bars.close_price.item(0),
+                    "adj_close": bars.close_price.item(0),
+                    "timestamp": bars.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
             except OSError:
@@ -110,38 +155,24 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
                 "as is already subscribed." % ticker
             )
 
-    def _create_event(self, index, period, ticker, row):
+    def next_event_time(self):
         """
-        Obtain all elements of the bar from a row of dataframe
-        and return a BarEvent
+        Returns the time of the next bar to be streamed, as
+        nanoseconds since the epoch, or None at the end of the data.
         """
-        open_price = PriceParser.parse(row["Open"])
-        low_price = PriceParser.parse(row["Low"])
-        high_price = PriceParser.parse(row["High"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Close"])
-        volume = int(row["Volume"])
-        bev = BarEvent(
-            ticker, index, period, open_price,
-            high_price, low_price, close_price,
-            volume, adj_close_price
-        )
-        return bev
+        return self.bar_stream.peek_time()
 
     def stream_next(self):
         """
         Place the next BarEvent onto the event queue.
         """
         try:
-            index, row = next(self.bar_stream)
+            bev = next(self.bar_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
-        period = 60  # Seconds in a minute
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
+        except EmptyBarEvent:
+            return
         # Store event
         self._store_event(bev)
         # Send event to queue
@@ -10,6 +10,14 @@ class AbstractPriceEventIterator(object):
     def next(self):
         return self.__next__()
 
+    def peek_time(self):
+        """
+        Returns the time of the next event as an integer
+        (nanoseconds since the epoch for dated events), or
+        None once the iterator is exhausted.
+        """
+        raise NotImplementedError("Should implement peek_time()")
+
 
 class AbstractBarEventIterator(AbstractPriceEventIterator):
     def _create_event(self, index, period, ticker, row):
@@ -1,4 +1,5 @@
 from ..base import AbstractBarEventIterator
+from ..replay import BarColumns, BarReplayEventIterator
 
 
 class PandasDataFrameBarEventIterator(AbstractBarEventIterator):
@@ -30,12 +31,15 @@ class PandasDataFrameBarEventIterator(AbstractBarEventIterator):
         self.period = period
         self.ticker = ticker
         self.tickers_lst = [ticker]
-        self._itr_bar = self.data.iterrows()
+        self._itr_bar = BarReplayEventIterator(
+            BarColumns.from_frame(self.data, ticker=ticker), period
+        )
 
     def __next__(self):
-        index, row = next(self._itr_bar)
-        price_event = self._create_event(index, self.period, self.ticker, row)
-        return price_event
+        return next(self._itr_bar)
+
+    def peek_time(self):
+        return self._itr_bar.peek_time()
 
 
 class PandasPanelBarEventIterator(AbstractBarEventIterator):
@@ -1,4 +1,5 @@
 from ..base import AbstractTickEventIterator
+from ..replay import TickColumns, TickReplayEventIterator
 
 
 class PandasDataFrameTickEventIterator(AbstractTickEventIterator):
@@ -25,12 +26,15 @@ class PandasDataFrameTickEventIterator(AbstractTickEventIterator):
         self.data = df
         self.ticker = ticker
         self.tickers_lst = [ticker]
-        self._itr_bar = self.data.iterrows()
+        self._itr_bar = TickReplayEventIterator(
+            TickColumns.from_frame(self.data, ticker=ticker)
+        )
 
     def __next__(self):
-        index, row = next(self._itr_bar)
-        price_event = self._create_event(index, self.ticker, row)
-        return price_event
+        return next(self._itr_bar)
+
+    def peek_time(self):
+        return self._itr_bar.peek_time()
 
 
 class PandasPanelTickEventIterator(AbstractTickEventIterator):
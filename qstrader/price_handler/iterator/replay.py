@@ -0,0 +1,514 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from .base import (
+    AbstractPriceEventIterator, AbstractBarEventIterator,
+    AbstractTickEventIterator
+)
+from ...price_parser import PriceParser
+from ...event import BarEvent, TickEvent
+from ...exception import EmptyBarEvent, EmptyTickEvent
+
+
+def datetime_ns(index):
+    """
+    Returns a DatetimeIndex as int64 nanoseconds since the epoch,
+    whatever the resolution it was parsed with.
+    """
+    return np.asarray(index.values.astype("datetime64[ns]")).view(np.int64)
+
+
+def _ticker_codes(df, ticker):
+    """
+    Returns the list of tickers and the integer code of the
+    ticker of each row, read from the "Ticker" column of df
+    if ticker is None.
+    """
+    if ticker is None:
+        codes, uniques = pd.factorize(df["Ticker"])
+        return list(uniques), codes.astype(np.int64)
+    return [ticker], np.zeros(len(df), dtype=np.int64)
+
+
+def _parse_columns(df, cols):
+    """
+    Reads the price columns of df as float arrays, together
+    with a mask of the rows where every value is finite. Invalid
+    rows are zeroed so that they can still be parsed.
+    """
+    raw = [np.asarray(df[col], dtype=np.float64) for col in cols]
+    valid = np.logical_and.reduce([np.isfinite(col) for col in raw])
+    raw = [np.where(valid, col, 0.0) for col in raw]
+    return raw, valid
+
+
+def slice_dates(data, start_date=None, end_date=None):
+    """
+    Returns the rows of data, either a DataFrame or ReplayColumns,
+    lying within [start_date, end_date), sorting it by its index
+    first if required. The blocks of a CsvReplayBlocks are sliced
+    as they are read.
+    """
+    if isinstance(data, CsvReplayBlocks):
+        return data.blocks(start_date, end_date)
+    if not data.index.is_monotonic_increasing:
+        data = _take(data, data.index.argsort(kind="mergesort"))
+    start = None
+    end = None
+    if start_date is not None:
+        start = data.index.searchsorted(start_date)
+    if end_date is not None:
+        end = data.index.searchsorted(end_date)
+    return _take(data, slice(start, end))
+
+
+def _take(data, indexer):
+    if isinstance(data, ReplayColumns):
+        return data.take(indexer)
+    return data.iloc[indexer]
+
+
+class ReplayColumns(object):
+    """
+    Base class of the columnar blocks replayed by the replay
+    iterators, holding the (time ordered) index, the list of
+    tickers, an integer code per row identifying the ticker and
+    a mask of the rows which can be converted into events.
+
+    Subclasses list the names of their int64 price arrays in
+    arrays, which are also the keyword arguments of __init__.
+    """
+    arrays = ()
+
+    def __init__(self, index, tickers, ticker_codes, valid):
+        self.index = index
+        self.tickers = tickers
+        self.ticker_codes = ticker_codes
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.ticker_codes)
+
+    def take(self, indexer):
+        """
+        Returns a block of the same type holding the rows
+        selected by indexer (a slice or an array of positions).
+        Slicing memory-mapped arrays does not copy them.
+        """
+        arrays = dict(
+            (name, getattr(self, name)[indexer]) for name in self.arrays
+        )
+        return type(self)(
+            self.index[indexer], self.tickers,
+            self.ticker_codes[indexer], valid=self.valid[indexer],
+            **arrays
+        )
+
+    def times(self, start, stop):
+        """
+        Returns the timestamps of rows start to stop as a list.
+        Converting a block at once is far cheaper than indexing
+        into a DatetimeIndex row by row.
+        """
+        return self.index[start:stop].tolist()
+
+    def keys(self):
+        """
+        Returns the index as an array of integers (nanoseconds for
+        a DatetimeIndex) used to order rows when merging blocks.
+        """
+        if isinstance(self.index, pd.DatetimeIndex):
+            return datetime_ns(self.index)
+        return np.asarray(self.index)
+
+
+class BarColumns(ReplayColumns):
+    """
+    BarColumns holds a time ordered block of OHLCV bars as
+    contiguous int64 NumPy arrays, with prices already multiplied
+    by PriceParser.PRICE_MULTIPLIER, plus an integer code per row
+    identifying the ticker.
+
+    The conversion from a DataFrame is carried out once, so that
+    replaying the bars only requires indexing into the arrays,
+    rather than building a pandas Series per row and parsing each
+    price individually.
+
+    Rows containing a missing value are flagged as invalid and
+    raise EmptyBarEvent when replayed, as the row based iterators do.
+    """
+    arrays = (
+        "open_price", "high_price", "low_price",
+        "close_price", "adj_close_price", "volume"
+    )
+
+    def __init__(
+        self, index, tickers, ticker_codes,
+        open_price, high_price, low_price,
+        close_price, adj_close_price, volume, valid
+    ):
+        super(BarColumns, self).__init__(index, tickers, ticker_codes, valid)
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+        self.close_price = close_price
+        self.adj_close_price = adj_close_price
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, df, ticker=None, adj_close_col="Adj Close"):
+        """
+        Converts a DataFrame of bars with "Open", "High", "Low",
+        "Close" and "Volume" columns (and the adjusted close in
+        adj_close_col) into BarColumns.
+
+        If ticker is None the ticker of each row is read from the
+        "Ticker" column, otherwise every row belongs to ticker.
+        """
+        tickers, ticker_codes = _ticker_codes(df, ticker)
+        raw, valid = _parse_columns(df, (
+            "Open", "High", "Low", "Close", adj_close_col, "Volume"
+        ))
+        return cls(
+            df.index, tickers, ticker_codes,
+            PriceParser.parse_array(raw[0]), PriceParser.parse_array(raw[1]),
+            PriceParser.parse_array(raw[2]), PriceParser.parse_array(raw[3]),
+            PriceParser.parse_array(raw[4]), raw[5].astype(np.int64), valid
+        )
+
+    def to_frame(self):
+        """
+        Returns the bars as a DataFrame of float prices, laid out
+        as the DataFrames read from the bar CSV files, with missing
+        values where a row is invalid.
+        """
+        df = pd.DataFrame(dict(
+            (col, np.where(
+                self.valid, getattr(self, name) / PriceParser.PRICE_MULTIPLIER,
+                np.nan
+            )) for (col, name) in (
+                ("Open", "open_price"), ("High", "high_price"),
+                ("Low", "low_price"), ("Close", "close_price"),
+                ("Adj Close", "adj_close_price")
+            )
+        ), index=self.index, columns=[
+            "Open", "High", "Low", "Close", "Volume", "Adj Close"
+        ])
+        df["Volume"] = np.where(self.valid, self.volume, np.nan)
+        df["Ticker"] = np.asarray(self.tickers, dtype=object)[self.ticker_codes]
+        return df
+
+    def bar_event(self, i, period, time=None):
+        """
+        Creates the BarEvent for the i-th row. The timestamp
+        is looked up from the index unless it is provided.
+        """
+        if time is None:
+            time = self.index[i]
+        ticker = self.tickers[self.ticker_codes.item(i)]
+        if not self.valid.item(i):
+            raise EmptyBarEvent(
+                "row %s %s %s can't be convert to BarEvent" % (
+                    time, period, ticker
+                )
+            )
+        return BarEvent(
+            ticker, time, period,
+            self.open_price.item(i), self.high_price.item(i),
+            self.low_price.item(i), self.close_price.item(i),
+            self.volume.item(i), self.adj_close_price.item(i)
+        )
+
+
+class TickColumns(ReplayColumns):
+    """
+    TickColumns holds a time ordered block of bid/ask ticks as
+    contiguous int64 NumPy arrays, in the same manner as
+    BarColumns does for bars.
+    """
+    arrays = ("bid", "ask")
+
+    def __init__(self, index, tickers, ticker_codes, bid, ask, valid):
+        super(TickColumns, self).__init__(index, tickers, ticker_codes, valid)
+        self.bid = bid
+        self.ask = ask
+
+    @classmethod
+    def from_frame(cls, df, ticker=None):
+        """
+        Converts a DataFrame of ticks with "Bid" and "Ask"
+        columns into TickColumns.
+
+        If ticker is None the ticker of each row is read from the
+        "Ticker" column, otherwise every row belongs to ticker.
+        """
+        tickers, ticker_codes = _ticker_codes(df, ticker)
+        raw, valid = _parse_columns(df, ("Bid", "Ask"))
+        return cls(
+            df.index, tickers, ticker_codes,
+            PriceParser.parse_array(raw[0]),
+            PriceParser.parse_array(raw[1]), valid
+        )
+
+    def tick_event(self, i, time=None):
+        """
+        Creates the TickEvent for the i-th row. The timestamp
+        is looked up from the index unless it is provided.
+        """
+        if time is None:
+            time = self.index[i]
+        ticker = self.tickers[self.ticker_codes.item(i)]
+        if not self.valid.item(i):
+            raise EmptyTickEvent(
+                "row %s %s can't be convert to TickEvent" % (time, ticker)
+            )
+        return TickEvent(ticker, time, self.bid.item(i), self.ask.item(i))
+
+
+class CsvReplayBlocks(object):
+    """
+    CsvReplayBlocks reads the CSV file of a single ticker a chunk
+    of rows at a time, converting each chunk into a ReplayColumns
+    block as it is replayed, so that only one chunk of the file is
+    held in memory rather than its whole history.
+
+    read_chunks() returns an iterator over the DataFrames of the
+    chunks (e.g. read_csv with a chunksize) and to_columns converts
+    one of them into a block.
+
+    The rows of the file are expected to be in time order, as the
+    blocks already replayed can't be sorted again. If they are not,
+    and the rows out of order are found before any block has been
+    replayed (e.g. a file in reverse time order), the whole file is
+    read and sorted instead, as it is without chunks, and kept for
+    the following replays. Otherwise an exception is raised.
+    """
+    def __init__(self, tickers, read_chunks, to_columns):
+        self.tickers = tickers
+        self.read_chunks = read_chunks
+        self.to_columns = to_columns
+        self.columns = None
+
+    def first_block(self):
+        """
+        Returns the block of the first chunk of the file, in the
+        order of the file, as the whole file is before it is sorted.
+        """
+        return self.to_columns(next(iter(self.read_chunks())))
+
+    def blocks(self, start_date=None, end_date=None):
+        """
+        Returns an iterator over the blocks of the rows lying
+        within [start_date, end_date), reading the file from the
+        start.
+        """
+        if self.columns is not None:
+            yield slice_dates(self.columns, start_date, end_date)
+            return
+        last = None
+        replayed = False
+        for df in self.read_chunks():
+            block = self.to_columns(df)
+            if len(block) == 0:
+                continue
+            keys = block.keys()
+            if (
+                (last is not None and keys[0] < last) or
+                not block.index.is_monotonic_increasing
+            ):
+                if replayed:
+                    raise Exception(
+                        "rows of tickers %s are not in time order, "
+                        "sort the file or cache it" % self.tickers
+                    )
+                self.columns = self.to_columns(
+                    pd.concat(list(self.read_chunks()))
+                )
+                yield slice_dates(self.columns, start_date, end_date)
+                return
+            last = keys[-1]
+            sliced = slice_dates(block, start_date, end_date)
+            if len(sliced):
+                replayed = True
+                yield sliced
+            if end_date is not None and block.index[-1] >= end_date:
+                return
+
+
+class ReplayCursor(object):
+    """
+    Mixin holding the position of a replay iterator within its
+    columnar block, or within each of the blocks of an iterator
+    of blocks in turn (see CsvReplayBlocks), holding only the
+    current one. Timestamps are materialised chunk_size rows at
+    a time.
+    """
+    def _init_cursor(self, columns, chunk_size, tickers=None):
+        self.chunk_size = chunk_size
+        if isinstance(columns, ReplayColumns):
+            self._blocks = iter(())
+            self._set_block(columns)
+            self._len = len(columns)
+        else:
+            self._blocks = iter(columns)
+            self._set_block(None)
+            self._len = None
+            self._next_block()
+        if tickers is None:
+            tickers = self.columns.tickers if self.columns is not None else []
+        self.tickers_lst = list(tickers)
+
+    def _set_block(self, columns):
+        self.columns = columns
+        self._cur = 0
+        self._block_len = 0 if columns is None else len(columns)
+        self._keys = None
+        self._times = []
+        self._times_start = 0
+
+    def _next_block(self):
+        """
+        Moves on to the next non-empty block, returning
+        whether there is one.
+        """
+        for columns in self._blocks:
+            if len(columns):
+                self._set_block(columns)
+                return True
+        return False
+
+    def __len__(self):
+        """
+        Returns the number of rows replayed, unknown for the
+        blocks read as they are replayed.
+        """
+        if self._len is None:
+            raise TypeError("the length of chunked blocks is not known")
+        return self._len
+
+    def _next_row(self):
+        """
+        Advances the cursor, returning the row and its timestamp.
+        """
+        i = self._cur
+        if i >= self._block_len:
+            if not self._next_block():
+                raise StopIteration
+            i = 0
+        self._cur = i + 1
+        j = i - self._times_start
+        if j >= len(self._times):
+            self._times_start = i
+            self._times = self.columns.times(i, i + self.chunk_size)
+            j = 0
+        return i, self._times[j]
+
+    def peek(self):
+        """
+        Returns the (key, ticker) ordering the next row of the
+        cursor, or None if it is exhausted.
+        """
+        i = self._cur
+        if i >= self._block_len:
+            if not self._next_block():
+                return None
+            i = 0
+        if self._keys is None:
+            self._keys = self.columns.keys()
+        columns = self.columns
+        return (
+            self._keys.item(i),
+            columns.tickers[columns.ticker_codes.item(i)]
+        )
+
+    def peek_time(self):
+        """
+        Returns the key (see ReplayColumns.keys) of the next row,
+        or None if the cursor is exhausted.
+        """
+        head = self.peek()
+        if head is None:
+            return None
+        return head[0]
+
+
+class BarReplayEventIterator(ReplayCursor, AbstractBarEventIterator):
+    """
+    BarReplayEventIterator replays a BarColumns block in order,
+    yielding one BarEvent per row. It can be used anywhere a
+    row based bar iterator (e.g. DataFrame.iterrows) was used to
+    feed a price handler's stream_next.
+    """
+    def __init__(self, columns, period, chunk_size=4096, tickers=None):
+        self._init_cursor(columns, chunk_size, tickers)
+        self.period = period
+
+    def __next__(self):
+        i, time = self._next_row()
+        return self.columns.bar_event(i, self.period, time)
+
+
+class TickReplayEventIterator(ReplayCursor, AbstractTickEventIterator):
+    """
+    TickReplayEventIterator replays a TickColumns block in order,
+    yielding one TickEvent per row.
+    """
+    def __init__(self, columns, chunk_size=4096, tickers=None):
+        self._init_cursor(columns, chunk_size, tickers)
+
+    def __next__(self):
+        i, time = self._next_row()
+        return self.columns.tick_event(i, time)
+
+
+class MergedReplayEventIterator(AbstractPriceEventIterator):
+    """
+    MergedReplayEventIterator merges several replay iterators,
+    typically one per ticker, into a single stream of events in
+    (timestamp, ticker) order, keeping rows of the same iterator
+    in their original order.
+
+    Only the next row of each iterator is held in a heap, so the
+    merge itself needs memory proportional to the number of
+    iterators rather than to the total number of rows, and the
+    first event is available without concatenating and sorting
+    all of the history.
+    """
+    def __init__(self, cursors):
+        self.cursors = cursors
+        self.tickers_lst = []
+        self._heap = []
+        for n, cursor in enumerate(cursors):
+            self.tickers_lst.extend(cursor.tickers_lst)
+            head = cursor.peek()
+            if head is not None:
+                self._heap.append(head + (n, cursor))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return sum(len(cursor) for cursor in self.cursors)
+
+    def peek_time(self):
+        """
+        Returns the key (see ReplayColumns.keys) of the next row
+        to be merged, or None if every iterator is exhausted.
+        """
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def __next__(self):
+        heap = self._heap
+        if not heap:
+            raise StopIteration
+        _, _, n, cursor = heap[0]
+        try:
+            return next(cursor)
+        finally:
+            head = cursor.peek()
+            if head is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, head + (n, cursor))
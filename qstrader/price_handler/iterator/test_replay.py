@@ -0,0 +1,209 @@
+"""
+Test the CSV files replayed chunk by chunk stream the events of the whole files
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from qstrader.event_queue import EventDeque
+from qstrader.price_handler.cache import PriceCache
+from qstrader.price_handler.historic_csv_tick import HistoricCSVTickPriceHandler
+from qstrader.price_handler.iq_feed_intraday_csv_bar import (
+    IQFeedIntradayCsvBarPriceHandler
+)
+
+
+def stream(handler):
+    events = []
+    while handler.continue_backtest:
+        handler.stream_next()
+    while not handler.events_queue.empty():
+        events.append(handler.events_queue.get())
+    return events
+
+
+class TestCsvReplayBlocks(unittest.TestCase):
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.tickers = ["AAA", "BBB", "CCC"]
+        np.random.seed(42)
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def write_bars(self, ticker, times):
+        close = np.round(100.0 + np.cumsum(np.random.normal(0, 0.1, len(times))), 2)
+        close[5] = np.nan
+        pd.DataFrame({
+            "Date": times.strftime("%Y-%m-%d %H:%M:%S"),
+            "Open": close, "Low": close - 0.05, "High": close + 0.05,
+            "Close": close, "Volume": 100, "OpenInterest": 0,
+        }).to_csv(
+            os.path.join(self.csv_dir, "%s.csv" % ticker),
+            header=False, index=False
+        )
+
+    def write_ticks(self, ticker, times):
+        bid = np.round(100.0 + np.cumsum(np.random.normal(0, 0.01, len(times))), 4)
+        pd.DataFrame({
+            "Ticker": ticker,
+            "Time": times.strftime("%d.%m.%Y %H:%M:%S.%f").str[:-3],
+            "Bid": bid, "Ask": bid + 0.01,
+        }).to_csv(os.path.join(self.csv_dir, "%s.csv" % ticker), index=False)
+
+    def assertSameEvents(self, events, expected):
+        self.assertGreater(len(events), 0)
+        self.assertEqual(
+            [(e.time, e.ticker, str(e)) for e in events],
+            [(e.time, e.ticker, str(e)) for e in expected]
+        )
+
+    def test_bars(self):
+        for n, ticker in enumerate(self.tickers):
+            # Tickers sharing some of their minutes
+            times = pd.date_range("2016-01-04 09:30", periods=100, freq="%dmin" % (n + 1))
+            self.write_bars(ticker, times)
+        kwargs = dict(
+            start_date=pd.Timestamp("2016-01-04 09:45"),
+            end_date=pd.Timestamp("2016-01-04 11:00")
+        )
+        handler = IQFeedIntradayCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), self.tickers, chunksize=7, **kwargs
+        )
+        self.assertEqual(handler.tickers["CCC"]["timestamp"], pd.Timestamp("2016-01-04 09:30"))
+        cached = IQFeedIntradayCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), self.tickers,
+            cache_dir=self.cache_dir, **kwargs
+        )
+        self.assertEqual(handler.tickers, cached.tickers)
+        self.assertSameEvents(stream(handler), stream(cached))
+
+    def test_ticks(self):
+        for n, ticker in enumerate(self.tickers):
+            times = pd.date_range("2016-02-01", periods=50, freq="%dms" % (250 * (n + 1)))
+            self.write_ticks(ticker, times)
+        handler = HistoricCSVTickPriceHandler(
+            self.csv_dir, EventDeque(), self.tickers, chunksize=8
+        )
+        cached = HistoricCSVTickPriceHandler(
+            self.csv_dir, EventDeque(), self.tickers, cache_dir=self.cache_dir
+        )
+        self.assertEqual(handler.tickers, cached.tickers)
+        self.assertSameEvents(stream(handler), stream(cached))
+
+    def test_clone(self):
+        times = pd.date_range("2016-02-01", periods=50, freq="250ms")
+        self.write_ticks("AAA", times)
+        for kwargs in (dict(chunksize=8), dict(cache_dir=self.cache_dir)):
+            handler = HistoricCSVTickPriceHandler(
+                self.csv_dir, EventDeque(), ["AAA"], **kwargs
+            )
+            clones = [handler.clone(EventDeque()) for _ in range(2)]
+            expected = stream(clones[0])
+            self.assertEqual(len(expected), 50)
+            self.assertSameEvents(stream(clones[1]), expected)
+            self.assertSameEvents(stream(handler), expected)
+            self.assertIsNot(clones[0].tickers["AAA"], handler.tickers["AAA"])
+
+    def test_out_of_order(self):
+        times = pd.date_range("2016-01-04 09:30", periods=30, freq="min")
+        # In reverse time order, found out with the first chunk
+        self.write_bars("AAA", times[::-1])
+        handler = IQFeedIntradayCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), ["AAA"], chunksize=7
+        )
+        cached = IQFeedIntradayCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), ["AAA"], cache_dir=self.cache_dir
+        )
+        self.assertEqual(handler.tickers, cached.tickers)
+        self.assertSameEvents(stream(handler), stream(cached))
+        # Out of order after some chunks have been replayed
+        times = times[10:].append(times[:10])
+        self.write_bars("AAA", times)
+        handler = IQFeedIntradayCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), ["AAA"], chunksize=7
+        )
+        with self.assertRaises(Exception):
+            stream(handler)
+
+    def read_bars(self, path):
+        return pd.read_csv(
+            path, header=None, index_col=0, parse_dates=True,
+            names=["Date", "Open", "Low", "High", "Close",
+                   "Volume", "OpenInterest"]
+        )
+
+    def test_cache_meta_written_once(self):
+        times = pd.date_range("2016-01-04 09:30", periods=100, freq="min")
+        self.write_bars("AAA", times)
+        path = os.path.join(self.csv_dir, "AAA.csv")
+
+        def load(check_hash=False):
+            return PriceCache(self.cache_dir, check_hash=check_hash).load_bars(
+                path, "AAA", lambda: self.read_bars(path), adj_close_col="Close"
+            )
+
+        with mock.patch.object(
+            PriceCache, "_write_meta", autospec=True,
+            side_effect=PriceCache._write_meta
+        ) as write_meta:
+            for check_hash in (False, True, False):
+                load(check_hash)
+            self.assertEqual(write_meta.call_count, 1)
+            # The source is only touched, its new time is recorded once
+            mtime = os.path.getmtime(path) + 10
+            os.utime(path, (mtime, mtime))
+            for check_hash in (False, True, False):
+                load(check_hash)
+            self.assertEqual(write_meta.call_count, 2)
+
+    def test_concurrent_cache_writers(self):
+        times = pd.date_range("2016-01-04 09:30", periods=100, freq="min")
+        self.write_bars("AAA", times)
+        path = os.path.join(self.csv_dir, "AAA.csv")
+        nb_writers = 4
+        barrier = threading.Barrier(nb_writers)
+        results = [None] * nb_writers
+
+        def read_frame():
+            # Every writer builds the cache entry at the same time
+            barrier.wait()
+            return self.read_bars(path)
+
+        def load(i):
+            try:
+                results[i] = PriceCache(self.cache_dir).load_bars(
+                    path, "AAA", read_frame, adj_close_col="Close"
+                )
+            except Exception as e:
+                results[i] = e
+
+        writers = [
+            threading.Thread(target=load, args=(i,)) for i in range(nb_writers)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        for result in results:
+            self.assertNotIsInstance(result, Exception)
+            np.testing.assert_array_equal(result.close_price, results[0].close_price)
+        self.assertEqual(
+            [f for f in os.listdir(self.cache_dir) if f.endswith(".tmp")], []
+        )
+        cached = PriceCache(self.cache_dir).load_bars(
+            path, "AAA", None, adj_close_col="Close"
+        )
+        np.testing.assert_array_equal(cached.close_price, results[0].close_price)
+
+
+if __name__ == "__main__":
+    unittest.main()
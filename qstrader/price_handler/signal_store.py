@@ -0,0 +1,92 @@
+class SignalRow(object):
+    """
+    A read-only view onto a single row of a SignalStore.
+
+    Values are looked up lazily from the column arrays of the
+    store, so creating a SignalRow per bar costs one small
+    object rather than a DataFrame slice. Access mirrors a
+    dictionary, e.g. row['close'] or row['buy'].
+    """
+
+    __slots__ = ("_columns", "_pos")
+
+    def __init__(self, columns, pos):
+        self._columns = columns
+        self._pos = pos
+
+    def __getitem__(self, key):
+        return self._columns[key][self._pos]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def get(self, key, default=None):
+        if key in self._columns:
+            return self._columns[key][self._pos]
+        return default
+
+    def keys(self):
+        return self._columns.keys()
+
+    def to_dict(self):
+        """
+        Returns the row as a plain dictionary of column -> value.
+        """
+        return dict(
+            (key, values[self._pos]) for key, values in self._columns.items()
+        )
+
+    def __str__(self):
+        return "SignalRow(%s)" % self.to_dict()
+
+    def __repr__(self):
+        return str(self)
+
+
+class SignalStore(object):
+    """
+    SignalStore holds a precomputed signals DataFrame (one row per
+    date and symbol, as produced by TecnicalAnalysisStrategy) in a
+    columnar form, together with a hash index keyed by the
+    (date, symbol) pair.
+
+    It is built once, after all signals have been calculated, and
+    then provides O(1) lookup of the signal row for each bar,
+    instead of a boolean scan over the full signals frame.
+
+    If a (date, symbol) pair appears more than once the first
+    occurrence is kept, matching positional access on the
+    equivalent DataFrame slice.
+    """
+    def __init__(self, signals, date_col="date", symbol_col="symbol"):
+        self._columns = {}
+        self._index = {}
+        if date_col not in signals or symbol_col not in signals:
+            return
+        for col in signals.columns:
+            values = signals[col]
+            if values.dtype.kind in "biuf":
+                self._columns[col] = values.values
+            else:
+                self._columns[col] = values.tolist()
+        keys = list(zip(self._columns[date_col], self._columns[symbol_col]))
+        # Reverse insertion so that the first occurrence of a key wins
+        self._index = dict(
+            zip(reversed(keys), range(len(keys) - 1, -1, -1))
+        )
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, date, symbol):
+        """
+        Returns the SignalRow for the date and symbol, or None
+        if no signal was calculated for that bar.
+        """
+        pos = self._index.get((date, symbol))
+        if pos is None:
+            return None
+        return SignalRow(self._columns, pos)
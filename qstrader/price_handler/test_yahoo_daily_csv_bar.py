@@ -0,0 +1,75 @@
+"""
+Test the signals of the Yahoo price handler are calculated per ticker
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.event_queue import EventDeque
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from strategy.tecnical.tecnical_strategy import TecnicalAnalysisStrategy
+
+
+class TestYahooSignals(unittest.TestCase):
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.tickers = ["AAA", "BBB", "CCC"]
+        dates = pd.bdate_range("2010-01-04", periods=400)
+        self.bars = {}
+        for seed, ticker in enumerate(self.tickers):
+            rand = np.random.RandomState(seed)
+            close = 100.0 * np.exp(np.cumsum(rand.normal(0.0, 0.01, len(dates))))
+            spread = np.abs(rand.normal(0.0, 0.5, len(dates)))
+            bars = pd.DataFrame({
+                "date": dates,
+                "open": (close + rand.normal(0.0, 0.2, len(dates))).round(2),
+                "high": (close + spread).round(2),
+                "low": (close - spread).round(2),
+                "close": close.round(2),
+                "volume": rand.randint(100, 10000, len(dates)),
+            })
+            # Tickers start trading on different days
+            bars = bars.iloc[50 * seed:].reset_index(drop=True)
+            bars[["date", "open", "high", "low", "close", "volume", "close"]].to_csv(
+                os.path.join(self.csv_dir, "%s.csv" % ticker),
+                header=["Date", "Open", "High", "Low", "Close", "Volume", "Adj Close"],
+                index=False
+            )
+            self.bars[ticker] = bars
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+
+    def test_signals_per_ticker(self):
+        handler = YahooDailyCsvBarPriceHandler(
+            self.csv_dir, EventDeque(), self.tickers, signal_workers=2
+        )
+        signals = handler.signals.reset_index(drop=True)
+        self.assertEqual(len(signals), sum(len(b) for b in self.bars.values()))
+        ordered = signals.sort_values(["date", "symbol"], kind="mergesort")
+        self.assertTrue(ordered.index.equals(signals.index))
+
+        for ticker, bars in self.bars.items():
+            prices = bars[["open", "close", "high", "low", "date", "volume"]].copy()
+            prices["volume"] = prices["volume"].astype(float)
+            prices.insert(5, "symbol", ticker)
+            expected = TecnicalAnalysisStrategy().get_historical_signals(prices)
+            results = signals[signals["symbol"] == ticker].reset_index(drop=True)
+            for col in ("adx", "bb_middleband", "ema50", "sar", "tema"):
+                pd.testing.assert_series_equal(
+                    results[col], expected[col], check_names=False
+                )
+            for col in ("buy", "sell"):
+                pd.testing.assert_series_equal(
+                    results[col], expected[col].fillna(0), check_names=False
+                )
+            row = handler.signal_store.get(bars["date"].iloc[-1], ticker)
+            self.assertEqual(row["close"], bars["close"].iloc[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,20 @@
+import copy
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
+from strategy.tecnical.cache import get_indicator_cache
 from strategy.tecnical.tecnical_strategy import TecnicalAnalysisStrategy
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
-from ..event import BarEvent
+from .signal_store import SignalStore
+from .cache import PriceCache
+from .iterator.replay import (
+    BarColumns, BarReplayEventIterator, MergedReplayEventIterator,
+    slice_dates
+)
+from ..exception import EmptyBarEvent
 
 
 class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
@@ -15,29 +24,59 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
     for each requested financial instrument and stream those to
     the provided events queue as BarEvents.
     """
+
+    # The columns of the bars the signals are calculated from
+    signal_columns = ["Open", "High", "Low", "Close", "Volume"]
+
     def __init__(
         self, csv_dir, events_queue,
         init_tickers=None,
         start_date=None, end_date=None,
-        calc_adj_returns=False
+        calc_adj_returns=False, cache_dir=None, signal_workers=None
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If a cache_dir is given the CSV files are cached there
+        in a binary form (see PriceCache) for subsequent runs, and
+        the technical indicators in its "indicators" directory
+        (see IndicatorCache). Otherwise the indicators are only
+        cached in memory, for the handlers of the same process.
+
+        The signals of the tickers are calculated by a pool of
+        signal_workers threads (by default as many as suit the
+        number of CPUs, see ThreadPoolExecutor).
         """
         self.csv_dir = csv_dir
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        self.tickers_columns = {}
+        self.cache = None
+        self.signal_workers = signal_workers
+        self.indicator_cache = get_indicator_cache()
+        if cache_dir is not None:
+            self.cache = PriceCache(cache_dir)
+            self.indicator_cache = get_indicator_cache(
+                os.path.join(os.path.expanduser(cache_dir), "indicators")
+            )
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
         self.start_date = start_date
         self.end_date = end_date
+        bars = dict(
+            (ticker, slice_dates(df, start_date, end_date))
+            for ticker, df in self.tickers_data.items()
+        )
+        self._set_signals_from_price(bars)
+        # The bars are replayed from their columnar form, the
+        # DataFrames were only kept for the signals
+        self.tickers_data = {}
         self.bar_stream = self._merge_sort_ticker_data()
-        self._set_signals_from_price()
         self.calc_adj_returns = calc_adj_returns
         if self.calc_adj_returns:
             self.adj_close_returns = []
@@ -46,47 +85,74 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         """
         Opens the CSV files containing the equities ticks from
         the specified CSV data directory, converting them into
-        them into a pandas DataFrame, stored in a dictionary.
+        them into their columnar form used to replay the bars,
+        stored in a dictionary, along with a pandas DataFrame of
+        the columns the signals are calculated from.
+
+        If a cache is used the columnar form is read from it and
+        the DataFrame is recreated from it.
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
-        self.tickers_data[ticker] = pd.io.parsers.read_csv(
-            ticker_path, header=0, parse_dates=True,
-            index_col=0, names=(
-                "Date", "Open", "High", "Low",
-                "Close", "Volume", "Adj Close"
+
+        def read_frame():
+            df = pd.io.parsers.read_csv(
+                ticker_path, header=0, parse_dates=True,
+                index_col=0, names=(
+                    "Date", "Open", "High", "Low",
+                    "Close", "Volume", "Adj Close"
+                )
             )
-        )
-        self.tickers_data[ticker]["Ticker"] = ticker
+            df["Ticker"] = ticker
+            return df
+
+        if self.cache is None:
+            df = read_frame()
+            self.tickers_columns[ticker] = BarColumns.from_frame(
+                df, ticker=ticker
+            )
+        else:
+            self.tickers_columns[ticker] = self.cache.load_bars(
+                ticker_path, ticker, read_frame
+            )
+            df = self.tickers_columns[ticker].to_frame()
+        self.tickers_data[ticker] = df[self.signal_columns]
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Creates a replay iterator over each ticker's bars and
+        merges them into a single stream, ordered by timestamp
+        and then ticker, allowing bar data events to be added to
+        the queue in a chronological and deterministic fashion.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
-        start = None
-        end = None
-        if self.start_date is not None:
-            start = df.index.searchsorted(self.start_date)
-        if self.end_date is not None:
-            end = df.index.searchsorted(self.end_date)
-        # This is added so that the ticker events are
-        # always deterministic, otherwise unit test values
-        # will differ
-        df['colFromIndex'] = df.index
-        df = df.sort_values(by=["colFromIndex", "Ticker"])
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end]
+        return MergedReplayEventIterator([
+            BarReplayEventIterator(
+                slice_dates(
+                    self.tickers_columns[ticker],
+                    self.start_date, self.end_date
+                ), 86400  # Seconds in a day
+            ) for ticker in sorted(self.tickers_columns)
+        ])
+
+    def clone(self, events_queue):
+        """
+        Returns a new handler streaming the same bars and signals
+        from the start into events_queue. The price data and the
+        signals are shared with this handler rather than copied,
+        so this handler should not have been streamed from.
+        """
+        handler = copy.copy(self)
+        handler.events_queue = events_queue
+        handler.continue_backtest = True
+        handler.tickers = dict(
+            (ticker, dict(prices)) for ticker, prices in self.tickers.items()
+        )
+        handler.bar_stream = handler._merge_sort_ticker_data()
+        if handler.calc_adj_returns:
+            handler.adj_close_returns = []
+        return handler
 
     def subscribe_ticker(self, ticker):
         """
@@ -95,16 +161,11 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         if ticker not in self.tickers:
             try:
                 self._open_ticker_price_csv(ticker)
-                dft = self.tickers_data[ticker]
-                row0 = dft.iloc[0]
-
-                close = PriceParser.parse(row0["Close"])
-                adj_close = PriceParser.parse(row0["Adj Close"])
-
+                bars = self.tickers_columns[ticker]
                 ticker_prices = {
-                    "close": close,
-                    "adj_close": adj_close,
-                    "timestamp": dft.index[0]
+                    "close": bars.close_price.item(0),
+                    "adj_close": bars.adj_close_price.item(0),
+                    "timestamp": bars.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
             except OSError:
@@ -118,25 +179,6 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 "as is already subscribed." % ticker
             )
 
-    def _create_event(self, index, period, ticker, row):
-        """
-        Obtain all elements of the bar from a row of dataframe
-        and return a BarEvent
-        """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Adj Close"])
-        volume = int(row["Volume"]),
-        signal = self.signals.loc[(self.signals['date'] == index) & (self.signals['symbol'] == ticker)]
-        bev = BarEvent(
-            ticker, index, period, open_price,
-            high_price, low_price, close_price,
-            volume, adj_close_price,signal
-        )
-        return bev
-
     def _store_event(self, event):
         """
         Store price event for closing price and adjusted closing price
@@ -161,70 +203,61 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         self.tickers[ticker]["adj_close"] = event.adj_close_price
         self.tickers[ticker]["timestamp"] = event.time
 
+    def next_event_time(self):
+        """
+        Returns the time of the next bar to be streamed, as
+        nanoseconds since the epoch, or None at the end of the data.
+        """
+        return self.bar_stream.peek_time()
+
     def stream_next(self):
         """
         Place the next BarEvent onto the event queue.
         """
         try:
-            index, row = next(self.bar_stream)
+            bev = next(self.bar_stream)
         except StopIteration:
             self.continue_backtest = False
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
-        period = 86400  # Seconds in a day
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
+        except EmptyBarEvent:
+            return
+        bev.signal = self.signal_store.get(bev.time, bev.ticker)
         # Store event
         self._store_event(bev)
         # Send event to queue
         self.events_queue.put(bev)
 
-    def _set_signals_from_price(self):
-        prices = []
-        for row2 in self.bar_stream.iterrows():
-            row = row2[1]
-            time = row2[0]
-            # Obtain all elements of the bar from the dataframe
-            ticker = row["Ticker"]
-            # Create the tick event for the queue
-            open_price = row["Open"]
-            high_price = row["High"]
-            low_price = row["Low"]
-            close_price = row["Close"]
-            adj_close_price = row["Adj Close"]
-            volume = row["Volume"]
-
-            price = {
-                'open': float(open_price),
-                'close': float(close_price),
-                'high': float(high_price),
-                'low': float(low_price),
-                'date': time,
-                'symbol': ticker,
-                'volume': float(volume)
-            }
-            prices.append(price)
-        prices = pd.DataFrame.from_dict(prices)
-        tecnical = TecnicalAnalysisStrategy()
-        self.signals = tecnical.get_historical_signals(prices)
-        self.signals['buy'].fillna(0, inplace=True)
-        self.signals['sell'].fillna(0, inplace=True)
-        self.signals['sma'].fillna(0, inplace=True)
-        self.signals.set_index('date', drop=False, inplace=True)
+    def _set_signals_from_price(self, bars):
+        """
+        Calculates the technical analysis signals for every bar,
+        separately for each ticker (in parallel, as TA-Lib releases
+        the GIL), and indexes them by (date, symbol) for lookup as
+        the bars are streamed. The signals are kept ordered by date
+        and then ticker, as the bars are streamed.
+        """
+        tecnical = TecnicalAnalysisStrategy(self.indicator_cache)
 
-        signals = self.signals[self.signals['symbol'] == 'AAPL']
-        # signals['bb_lowerband'].plot()
-        # signals['bb_middleband'].plot()
-        # signals['bb_upperband'].plot()
-        # signals['close'].plot()
-        # signals['sma'].plot(label='sma 50')
-        # signals['adx'].plot()
-
-        # signals['ema5'].plot(label='ema 5')
-        # signals['ema50'].plot(label='ema 50')
-        # buys = signals[signals['buy'] ==1]
-        # plt.show()
-        print('')
-        self.bar_stream = self.bar_stream.iterrows()
+        def ticker_signals(ticker):
+            df = bars[ticker]
+            prices = pd.DataFrame({
+                'open': df["Open"].values.astype(float),
+                'close': df["Close"].values.astype(float),
+                'high': df["High"].values.astype(float),
+                'low': df["Low"].values.astype(float),
+                'date': df.index,
+                'symbol': ticker,
+                'volume': df["Volume"].values.astype(float)
+            })
+            return tecnical.get_historical_signals(prices)
 
+        tickers = sorted(bars)
+        with ThreadPoolExecutor(self.signal_workers) as executor:
+            frames = list(executor.map(ticker_signals, tickers))
+        self.signals = pd.concat(frames, ignore_index=True)
+        self.signals = self.signals.sort_values(
+            by=['date', 'symbol'], kind='mergesort'
+        ).reset_index(drop=True)
+        for col in ('buy', 'sell', 'sma'):
+            self.signals[col] = self.signals[col].fillna(0)
+        self.signals.set_index('date', drop=False, inplace=True)
+        self.signal_store = SignalStore(self.signals)
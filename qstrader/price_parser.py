@@ -1,5 +1,4 @@
 from __future__ import division
-from multipledispatch import dispatch
 from .compat import PY2
 import numpy as np
 
@@ -9,6 +8,14 @@ else:
     int_t = (int, np.int64)
 
 
+def _unsupported(name, *args):
+    raise NotImplementedError(
+        "Could not find signature for %s: <%s>" % (
+            name, ", ".join(type(arg).__name__ for arg in args)
+        )
+    )
+
+
 class PriceParser(object):
     """
     PriceParser is designed to abstract away the underlying number used as a price
@@ -21,6 +28,10 @@ class PriceParser(object):
     For consistency's sake, PriceParser should be used for ALL prices that enter
     the qstrader system. Numbers should also always be parsed correctly to view.
 
+    The scalar methods look up the exact type of their argument in a
+    table first, falling back on isinstance checks for subclasses (e.g.
+    bool or np.float64). parse_array and display_array carry out the
+    same conversions on whole NumPy arrays or pandas Series at once.
     """
 
     # 10,000,000
@@ -29,38 +40,118 @@ class PriceParser(object):
     """Parse Methods. Multiplies a float out into an int if needed."""
 
     @staticmethod
-    @dispatch(int_t)
-    def parse(x):  # flake8: noqa
-        return x
+    def parse(x):
+        """
+        Returns x as an int price. Ints are passed through
+        untouched, floats and strings are multiplied out.
+        """
+        try:
+            return _PARSE[type(x)](x)
+        except KeyError:
+            pass
+        if isinstance(x, int_t):
+            return x
+        if isinstance(x, str):
+            return _parse_str(x)
+        if isinstance(x, float):
+            return _parse_float(x)
+        _unsupported("parse", x)
 
     @staticmethod
-    @dispatch(str)
-    def parse(x):  # flake8: noqa
-        return int(float(x) * PriceParser.PRICE_MULTIPLIER)
+    def parse_array(x):
+        """
+        Vectorised parse of a NumPy array or pandas Series
+        (or anything np.asarray accepts), returning int64 prices.
+        Integer arrays are passed through untouched, as with parse.
 
-    @staticmethod
-    @dispatch(float)
-    def parse(x):  # flake8: noqa
-        return int(x * PriceParser.PRICE_MULTIPLIER)
+        Raises ValueError if x contains NaN or infinite values.
+        """
+        values = np.asarray(x)
+        if values.dtype.kind in "iub":
+            parsed = values.astype(np.int64)
+        else:
+            if values.dtype.kind != "f":
+                values = values.astype(np.float64)
+            if not np.isfinite(values).all():
+                raise ValueError(
+                    "cannot convert non-finite prices to integer"
+                )
+            parsed = (values * PriceParser.PRICE_MULTIPLIER).astype(np.int64)
+        return _wrap_like(x, parsed)
 
     """Display Methods. Multiplies a float out into an int if needed."""
 
     @staticmethod
-    @dispatch(int_t)
-    def display(x):  # flake8: noqa
-        return round(x / PriceParser.PRICE_MULTIPLIER, 2)
+    def display(x, dp=None):
+        """
+        Returns x as a float rounded to dp (default 2) decimal
+        places. Ints are divided down by PRICE_MULTIPLIER first,
+        floats are assumed to be already displayable.
+        """
+        if dp is None:
+            dp = 2
+        elif not isinstance(dp, int):
+            _unsupported("display", x, dp)
+        try:
+            return _DISPLAY[type(x)](x, dp)
+        except KeyError:
+            pass
+        if isinstance(x, int_t):
+            return _display_int(x, dp)
+        if isinstance(x, float):
+            return _display_float(x, dp)
+        _unsupported("display", x)
 
     @staticmethod
-    @dispatch(float)
-    def display(x):  # flake8: noqa
-        return round(x, 2)
+    def display_array(x, dp=2):
+        """
+        Vectorised display of a NumPy array or pandas Series.
+        Integer arrays are divided down by PRICE_MULTIPLIER,
+        float arrays are only rounded, as with display.
 
-    @staticmethod
-    @dispatch(int_t, int)
-    def display(x, dp):  # flake8: noqa
-        return round(x / PriceParser.PRICE_MULTIPLIER, dp)
+        Rounding uses NumPy, which may differ from the builtin
+        round in the last decimal place for exact ties.
+        """
+        values = np.asarray(x)
+        if values.dtype.kind in "iub":
+            values = values / PriceParser.PRICE_MULTIPLIER
+        elif values.dtype.kind != "f":
+            values = values.astype(np.float64)
+        return _wrap_like(x, np.round(values, dp))
 
-    @staticmethod
-    @dispatch(float, int)
-    def display(x, dp):  # flake8: noqa
-        return round(x, dp)
+
+def _wrap_like(x, values):
+    """
+    Returns values as a Series with the index and name
+    of x if x is a Series, otherwise as an array.
+    """
+    if hasattr(x, "index") and hasattr(x, "name"):
+        return type(x)(values, index=x.index, name=x.name)
+    return values
+
+
+def _parse_int(x):
+    return x
+
+
+def _parse_str(x):
+    return int(float(x) * PriceParser.PRICE_MULTIPLIER)
+
+
+def _parse_float(x):
+    return int(x * PriceParser.PRICE_MULTIPLIER)
+
+
+def _display_int(x, dp):
+    return round(x / PriceParser.PRICE_MULTIPLIER, dp)
+
+
+def _display_float(x, dp):
+    return round(x, dp)
+
+
+_PARSE = dict((t, _parse_int) for t in int_t + (bool,))
+_PARSE.update({str: _parse_str, float: _parse_float, np.float64: _parse_float})
+
+_DISPLAY = dict((t, _display_int) for t in int_t + (bool,))
+_DISPLAY.update({float: _display_float, np.float64: _display_float})
@@ -0,0 +1,101 @@
+from __future__ import print_function
+
+import click
+
+import time
+import numpy as np
+import pandas as pd
+
+from ..price_handler.iterator.base import AbstractBarEventIterator
+from ..price_handler.iterator.replay import BarColumns, BarReplayEventIterator
+
+
+class IterrowsBarEventIterator(AbstractBarEventIterator):
+    """
+    The DataFrame.iterrows based path the bar price handlers
+    used before the columnar replay, kept here for comparison.
+    """
+    def __init__(self, df, period):
+        self.period = period
+        self._itr_bar = df.iterrows()
+
+    def __next__(self):
+        index, row = next(self._itr_bar)
+        return self._create_event(index, self.period, row["Ticker"], row)
+
+
+def make_bars(nb_bars, nb_tickers, seed=42):
+    """
+    Creates a synthetic, time ordered, intraday (minutely) OHLCV
+    DataFrame interleaving nb_tickers tickers, laid out like the
+    merged frame of IQFeedIntradayCsvBarPriceHandler.
+    """
+    np.random.seed(seed)
+    nb_times = -(-nb_bars // nb_tickers)
+    times = pd.date_range("2000-01-03 09:30", periods=nb_times, freq="min")
+    tickers = np.array(["T%04d" % i for i in range(nb_tickers)])
+    close = 100.0 * np.exp(
+        np.cumsum(np.random.normal(0.0, 0.001, nb_bars))
+    )
+    spread = np.abs(np.random.normal(0.0, 0.05, nb_bars))
+    df = pd.DataFrame({
+        "Open": close + np.random.normal(0.0, 0.02, nb_bars),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": np.random.randint(100, 10000, nb_bars),
+        "Adj Close": close,
+        "Ticker": np.tile(tickers, nb_times)[:nb_bars],
+    }, index=np.repeat(times, nb_tickers)[:nb_bars])
+    return df
+
+
+def time_iterator(itr):
+    n = 0
+    t0 = time.time()
+    for _ in itr:
+        n += 1
+    return n, time.time() - t0
+
+
+def run(nb_bars, nb_tickers, nb_iterrows, seed):
+    print("Creating %d bars for %d tickers..." % (nb_bars, nb_tickers))
+    df = make_bars(nb_bars, nb_tickers, seed)
+
+    n, elapsed = time_iterator(
+        IterrowsBarEventIterator(df.iloc[:nb_iterrows], 60)
+    )
+    iterrows_per_bar = elapsed / n
+    print(
+        "iterrows:  %d bars in %.3fs (%.2f us/bar), "
+        "extrapolated to %d bars: %.1fs" % (
+            n, elapsed, iterrows_per_bar * 1e6,
+            nb_bars, iterrows_per_bar * nb_bars
+        )
+    )
+
+    t0 = time.time()
+    columns = BarColumns.from_frame(df)
+    build = time.time() - t0
+    n, elapsed = time_iterator(BarReplayEventIterator(columns, 60))
+    print(
+        "replay:    %d bars in %.3fs (%.2f us/bar) + %.3fs conversion" % (
+            n, elapsed, elapsed / n * 1e6, build
+        )
+    )
+    print("speedup:   %.1fx" % (
+        iterrows_per_bar * nb_bars / (elapsed + build)
+    ))
+
+
+@click.command()
+@click.option('--bars', default=10000000, help='Number of intraday bars')
+@click.option('--tickers', default=10, help='Number of tickers')
+@click.option('--iterrows-bars', default=200000, help='Number of bars to time on the iterrows path')
+@click.option('--seed', default=42, help='Seed')
+def main(bars, tickers, iterrows_bars, seed):
+    return run(bars, tickers, min(iterrows_bars, bars), seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import print_function
+
+import click
+
+import shutil
+import tempfile
+import time
+import pandas as pd
+from munch import munchify
+
+from ..compliance.buffered import BufferedCompliance
+from ..compliance.example import ExampleCompliance
+from ..event import FillEvent
+from ..price_parser import PriceParser
+
+
+def make_fills(nb_fills):
+    """
+    Creates nb_fills FillEvents, one per minute.
+    """
+    times = pd.date_range("2016-01-04 09:30", periods=nb_fills, freq="min")
+    price = PriceParser.parse(101.25)
+    commission = PriceParser.parse(1.3)
+    return [
+        FillEvent(
+            time, "GOOG", "BOT" if i % 2 else "SLD",
+            100, "ARCA", price, commission
+        )
+        for i, time in enumerate(times)
+    ]
+
+
+def time_compliance(compliance, fills):
+    """
+    Returns the number of fills recorded per second, including
+    writing out the trades still held once they are all recorded.
+    """
+    t0 = time.time()
+    for fill in fills:
+        compliance.record_trade(fill)
+    compliance.close()
+    return len(fills) / (time.time() - t0)
+
+
+def run(nb_fills, flush_size, parquet):
+    fills = make_fills(nb_fills)
+    outdir = tempfile.mkdtemp()
+    try:
+        config = munchify({"OUTPUT_DIR": outdir})
+        compliances = [
+            ("ExampleCompliance", lambda: ExampleCompliance(config)),
+            ("BufferedCompliance csv", lambda: BufferedCompliance(
+                config, flush_size=flush_size
+            )),
+        ]
+        if parquet:
+            compliances.append(
+                ("BufferedCompliance parquet", lambda: BufferedCompliance(
+                    config, flush_size=flush_size, fmt="parquet"
+                ))
+            )
+        print("Recording %s fills, flushing every %s" % (nb_fills, flush_size))
+        print("%-28s %14s" % ("compliance", "fills/s"))
+        for name, create in compliances:
+            print("%-28s %14.0f" % (name, time_compliance(create(), fills)))
+    finally:
+        shutil.rmtree(outdir)
+
+
+@click.command()
+@click.option('--fills', default=100000, help='Number of fills to record')
+@click.option('--flush-size', default=1000, help='Number of fills buffered before writing')
+@click.option('--parquet/--no-parquet', default=False, help='Also time the Parquet trade log (requires pyarrow)')
+def main(fills, flush_size, parquet):
+    return run(fills, flush_size, parquet)
+
+
+if __name__ == "__main__":
+    main()
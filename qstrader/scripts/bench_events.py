@@ -0,0 +1,174 @@
+from __future__ import print_function
+
+import click
+
+import gc
+import time
+import tracemalloc
+
+from ..event import (
+    EventType, TickEvent, BarEvent, SignalEvent, OrderEvent, FillEvent
+)
+
+
+"""
+The dict backed events used previously, kept here for comparison.
+"""
+
+
+class DictTickEvent(object):
+    def __init__(self, ticker, time, bid, ask):
+        self.type = EventType.TICK
+        self.ticker = ticker
+        self.time = time
+        self.bid = bid
+        self.ask = ask
+
+
+class DictBarEvent(object):
+    def __init__(
+        self, ticker, time, period,
+        open_price, high_price, low_price,
+        close_price, volume, adj_close_price=None, signal=None
+    ):
+        self.type = EventType.BAR
+        self.ticker = ticker
+        self.time = time
+        self.period = period
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+        self.close_price = close_price
+        self.volume = volume
+        self.adj_close_price = adj_close_price
+        self.period_readable = self._readable_period()
+        self.signal = signal
+
+    def _readable_period(self):
+        lut = {
+            1: "1sec",
+            5: "5sec",
+            10: "10sec",
+            15: "15sec",
+            30: "30sec",
+            60: "1min",
+            300: "5min",
+            600: "10min",
+            900: "15min",
+            1800: "30min",
+            3600: "1hr",
+            86400: "1day",
+            604800: "1wk"
+        }
+        if self.period in lut:
+            return lut[self.period]
+        else:
+            return "%ssec" % str(self.period)
+
+
+class DictSignalEvent(object):
+    def __init__(self, ticker, action, suggested_quantity=None):
+        self.type = EventType.SIGNAL
+        self.ticker = ticker
+        self.action = action
+        self.suggested_quantity = suggested_quantity
+
+
+class DictOrderEvent(object):
+    def __init__(self, ticker, action, quantity):
+        self.type = EventType.ORDER
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+
+
+class DictFillEvent(object):
+    def __init__(
+        self, timestamp, ticker, action, quantity,
+        exchange, price, commission
+    ):
+        self.type = EventType.FILL
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+        self.exchange = exchange
+        self.price = price
+        self.commission = commission
+
+
+EVENTS = [
+    ("TickEvent", DictTickEvent, TickEvent,
+        ("GOOG", 0, 7000000000, 7000100000)),
+    ("BarEvent", DictBarEvent, BarEvent,
+        ("GOOG", 0, 86400, 7000000000, 7100000000, 6900000000,
+         7050000000, 1000000, 7050000000)),
+    ("SignalEvent", DictSignalEvent, SignalEvent, ("GOOG", "BOT", 100)),
+    ("OrderEvent", DictOrderEvent, OrderEvent, ("GOOG", "BOT", 100)),
+    ("FillEvent", DictFillEvent, FillEvent,
+        (0, "GOOG", "BOT", 100, "ARCA", 7000000000, 10000000)),
+]
+
+
+def time_create(cls, args, nb_events):
+    """
+    Returns the time, in seconds, taken to create (and
+    discard) nb_events events.
+    """
+    t0 = time.time()
+    for _ in range(nb_events):
+        cls(*args)
+    return time.time() - t0
+
+
+def measure_held(cls, args, nb_held):
+    """
+    Returns the memory, in bytes per event, allocated
+    while holding nb_held events in a list.
+    """
+    gc.collect()
+    tracemalloc.start()
+    events = [cls(*args) for _ in range(nb_held)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return size / float(nb_held)
+
+
+def run(nb_events, nb_held):
+    print("Creating %s events of each type" % nb_events)
+    print("%-12s %14s %14s %9s %12s %12s %9s" % (
+        "event", "dict (s)", "slots (s)", "speedup",
+        "dict (B)", "slots (B)", "ratio"
+    ))
+    total_dict = 0.0
+    total_slots = 0.0
+    for name, old, new, args in EVENTS:
+        t_old = time_create(old, args, nb_events)
+        t_new = time_create(new, args, nb_events)
+        m_old = measure_held(old, args, nb_held)
+        m_new = measure_held(new, args, nb_held)
+        total_dict += m_old
+        total_slots += m_new
+        print("%-12s %14.2f %14.2f %8.1fx %12.1f %12.1f %8.1fx" % (
+            name, t_old, t_new, t_old / t_new, m_old, m_new, m_old / m_new
+        ))
+    # Bytes per event held, averaged over the event types, as the
+    # memory needed to keep nb_events of them alive at once
+    print("")
+    print("Holding %s events: dict %.0f MB, slots %.0f MB" % (
+        nb_events,
+        total_dict / len(EVENTS) * nb_events / 1e6,
+        total_slots / len(EVENTS) * nb_events / 1e6
+    ))
+
+
+@click.command()
+@click.option('--events', default=10000000, help='Number of events of each type to create')
+@click.option('--held', default=1000000, help='Number of events held at once to measure memory')
+def main(events, held):
+    return run(events, held)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from __future__ import print_function
+
+import click
+
+import time
+import numpy as np
+import pandas as pd
+from multipledispatch import dispatch
+
+from ..price_parser import PriceParser, int_t
+
+
+"""
+The multipledispatch based methods PriceParser used
+previously, kept here for comparison.
+"""
+
+
+@dispatch(int_t)
+def dispatch_parse(x):  # flake8: noqa
+    return x
+
+
+@dispatch(str)
+def dispatch_parse(x):  # flake8: noqa
+    return int(float(x) * PriceParser.PRICE_MULTIPLIER)
+
+
+@dispatch(float)
+def dispatch_parse(x):  # flake8: noqa
+    return int(x * PriceParser.PRICE_MULTIPLIER)
+
+
+@dispatch(int_t)
+def dispatch_display(x):  # flake8: noqa
+    return round(x / PriceParser.PRICE_MULTIPLIER, 2)
+
+
+@dispatch(float)
+def dispatch_display(x):  # flake8: noqa
+    return round(x, 2)
+
+
+def time_calls(func, values):
+    t0 = time.time()
+    for x in values:
+        func(x)
+    return (time.time() - t0) / len(values)
+
+
+def time_array(func, values, repeat):
+    t0 = time.time()
+    for _ in range(repeat):
+        func(values)
+    return (time.time() - t0) / (repeat * len(values))
+
+
+def run(nb_calls, nb_array, repeat, seed):
+    np.random.seed(seed)
+    floats = np.random.uniform(1.0, 1000.0, nb_calls)
+    scalars = [
+        ("parse float", dispatch_parse, PriceParser.parse, floats.tolist()),
+        ("parse np.float64", dispatch_parse, PriceParser.parse, list(floats)),
+        ("parse str", dispatch_parse, PriceParser.parse, ["%.4f" % x for x in floats[:nb_calls // 10]]),
+        ("parse int", dispatch_parse, PriceParser.parse, [int(x * 1e7) for x in floats]),
+        ("display int", dispatch_display, PriceParser.display, [int(x * 1e7) for x in floats]),
+        ("display float", dispatch_display, PriceParser.display, floats.tolist()),
+    ]
+    print("%-20s %18s %18s %10s" % ("scalar", "dispatch (ns)", "fast (ns)", "speedup"))
+    for name, slow, fast, values in scalars:
+        t_slow = time_calls(slow, values)
+        t_fast = time_calls(fast, values)
+        print("%-20s %18.1f %18.1f %9.1fx" % (
+            name, t_slow * 1e9, t_fast * 1e9, t_slow / t_fast
+        ))
+
+    prices = pd.Series(np.random.uniform(1.0, 1000.0, nb_array))
+    ints = PriceParser.parse_array(prices)
+    arrays = [
+        ("parse Series", prices, lambda s: s.apply(PriceParser.parse), PriceParser.parse_array),
+        ("display Series", ints, lambda s: s.apply(PriceParser.display), PriceParser.display_array),
+    ]
+    print("")
+    print("%-20s %18s %18s %10s" % ("array", ".apply (ns/elem)", "array (ns/elem)", "speedup"))
+    for name, values, slow, fast in arrays:
+        t_slow = time_array(slow, values, 1)
+        t_fast = time_array(fast, values, repeat)
+        print("%-20s %18.1f %18.1f %9.1fx" % (
+            name, t_slow * 1e9, t_fast * 1e9, t_slow / t_fast
+        ))
+
+
+@click.command()
+@click.option('--calls', default=200000, help='Number of scalar calls to time per path')
+@click.option('--array', default=1000000, help='Length of the arrays to time')
+@click.option('--repeat', default=20, help='Number of repeats of the array methods')
+@click.option('--seed', default=42, help='Seed')
+def main(calls, array, repeat, seed):
+    return run(calls, array, repeat, seed)
+
+
+if __name__ == "__main__":
+    main()
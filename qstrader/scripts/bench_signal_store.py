@@ -0,0 +1,82 @@
+from __future__ import print_function
+
+import click
+
+import time
+import numpy as np
+import pandas as pd
+
+from ..price_handler.signal_store import SignalStore
+
+
+def make_signals(nb_tickers, nb_days, seed=42):
+    """
+    Creates a synthetic signals DataFrame with the same layout as
+    the one produced by TecnicalAnalysisStrategy, i.e. one row per
+    date and symbol, interleaved by date.
+    """
+    np.random.seed(seed)
+    dates = pd.bdate_range("2000-01-03", periods=nb_days)
+    symbols = ["T%04d" % i for i in range(nb_tickers)]
+    n = nb_days * nb_tickers
+    signals = pd.DataFrame({
+        "date": np.repeat(dates, nb_tickers),
+        "symbol": symbols * nb_days,
+        "close": np.random.uniform(10.0, 100.0, n),
+        "buy": np.random.randint(0, 2, n),
+        "sell": np.random.randint(0, 2, n),
+    })
+    signals.set_index("date", drop=False, inplace=True)
+    return signals
+
+
+def time_scan(signals, keys):
+    t0 = time.time()
+    for date, symbol in keys:
+        signals.loc[(signals["date"] == date) & (signals["symbol"] == symbol)]
+    return (time.time() - t0) / len(keys)
+
+
+def time_store(store, keys):
+    t0 = time.time()
+    for date, symbol in keys:
+        store.get(date, symbol)
+    return (time.time() - t0) / len(keys)
+
+
+def run(universes, nb_days, nb_lookups, nb_scans, seed):
+    np.random.seed(seed)
+    print("%10s %10s %16s %16s %12s" % (
+        "tickers", "rows", "scan (us/bar)", "store (us/bar)", "build (s)"
+    ))
+    for nb_tickers in universes:
+        signals = make_signals(nb_tickers, nb_days, seed)
+        t0 = time.time()
+        store = SignalStore(signals)
+        build = time.time() - t0
+
+        rows = np.random.randint(0, len(signals), nb_lookups)
+        keys = list(zip(
+            signals["date"].iloc[rows].tolist(),
+            signals["symbol"].iloc[rows].tolist()
+        ))
+        scan = time_scan(signals, keys[:nb_scans])
+        lookup = time_store(store, keys)
+        print("%10d %10d %16.2f %16.2f %12.3f" % (
+            nb_tickers, len(signals), scan * 1e6, lookup * 1e6, build
+        ))
+
+
+@click.command()
+@click.option('--universes', default='10,50,100,500', help='Comma separated universe sizes (number of tickers)')
+@click.option('--days', default=252 * 5, help='Number of daily bars per ticker')
+@click.option('--lookups', default=100000, help='Number of SignalStore lookups to time')
+@click.option('--scans', default=50, help='Number of boolean-scan lookups to time')
+@click.option('--seed', default=42, help='Seed')
+def main(universes, days, lookups, scans, seed):
+    universes = [int(u) for u in universes.split(",")]
+    return run(universes, days, lookups, scans, seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from __future__ import print_function
+
+import click
+
+import time
+import numpy as np
+import pandas as pd
+
+from ..price_handler.signal_store import SignalStore
+from ..strategy.window import SignalWindow
+
+
+def make_signals(nb_tickers, nb_days, seed=42):
+    """
+    Creates a synthetic signals DataFrame with the columns of the
+    bands example, one row per date and symbol, with buy and sell
+    signals every 50 bars or so.
+    """
+    np.random.seed(seed)
+    dates = pd.bdate_range("2000-01-03", periods=nb_days)
+    symbols = ["T%04d" % i for i in range(nb_tickers)]
+    n = nb_days * nb_tickers
+    close = 100.0 * np.exp(np.cumsum(
+        np.random.normal(0.0, 0.01, (nb_days, nb_tickers)), axis=0
+    )).ravel()
+    signals = pd.DataFrame({
+        "date": np.repeat(dates, nb_tickers),
+        "symbol": symbols * nb_days,
+        "close": close,
+        "trailing_stop": close * 0.90,
+        "buy": (np.random.uniform(size=n) < 0.02).astype(int),
+        "sell": (np.random.uniform(size=n) < 0.02).astype(int),
+    })
+    signals.set_index("date", drop=False, inplace=True)
+    return signals
+
+
+class ListSignals(object):
+    """
+    The previous state of the bands example, keeping every signal
+    and scanning them since the entry for the trailing stop.
+    """
+    def __init__(self):
+        self.rows = []
+        self.entry_time = None
+
+    def append(self, signal):
+        self.rows.append(signal)
+
+    def enter(self):
+        self.entry_time = self.rows[-1]["date"]
+
+    def exit(self):
+        pass
+
+    @property
+    def entry_max(self):
+        return max(
+            s["trailing_stop"] for s in self.rows
+            if s["date"] >= self.entry_time
+        )
+
+
+def trade(signals, rows):
+    """
+    Trades the rows of one ticker as the bands example does,
+    returning the number of trades.
+    """
+    invested = False
+    trades = 0
+    for signal in rows:
+        signals.append(signal)
+        exit_position = invested and signal["close"] < signals.entry_max
+        if signal["buy"] == 1 and not invested:
+            signals.enter()
+            invested = True
+            trades += 1
+        elif (signal["sell"] == 1 or exit_position) and invested:
+            signals.exit()
+            invested = False
+    return trades
+
+
+def time_trade(create, tickers_rows):
+    """
+    Returns the time per bar of trading every ticker, and the
+    number of trades.
+    """
+    trades = 0
+    nb_bars = 0
+    t0 = time.time()
+    for rows in tickers_rows:
+        trades += trade(create(), rows)
+        nb_bars += len(rows)
+    return (time.time() - t0) / nb_bars, trades
+
+
+def run(nb_tickers, nb_days, nb_list_tickers, seed):
+    signals = make_signals(nb_tickers, nb_days, seed)
+    store = SignalStore(signals)
+    dates = signals["date"].unique()
+    tickers_rows = [
+        [store.get(date, symbol) for date in dates]
+        for symbol in signals["symbol"].unique()
+    ]
+    print("Trading %s tickers of %s daily bars" % (nb_tickers, nb_days))
+    print("%-14s %8s %16s %10s" % ("state", "tickers", "time (us/bar)", "trades"))
+    for name, create, rows in [
+        ("ListSignals", ListSignals, tickers_rows[:nb_list_tickers]),
+        ("SignalWindow", SignalWindow, tickers_rows),
+    ]:
+        per_bar, trades = time_trade(create, rows)
+        print("%-14s %8d %16.2f %10d" % (name, len(rows), per_bar * 1e6, trades))
+
+
+@click.command()
+@click.option('--tickers', default=100, help='Number of tickers')
+@click.option('--days', default=252 * 20, help='Number of daily bars per ticker')
+@click.option('--list-tickers', default=5, help='Number of tickers traded with the (quadratic) ListSignals')
+@click.option('--seed', default=42, help='Seed')
+def main(tickers, days, list_tickers, seed):
+    return run(tickers, days, list_tickers, seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import numpy as np
+
+
+class OnlineMetrics(object):
+    """
+    OnlineMetrics keeps the performance statistics of an equity
+    curve up to date as it is sampled, so that they can be read
+    while a session is still running, rather than only computed
+    from the full curve once it has ended.
+
+    Each sample is taken into account in O(1):
+
+    * the mean and variance of the period returns are updated
+      with Welford's algorithm, for the Sharpe ratio, and those
+      of the negative returns for the Sortino ratio
+    * the high water mark, current and maximum drawdown, and
+      current and maximum drawdown duration are carried forward
+    * the last window returns are held in a ring buffer, with a
+      running sum and sum of squares for the rolling Sharpe ratio.
+      The sums are recomputed from the buffer every time it wraps
+      around, so that rounding errors do not build up.
+
+    The statistics follow those of TearsheetStatistics, i.e. the
+    first period return is zero, the standard deviations of the
+    Sharpe and Sortino ratios are population ones and that of the
+    rolling Sharpe ratio a sample one, which is only available once
+    the window is full.
+
+    As for TearsheetStatistics, a sample at the same timestamp as
+    the previous one replaces it: the state is saved before each
+    new timestamp and restored to apply the replacement.
+    """
+    _STATE = (
+        "timestamp", "count", "equity", "first_equity",
+        "mean", "m2", "count_neg", "mean_neg", "m2_neg",
+        "hwm", "drawdown", "max_drawdown",
+        "drawdown_duration", "max_drawdown_duration",
+        "_pos", "_filled", "_sum", "_sumsq"
+    )
+
+    def __init__(self, periods=252, window=None):
+        self.periods = periods
+        self.window = periods if window is None else window
+        self._returns = np.zeros(self.window)
+        self._saved = None
+        self.timestamp = None
+        self.count = 0
+        self.equity = None
+        self.first_equity = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count_neg = 0
+        self.mean_neg = 0.0
+        self.m2_neg = 0.0
+        self.hwm = None
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.drawdown_duration = 0
+        self.max_drawdown_duration = 0
+        self._pos = 0
+        self._filled = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def update(self, timestamp, equity):
+        """
+        Takes the equity (as a float) sampled at timestamp into
+        account, replacing the previous sample if it was taken
+        at the same timestamp.
+        """
+        if self.count and timestamp == self.timestamp:
+            values, slot = self._saved
+            for name, value in zip(self._STATE, values):
+                setattr(self, name, value)
+            self._returns[self._pos] = slot
+        else:
+            self._saved = (
+                tuple(getattr(self, name) for name in self._STATE),
+                self._returns[self._pos]
+            )
+        self.timestamp = timestamp
+        self._add(equity)
+
+    def _add(self, equity):
+        if self.count == 0:
+            self.first_equity = equity
+            self.hwm = equity
+            ret = 0.0
+        else:
+            ret = equity / self.equity - 1.0
+        self.equity = equity
+        self.count += 1
+
+        # Welford's mean and variance, of all and of negative returns
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+        if ret < 0.0:
+            self.count_neg += 1
+            delta = ret - self.mean_neg
+            self.mean_neg += delta / self.count_neg
+            self.m2_neg += delta * (ret - self.mean_neg)
+
+        # Drawdown below the high water mark, and its duration
+        if equity > self.hwm:
+            self.hwm = equity
+        self.drawdown = (self.hwm - equity) / self.hwm
+        if self.drawdown != 0.0:
+            self.drawdown_duration += 1
+        else:
+            self.drawdown_duration = 0
+        if self.drawdown > self.max_drawdown:
+            self.max_drawdown = self.drawdown
+        if self.drawdown_duration > self.max_drawdown_duration:
+            self.max_drawdown_duration = self.drawdown_duration
+
+        # Ring buffer of the returns of the rolling window
+        old = self._returns[self._pos]
+        self._returns[self._pos] = ret
+        if self._filled < self.window:
+            self._filled += 1
+            old = 0.0
+        self._pos += 1
+        if self._pos == self.window:
+            self._pos = 0
+            self._sum = self._returns.sum()
+            self._sumsq = np.dot(self._returns, self._returns)
+        else:
+            self._sum += ret - old
+            self._sumsq += ret * ret - old * old
+
+    @property
+    def sharpe(self):
+        """
+        The annualised Sharpe ratio of the period returns.
+        """
+        if self.count == 0 or self.m2 <= 0.0:
+            return np.nan
+        return np.sqrt(self.periods) * self.mean / np.sqrt(
+            self.m2 / self.count
+        )
+
+    @property
+    def sortino(self):
+        """
+        The annualised Sortino ratio of the period returns.
+        """
+        if self.count_neg == 0 or self.m2_neg <= 0.0:
+            return np.nan
+        return np.sqrt(self.periods) * self.mean / np.sqrt(
+            self.m2_neg / self.count_neg
+        )
+
+    @property
+    def rolling_sharpe(self):
+        """
+        The annualised Sharpe ratio of the returns of the last
+        window periods, or NaN until there are enough of them.
+        """
+        n = self.window
+        if self._filled < n or n < 2:
+            return np.nan
+        mean = self._sum / n
+        var = (self._sumsq - self._sum * mean) / (n - 1)
+        if var <= 0.0:
+            return np.nan
+        return np.sqrt(self.periods) * mean / np.sqrt(var)
+
+    @property
+    def cagr(self):
+        """
+        The compound annual growth rate of the equity, as
+        calculated by create_cagr.
+        """
+        if self.count == 0:
+            return np.nan
+        total = self.equity / self.first_equity
+        return total ** (float(self.periods) / self.count) - 1.0
+
+    def get_results(self):
+        """
+        Returns a dict holding the current value of each statistic.
+        """
+        return {
+            "timestamp": self.timestamp,
+            "periods": self.count,
+            "equity": self.equity,
+            "sharpe": self.sharpe,
+            "sortino": self.sortino,
+            "rolling_sharpe": self.rolling_sharpe,
+            "cagr": self.cagr,
+            "drawdown": self.drawdown,
+            "max_drawdown": self.max_drawdown,
+            "drawdown_duration": self.drawdown_duration,
+            "max_drawdown_duration": self.max_drawdown_duration,
+        }
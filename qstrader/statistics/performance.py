@@ -1,5 +1,3 @@
-from itertools import groupby
-
 import numpy as np
 import pandas as pd
 from scipy.stats import linregress
@@ -39,7 +37,7 @@ def create_cagr(equity, periods=252):
     periods - Daily (252), Hourly (252*6.5), Minutely(252*6.5*60) etc.
     """
     years = len(equity) / float(periods)
-    return (equity[-1] ** (1.0 / years)) - 1.0
+    return (equity.iloc[-1] ** (1.0 / years)) - 1.0
 
 
 def create_sharpe_ratio(returns, periods=252):
@@ -66,6 +64,37 @@ def create_sortino_ratio(returns, periods=252):
     return np.sqrt(periods) * (np.mean(returns)) / np.std(returns[returns < 0])
 
 
+def high_water_mark(equity):
+    """
+    Returns the running maximum of an equity curve as a NumPy
+    array. Missing values leave the high water mark unchanged.
+
+    Parameters:
+    equity - A pandas Series or array representing the equity curve.
+    """
+    return np.fmax.accumulate(np.asarray(equity, dtype=np.float64))
+
+
+def _runs(mask):
+    """
+    Run-length encodes a boolean array, returning the start and
+    (exclusive) end positions of each run of True values.
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return changes[::2], changes[1::2]
+
+
+def drawdown_duration(drawdown):
+    """
+    Returns the length of the longest run of non-zero drawdowns.
+    """
+    starts, ends = _runs(np.asarray(drawdown) != 0)
+    if len(starts) == 0:
+        return 0
+    return int((ends - starts).max())
+
+
 def create_drawdowns(returns):
     """
     Calculate the largest peak-to-trough drawdown of the equity curve
@@ -79,24 +108,62 @@ def create_drawdowns(returns):
     drawdown, drawdown_max, duration
     """
     # Calculate the cumulative returns curve
-    # and set up the High Water Mark
-    idx = returns.index
-    hwm = np.zeros(len(idx))
-
-    # Create the high water mark
-    for t in range(1, len(idx)):
-        hwm[t] = max(hwm[t - 1], returns.ix[t])
+    # and set up the High Water Mark, starting from zero
+    values = np.asarray(returns, dtype=np.float64)
+    hwm = high_water_mark(np.concatenate(([0.0], values[1:])))
 
     # Calculate the drawdown and duration statistics
-    perf = pd.DataFrame(index=idx)
-    perf["Drawdown"] = (hwm - returns) / hwm
-    perf["Drawdown"].ix[0] = 0.0
-    perf["DurationCheck"] = np.where(perf["Drawdown"] == 0, 0, 1)
-    duration = max(
-        sum(1 for i in g if i == 1)
-        for k, g in groupby(perf["DurationCheck"])
-    )
-    return perf["Drawdown"], np.max(perf["Drawdown"]), duration
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = (hwm - values) / hwm
+    drawdown = pd.Series(drawdown, index=returns.index, name="Drawdown")
+    if len(drawdown):
+        drawdown.iloc[0] = 0.0
+    return drawdown, np.max(drawdown), drawdown_duration(drawdown)
+
+
+def drawdown_episodes(drawdown):
+    """
+    Lists every drawdown episode, i.e. every run of periods
+    spent below the high water mark.
+
+    Parameters:
+    drawdown - A pandas Series of drawdowns, as returned
+    by create_drawdowns.
+
+    Returns:
+    A DataFrame with one row per episode, holding the first,
+    deepest and last period of the episode ("start", "trough"
+    and "end"), its maximum drawdown ("drawdown"), its length
+    in periods ("duration") and whether the high water mark was
+    regained by the end of the series ("recovered").
+    """
+    values = np.nan_to_num(np.asarray(drawdown, dtype=np.float64))
+    mask = np.asarray(drawdown) != 0
+    starts, ends = _runs(mask)
+    columns = [
+        "start", "trough", "end", "drawdown", "duration", "recovered"
+    ]
+    if len(starts) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Deepest point of each run, taking the first if it is repeated
+    lengths = ends - starts
+    depths = np.maximum.reduceat(values, starts)
+    positions = np.flatnonzero(mask)
+    run_ids = np.repeat(np.arange(len(starts)), lengths)
+    at_depth = np.flatnonzero(values[positions] == depths[run_ids])
+    _, first = np.unique(run_ids[at_depth], return_index=True)
+    troughs = positions[at_depth[first]]
+
+    index = drawdown.index
+    return pd.DataFrame({
+        "start": index[starts],
+        "trough": index[troughs],
+        "end": index[ends - 1],
+        "drawdown": depths,
+        "duration": lengths,
+        "recovered": ends < len(values),
+    }, columns=columns)
 
 
 def rsquared(x, y):
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+class TimeSeriesRecorder(object):
+    """
+    TimeSeriesRecorder records a time series of integer prices,
+    such as the equity curve of a portfolio, as it is sampled
+    through a backtest.
+
+    Each sample is written into preallocated NumPy chunks, as an
+    int64 timestamp (nanoseconds since the epoch) and an int64
+    price, i.e. 16 bytes per sample. A full chunk is kept as it
+    is and a new one allocated, so that the arrays are never
+    copied while recording and the series is built in one go at
+    the end, without boxing every sample into Python objects.
+
+    Timestamps are expected to arrive in order. A sample at the
+    same time as the previous one replaces it (keep="last") or
+    is dropped (keep="first"). Samples arriving out of order are
+    still accepted, at the cost of a sort when the series is built.
+    """
+    def __init__(self, chunk_size=8192, keep="last"):
+        if keep not in ("first", "last"):
+            raise Exception("keep must be either 'first' or 'last'")
+        self.chunk_size = chunk_size
+        self.keep = keep
+        self._chunks = []
+        self._times = np.empty(chunk_size, dtype=np.int64)
+        self._values = np.empty(chunk_size, dtype=np.int64)
+        self._pos = 0
+        self._last = None
+        self._ordered = True
+        self._tz = None
+
+    def __len__(self):
+        return len(self._chunks) * self.chunk_size + self._pos
+
+    def append(self, time, value):
+        """
+        Records the integer price value at the given time,
+        a pandas Timestamp (or anything it can be built from).
+        """
+        if not isinstance(time, pd.Timestamp):
+            time = pd.Timestamp(time)
+        ns = time.value
+        last = self._last
+        if last is None:
+            self._tz = time.tz
+        elif ns <= last:
+            if ns == last:
+                if self.keep == "last":
+                    self._values[self._pos - 1] = value
+                return
+            self._ordered = False
+        if self._pos == self.chunk_size:
+            self._chunks.append((self._times, self._values))
+            self._times = np.empty(self.chunk_size, dtype=np.int64)
+            self._values = np.empty(self.chunk_size, dtype=np.int64)
+            self._pos = 0
+        self._times[self._pos] = ns
+        self._values[self._pos] = value
+        self._pos += 1
+        self._last = ns
+
+    def arrays(self):
+        """
+        Returns the recorded times, in nanoseconds, and values
+        as two int64 arrays, in time order.
+        """
+        chunks = self._chunks + [
+            (self._times[:self._pos], self._values[:self._pos])
+        ]
+        times = np.concatenate([c[0] for c in chunks])
+        values = np.concatenate([c[1] for c in chunks])
+        if not self._ordered:
+            order = np.argsort(times, kind="stable")
+            times = times[order]
+            values = values[order]
+            # Keep one sample per time, as for in order samples
+            if self.keep == "last":
+                unique = np.append(times[1:] != times[:-1], True)
+            else:
+                unique = np.insert(times[1:] != times[:-1], 0, True)
+            times = times[unique]
+            values = values[unique]
+        return times, values
+
+    def index(self, times=None):
+        """
+        Returns the recorded times (or the given nanosecond
+        times) as a DatetimeIndex, in the time zone of the
+        recorded timestamps.
+        """
+        if times is None:
+            times = self.arrays()[0]
+        index = pd.DatetimeIndex(pd.to_datetime(times, unit="ns"))
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+        return index
+
+    def to_series(self, display=True):
+        """
+        Returns the recorded values as a Series indexed by time,
+        as displayable floats (see PriceParser.display_array),
+        or as integer prices if display is False.
+        """
+        times, values = self.arrays()
+        if display:
+            values = PriceParser.display_array(values)
+        return pd.Series(values, index=self.index(times))
@@ -1,4 +1,6 @@
 from .base import AbstractStatistics
+from . import performance as perf
+from .recorder import TimeSeriesRecorder
 from ..compat import pickle
 from ..price_parser import PriceParser
 
@@ -32,48 +34,76 @@ class SimpleStatistics(AbstractStatistics):
         Takes in a portfolio handler.
         """
         self.config = config
-        self.drawdowns = [0]
-        self.equity = []
-        self.equity_returns = [0.0]
-        # Initialize timeseries. Correct timestamp not available yet.
-        self.timeseries = ["0000-00-00 00:00:00"]
         # Initialize in order for first-step calculations to be correct.
-        current_equity = PriceParser.display(portfolio_handler.portfolio.equity)
-        self.hwm = [current_equity]
-        self.equity.append(current_equity)
+        # Correct timestamp not available yet.
+        self.initial_equity = portfolio_handler.portfolio.equity
+        # Only the first equity value of each timestamp is kept
+        self.recorder = TimeSeriesRecorder(keep="first")
+
+    @property
+    def equity(self):
+        """
+        The equity of the portfolio, initially and at each timestamp.
+        """
+        values = self.recorder.arrays()[1]
+        return PriceParser.display_array(
+            np.insert(values, 0, self.initial_equity)
+        )
+
+    @property
+    def timeseries(self):
+        """
+        The timestamps of the equity values, the initial value
+        being placed one day before the first timestamp.
+        """
+        index = self.recorder.index()
+        return index.insert(0, index[0] - pd.Timedelta(days=1))
+
+    @property
+    def equity_returns(self):
+        """
+        The percentage return between consecutive equity values.
+        """
+        equity = self.equity
+        pct = (equity[1:] - equity[:-1]) / equity[1:] * 100
+        return np.insert(np.round(pct, 4), 0, 0.0)
+
+    @property
+    def hwm(self):
+        """
+        The high water mark of the equity curve.
+        """
+        return perf.high_water_mark(self.equity).tolist()
+
+    @property
+    def drawdowns(self):
+        """
+        The drawdown of each period, below the high water mark.
+        """
+        equity = self.equity
+        return (perf.high_water_mark(equity) - equity).tolist()
 
     def update(self, timestamp, portfolio_handler):
         """
         Update all statistics that must be tracked over time.
         """
-        if timestamp != self.timeseries[-1]:
-            # Retrieve equity value of Portfolio
-            current_equity = PriceParser.display(portfolio_handler.portfolio.equity)
-            self.equity.append(current_equity)
-            self.timeseries.append(timestamp)
-
-            # Calculate percentage return between current and previous equity value.
-            pct = ((self.equity[-1] - self.equity[-2]) / self.equity[-1]) * 100
-            self.equity_returns.append(round(pct, 4))
-            # Calculate Drawdown.
-            self.hwm.append(max(self.hwm[-1], self.equity[-1]))
-            self.drawdowns.append(self.hwm[-1] - self.equity[-1])
+        # Retrieve equity value of Portfolio
+        self.recorder.append(timestamp, portfolio_handler.portfolio.equity)
 
     def get_results(self):
         """
         Return a dict with all important results & stats.
         """
-
-        # Modify timeseries in local scope only. We initialize with 0-date,
-        # but would rather show a realistic starting date.
         timeseries = self.timeseries
-        timeseries[0] = pd.to_datetime(timeseries[1]) - pd.Timedelta(days=1)
 
         statistics = {}
         statistics["sharpe"] = self.calculate_sharpe()
-        statistics["drawdowns"] = pd.Series(self.drawdowns, index=timeseries)
-        statistics["max_drawdown"] = max(self.drawdowns)
+        drawdowns = pd.Series(self.drawdowns, index=timeseries)
+        statistics["drawdowns"] = drawdowns
+        statistics["max_drawdown"] = drawdowns.max()
         statistics["max_drawdown_pct"] = self.calculate_max_drawdown_pct()
+        statistics["max_drawdown_duration"] = perf.drawdown_duration(drawdowns)
+        statistics["drawdown_episodes"] = perf.drawdown_episodes(drawdowns)
         statistics["equity"] = pd.Series(self.equity, index=timeseries)
         statistics["equity_returns"] = pd.Series(self.equity_returns, index=timeseries)
 
@@ -131,10 +161,11 @@ class SimpleStatistics(AbstractStatistics):
         fig = plt.figure()
         fig.patch.set_facecolor('white')
 
+        timeseries = self.timeseries
         df = pd.DataFrame()
-        df["equity"] = pd.Series(self.equity, index=self.timeseries)
-        df["equity_returns"] = pd.Series(self.equity_returns, index=self.timeseries)
-        df["drawdowns"] = pd.Series(self.drawdowns, index=self.timeseries)
+        df["equity"] = pd.Series(self.equity, index=timeseries)
+        df["equity_returns"] = pd.Series(self.equity_returns, index=timeseries)
+        df["drawdowns"] = pd.Series(self.drawdowns, index=timeseries)
 
         # Plot the equity curve
         ax1 = fig.add_subplot(311, ylabel='Equity Value')
@@ -1,4 +1,6 @@
 from .base import AbstractStatistics
+from .recorder import TimeSeriesRecorder
+from ..ledger import TradeTable
 from ..price_parser import PriceParser
 
 from matplotlib.ticker import FuncFormatter
@@ -44,8 +46,8 @@ class TearsheetStatistics(AbstractStatistics):
         self.benchmark = benchmark
         self.periods = periods
         self.rolling_sharpe = rolling_sharpe
-        self.equity = {}
-        self.equity_benchmark = {}
+        self.equity = TimeSeriesRecorder()
+        self.equity_benchmark = TimeSeriesRecorder()
         self.log_scale = False
 
     def update(self, timestamp, portfolio_handler):
@@ -53,27 +55,39 @@ class TearsheetStatistics(AbstractStatistics):
         Update equity curve and benchmark equity curve that must be tracked
         over time.
         """
-        self.equity[timestamp] = PriceParser.display(
-            self.portfolio_handler.portfolio.equity
+        self.equity.append(
+            timestamp, self.portfolio_handler.portfolio.equity
         )
         if self.benchmark is not None:
-            self.equity_benchmark[timestamp] = PriceParser.display(
-                self.price_handler.get_last_close(self.benchmark)
+            self.equity_benchmark.append(
+                timestamp, self.price_handler.get_last_close(self.benchmark)
             )
 
     def get_results(self):
         """
         Return a dict with all important results & stats.
         """
-        # Equity
-        equity_s = pd.Series(self.equity).sort_index()
+        equity_b = None
+        if self.benchmark is not None:
+            equity_b = self.equity_benchmark.to_series()
+        return self.create_results(
+            self.equity.to_series(), self.periods,
+            positions=self._get_positions(), equity_b=equity_b
+        )
 
+    @staticmethod
+    def create_results(equity_s, periods=252, positions=None, equity_b=None):
+        """
+        Return the dict of results & stats of an equity curve,
+        together with the closed positions (see format_positions)
+        and the benchmark equity curve, if any.
+        """
         # Returns
         returns_s = equity_s.pct_change().fillna(0.0)
 
         # Rolling Annualised Sharpe
-        rolling = returns_s.rolling(window=self.periods)
-        rolling_sharpe_s = np.sqrt(self.periods) * (
+        rolling = returns_s.rolling(window=periods)
+        rolling_sharpe_s = np.sqrt(periods) * (
             rolling.mean() / rolling.std()
         )
 
@@ -87,28 +101,27 @@ class TearsheetStatistics(AbstractStatistics):
 
         # Equity statistics
         statistics["sharpe"] = perf.create_sharpe_ratio(
-            returns_s, self.periods
+            returns_s, periods
         )
         statistics["drawdowns"] = dd_s
         # TODO: need to have max_drawdown so it can be printed at end of test
         statistics["max_drawdown"] = max_dd
         statistics["max_drawdown_pct"] = max_dd
         statistics["max_drawdown_duration"] = dd_dur
+        statistics["drawdown_episodes"] = perf.drawdown_episodes(dd_s)
         statistics["equity"] = equity_s
         statistics["returns"] = returns_s
         statistics["rolling_sharpe"] = rolling_sharpe_s
         statistics["cum_returns"] = cum_returns_s
 
-        positions = self._get_positions()
         if positions is not None:
             statistics["positions"] = positions
 
         # Benchmark statistics if benchmark ticker specified
-        if self.benchmark is not None:
-            equity_b = pd.Series(self.equity_benchmark).sort_index()
+        if equity_b is not None:
             returns_b = equity_b.pct_change().fillna(0.0)
-            rolling_b = returns_b.rolling(window=self.periods)
-            rolling_sharpe_b = np.sqrt(self.periods) * (
+            rolling_b = returns_b.rolling(window=periods)
+            rolling_sharpe_b = np.sqrt(periods) * (
                 rolling_b.mean() / rolling_b.std()
             )
             cum_returns_b = np.exp(np.log(1 + returns_b).cumsum())
@@ -117,6 +130,7 @@ class TearsheetStatistics(AbstractStatistics):
             statistics["drawdowns_b"] = dd_b
             statistics["max_drawdown_pct_b"] = max_dd_b
             statistics["max_drawdown_duration_b"] = dd_dur_b
+            statistics["drawdown_episodes_b"] = perf.drawdown_episodes(dd_b)
             statistics["equity_b"] = equity_b
             statistics["returns_b"] = returns_b
             statistics["rolling_sharpe_b"] = rolling_sharpe_b
@@ -126,38 +140,37 @@ class TearsheetStatistics(AbstractStatistics):
 
     def _get_positions(self):
         """
-        Retrieve the list of closed Positions objects from the portfolio
-        and reformat into a pandas dataframe to be returned
+        Retrieve the closed positions from the portfolio, either a
+        list of Position objects or a TradeTable, and reformat them
+        into a pandas dataframe to be returned
         """
-        def x(p):
-            return PriceParser.display(p)
-
         pos = self.portfolio_handler.portfolio.closed_positions
-        a = []
-        for p in pos:
-            a.append(p.__dict__)
-        if len(a) == 0:
+        if len(pos) == 0:
             # There are no closed positions
             return None
         else:
-            df = pd.DataFrame(a)
-            df['avg_bot'] = df['avg_bot'].apply(x)
-            df['avg_price'] = df['avg_price'].apply(x)
-            df['avg_sld'] = df['avg_sld'].apply(x)
-            df['cost_basis'] = df['cost_basis'].apply(x)
-            df['init_commission'] = df['init_commission'].apply(x)
-            df['init_price'] = df['init_price'].apply(x)
-            df['market_value'] = df['market_value'].apply(x)
-            df['net'] = df['net'].apply(x)
-            df['net_incl_comm'] = df['net_incl_comm'].apply(x)
-            df['net_total'] = df['net_total'].apply(x)
-            df['realised_pnl'] = df['realised_pnl'].apply(x)
-            df['total_bot'] = df['total_bot'].apply(x)
-            df['total_commission'] = df['total_commission'].apply(x)
-            df['total_sld'] = df['total_sld'].apply(x)
-            df['unrealised_pnl'] = df['unrealised_pnl'].apply(x)
-            df['trade_pct'] = (df['avg_sld'] / df['avg_bot'] - 1.0)
-            return df
+            if isinstance(pos, TradeTable):
+                df = pos.to_frame()
+            else:
+                df = pd.DataFrame([p.__dict__ for p in pos])
+            return self.format_positions(df)
+
+    @staticmethod
+    def format_positions(df):
+        """
+        Converts the integer prices of a DataFrame of closed
+        positions for display and adds the return of each trade.
+        """
+        for col in (
+            'avg_bot', 'avg_price', 'avg_sld', 'cost_basis',
+            'init_commission', 'init_price', 'market_value',
+            'net', 'net_incl_comm', 'net_total', 'realised_pnl',
+            'total_bot', 'total_commission', 'total_sld',
+            'unrealised_pnl'
+        ):
+            df[col] = PriceParser.display_array(df[col])
+        df['trade_pct'] = (df['avg_sld'] / df['avg_bot'] - 1.0)
+        return df
 
     def _plot_equity(self, stats, ax=None, **kwargs):
         """
@@ -0,0 +1,73 @@
+"""
+Test the online metrics against the statistics of the full curve
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.statistics import performance as perf
+from qstrader.statistics.online import OnlineMetrics
+
+
+class TestOnlineMetrics(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        n = 1000
+        self.index = pd.date_range("2010-01-01", periods=n, freq="D")
+        self.equity = pd.Series(
+            10000.0 * np.exp(np.cumsum(np.random.normal(0.0, 0.01, n))),
+            index=self.index
+        )
+
+    def assert_matches(self, metrics, equity, window):
+        returns = equity.pct_change().fillna(0.0)
+        cum_returns = np.exp(np.log(1 + returns).cumsum())
+        dd, max_dd, dd_dur = perf.create_drawdowns(cum_returns)
+        rolling = returns.rolling(window=window)
+        rolling_sharpe = np.sqrt(252) * rolling.mean() / rolling.std()
+        results = metrics.get_results()
+        self.assertEqual(results["periods"], len(equity))
+        self.assertAlmostEqual(
+            results["sharpe"], perf.create_sharpe_ratio(returns)
+        )
+        self.assertAlmostEqual(
+            results["sortino"], perf.create_sortino_ratio(returns)
+        )
+        # NaN until the window is full, as for the rolling statistics
+        np.testing.assert_allclose(
+            results["rolling_sharpe"], rolling_sharpe.iloc[-1], rtol=1e-9
+        )
+        self.assertAlmostEqual(
+            results["cagr"], perf.create_cagr(equity / equity.iloc[0])
+        )
+        self.assertAlmostEqual(results["drawdown"], dd.iloc[-1])
+        self.assertAlmostEqual(results["max_drawdown"], max_dd)
+        self.assertEqual(results["max_drawdown_duration"], dd_dur)
+
+    def test_matches_full_curve(self):
+        metrics = OnlineMetrics(window=100)
+        for i, (time, equity) in enumerate(self.equity.items()):
+            metrics.update(time, equity)
+            # Check while running, before and after the window wraps
+            if i in (50, 99, 100, 537):
+                self.assert_matches(metrics, self.equity.iloc[:i + 1], 100)
+        self.assert_matches(metrics, self.equity, 100)
+
+    def test_same_timestamp_replaces_sample(self):
+        metrics = OnlineMetrics(window=100)
+        for time, equity in self.equity.items():
+            # An intermediate value at each timestamp, which is replaced
+            metrics.update(time, equity * 1.05)
+            metrics.update(time, equity)
+        self.assert_matches(metrics, self.equity, 100)
+
+    def test_empty(self):
+        results = OnlineMetrics().get_results()
+        self.assertEqual(results["periods"], 0)
+        self.assertTrue(np.isnan(results["sharpe"]))
+        self.assertTrue(np.isnan(results["rolling_sharpe"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Test the drawdown statistics
+"""
+import unittest
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+from qstrader.statistics import performance as perf
+
+
+def loop_drawdowns(returns):
+    """
+    The original, element by element, create_drawdowns
+    """
+    hwm = np.zeros(len(returns))
+    for t in range(1, len(returns)):
+        hwm[t] = max(hwm[t - 1], returns.iloc[t])
+    drawdown = (hwm - returns.values) / hwm
+    drawdown[0] = 0.0
+    check = np.where(drawdown == 0, 0, 1)
+    duration = max(
+        sum(1 for i in g if i == 1) for k, g in groupby(check)
+    )
+    return drawdown, np.max(drawdown), duration
+
+
+class TestDrawdowns(unittest.TestCase):
+    """
+    Test create_drawdowns matches the original loop and
+    drawdown_episodes lists every underwater run
+    """
+    def setUp(self):
+        np.random.seed(42)
+        returns = np.random.normal(0.0005, 0.01, 5000)
+        self.cum_returns = pd.Series(
+            np.exp(np.log(1 + returns).cumsum()),
+            index=pd.bdate_range("2000-01-03", periods=5000)
+        )
+
+    def test_create_drawdowns(self):
+        dd, dd_max, dd_dur = perf.create_drawdowns(self.cum_returns)
+        expected, expected_max, expected_dur = loop_drawdowns(
+            self.cum_returns
+        )
+        self.assertTrue(dd.index.equals(self.cum_returns.index))
+        np.testing.assert_allclose(dd.values, expected, rtol=1e-12)
+        self.assertAlmostEqual(dd_max, expected_max, places=12)
+        self.assertEqual(dd_dur, expected_dur)
+
+    def test_drawdown_episodes(self):
+        index = pd.bdate_range("2000-01-03", periods=10)
+        equity = pd.Series(
+            [1.0, 1.1, 1.0, 0.9, 1.2, 1.2, 1.1, 1.0, 1.15, 1.1],
+            index=index
+        )
+        dd, dd_max, dd_dur = perf.create_drawdowns(equity)
+        episodes = perf.drawdown_episodes(dd)
+        self.assertEqual(dd_dur, 4)
+        self.assertEqual(len(episodes), 2)
+        self.assertEqual(list(episodes["start"]), [index[2], index[6]])
+        self.assertEqual(list(episodes["trough"]), [index[3], index[7]])
+        self.assertEqual(list(episodes["end"]), [index[3], index[9]])
+        self.assertEqual(list(episodes["duration"]), [2, 4])
+        self.assertEqual(list(episodes["recovered"]), [True, False])
+        np.testing.assert_allclose(
+            episodes["drawdown"].values, [0.2 / 1.1, 0.2 / 1.2]
+        )
+        self.assertAlmostEqual(dd_max, 0.2 / 1.1)
+
+    def test_no_drawdown(self):
+        equity = pd.Series(np.arange(1.0, 11.0))
+        dd, dd_max, dd_dur = perf.create_drawdowns(equity)
+        self.assertEqual(dd_max, 0.0)
+        self.assertEqual(dd_dur, 0)
+        self.assertEqual(len(perf.drawdown_episodes(dd)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
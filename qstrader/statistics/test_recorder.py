@@ -0,0 +1,67 @@
+"""
+Test the columnar time series recorder used by the statistics
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.price_parser import PriceParser
+from qstrader.statistics.recorder import TimeSeriesRecorder
+
+
+class TestTimeSeriesRecorder(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.times = pd.date_range("2010-01-01", periods=1000, freq="h")
+        self.values = np.random.randint(1, 10**12, len(self.times))
+
+    def test_matches_dict_of_timestamps(self):
+        """
+        Records across several chunks, with repeated timestamps,
+        giving the same Series as a dict keyed by timestamp.
+        """
+        recorder = TimeSeriesRecorder(chunk_size=64)
+        equity = {}
+        for i, time in enumerate(self.times):
+            for value in self.values[i:i + 1 + i % 3]:
+                recorder.append(time, value)
+                equity[time] = PriceParser.display(value)
+        self.assertEqual(len(recorder), len(self.times))
+        expected = pd.Series(equity).sort_index()
+        series = recorder.to_series()
+        self.assertTrue(series.index.equals(expected.index))
+        np.testing.assert_array_equal(series.values, expected.values)
+
+    def test_keep_first(self):
+        recorder = TimeSeriesRecorder(keep="first")
+        recorder.append(self.times[0], 1)
+        recorder.append(self.times[0], 2)
+        recorder.append(self.times[1], 3)
+        times, values = recorder.arrays()
+        np.testing.assert_array_equal(values, [1, 3])
+        with self.assertRaises(Exception):
+            TimeSeriesRecorder(keep="all")
+
+    def test_out_of_order(self):
+        recorder = TimeSeriesRecorder(chunk_size=16)
+        order = np.random.permutation(len(self.times))
+        for i in order:
+            recorder.append(self.times[i], self.values[i])
+        # A later value for an earlier timestamp replaces it
+        recorder.append(self.times[0], 7)
+        series = recorder.to_series(display=False)
+        self.assertTrue(series.index.equals(self.times))
+        self.assertEqual(series.iloc[0], 7)
+        np.testing.assert_array_equal(series.values[1:], self.values[1:])
+
+    def test_time_zone(self):
+        times = self.times.tz_localize("US/Eastern")
+        recorder = TimeSeriesRecorder()
+        for time, value in zip(times, self.values):
+            recorder.append(time, value)
+        self.assertTrue(recorder.to_series().index.equals(times))
+
+
+if __name__ == "__main__":
+    unittest.main()
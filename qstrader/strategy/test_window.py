@@ -0,0 +1,116 @@
+"""
+Test the signal window keeps the trailing stop of the signals kept in full
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.price_handler.signal_store import SignalStore
+from qstrader.strategy.window import SignalWindow
+
+
+def make_signals(nb_days, seed=42):
+    """
+    Signals of a single ticker, with the columns of the bands
+    example, buying and selling every 50 bars or so.
+    """
+    np.random.seed(seed)
+    close = 100.0 * np.exp(np.cumsum(np.random.normal(0.0, 0.01, nb_days)))
+    signals = pd.DataFrame({
+        "date": pd.bdate_range("2000-01-03", periods=nb_days),
+        "symbol": "T0001",
+        "close": close,
+        "trailing_stop": close * 0.90,
+        "buy": (np.random.uniform(size=nb_days) < 0.02).astype(int),
+        "sell": (np.random.uniform(size=nb_days) < 0.02).astype(int),
+    })
+    signals.set_index("date", drop=False, inplace=True)
+    return signals
+
+
+class ListSignals(object):
+    """
+    Keeps every signal, scanning them since the entry for
+    the maximum trailing stop.
+    """
+    def __init__(self):
+        self.rows = []
+        self.entry_time = None
+
+    def append(self, signal):
+        self.rows.append(signal)
+
+    def enter(self):
+        self.entry_time = self.rows[-1]["date"]
+
+    def exit(self):
+        pass
+
+    @property
+    def entry_max(self):
+        return max(
+            s["trailing_stop"] for s in self.rows
+            if s["date"] >= self.entry_time
+        )
+
+
+def trade(signals, rows):
+    """
+    Trades the rows as the bands example does, returning
+    the dates of the entries and exits.
+    """
+    invested = False
+    trades = []
+    for signal in rows:
+        signals.append(signal)
+        exit_position = invested and signal["close"] < signals.entry_max
+        if signal["buy"] == 1 and not invested:
+            signals.enter()
+            invested = True
+            trades.append(("BOT", signal["date"]))
+        elif (signal["sell"] == 1 or exit_position) and invested:
+            signals.exit()
+            invested = False
+            trades.append(("SLD", signal["date"]))
+    return trades
+
+
+class TestSignalWindow(unittest.TestCase):
+    def setUp(self):
+        signals = make_signals(1000)
+        store = SignalStore(signals)
+        self.rows = [
+            store.get(date, "T0001") for date in signals["date"].unique()
+        ]
+
+    def test_entry_max(self):
+        window = SignalWindow(size=2)
+        full = ListSignals()
+        invested = False
+        for signal in self.rows:
+            window.append(signal)
+            full.append(signal)
+            self.assertEqual(window[-1], full.rows[-1])
+            if invested:
+                self.assertEqual(window.entry_max, full.entry_max)
+                if signal["sell"] == 1:
+                    window.exit()
+                    full.exit()
+                    invested = False
+            elif signal["buy"] == 1:
+                window.enter()
+                full.enter()
+                invested = True
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.count, len(self.rows))
+        self.assertEqual(window[-2], self.rows[-2])
+
+    def test_trades(self):
+        trades = trade(ListSignals(), self.rows)
+        self.assertGreater(len(trades), 10)
+        self.assertEqual(trade(SignalWindow(), self.rows), trades)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from collections import deque
+
+
+class SignalWindow(object):
+    """
+    SignalWindow holds the state a strategy keeps from the signals
+    of one ticker's bars (see SignalRow) in constant time and memory
+    per bar, rather than every signal received so far.
+
+    The last size signals are kept in a ring buffer, indexed as a
+    list (window[-1] being the latest), and count is the number of
+    signals appended in total. Once a position is entered (see
+    enter), the window also keeps the running maximum of max_field
+    (e.g. a trailing stop) over the signals since the entry, and
+    the number of bars since then.
+    """
+    def __init__(self, size=2, max_field="trailing_stop"):
+        self.rows = deque(maxlen=size)
+        self.max_field = max_field
+        self.count = 0
+        self.entry_time = None
+        self.entry_max = None
+        self.entry_bars = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    def append(self, signal):
+        """
+        Adds the signal of the latest bar.
+        """
+        self.rows.append(signal)
+        self.count += 1
+        if self.entry_time is not None:
+            self.entry_bars += 1
+            value = signal[self.max_field]
+            if value > self.entry_max:
+                self.entry_max = value
+
+    def enter(self):
+        """
+        Starts tracking the position entered on the latest bar,
+        whose signal is included in the running maximum.
+        """
+        signal = self.rows[-1]
+        self.entry_time = signal["date"]
+        self.entry_max = signal[self.max_field]
+        self.entry_bars = 1
+
+    def exit(self):
+        """
+        Stops tracking the position.
+        """
+        self.entry_time = None
+        self.entry_max = None
+        self.entry_bars = 0
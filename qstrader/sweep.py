@@ -0,0 +1,165 @@
+from __future__ import print_function
+
+import contextlib
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .compat import queue
+from .compliance.null import NullCompliance
+from .event_queue import EventDeque
+from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from .statistics import performance as perf
+from .trading_session import TradingSession
+
+# The sweep being run, set in the parent process before the
+# workers are forked so that they inherit its loaded prices
+_SWEEP = None
+
+
+def expand_grid(grid):
+    """
+    Returns the list of points of a parameter grid, given either
+    as a dict mapping parameter names to lists of values, of
+    which every combination is taken, or as a list of such dicts.
+    """
+    if isinstance(grid, dict):
+        grid = [grid]
+    points = []
+    for subgrid in grid:
+        names = sorted(subgrid)
+        for values in itertools.product(*[subgrid[name] for name in names]):
+            points.append(dict(zip(names, values)))
+    return points
+
+
+def _run_point(params):
+    return _SWEEP.run_point(params)
+
+
+class ParameterSweep(object):
+    """
+    ParameterSweep runs one backtest TradingSession per point of
+    a parameter grid, optionally across a ProcessPoolExecutor,
+    and collects the Sharpe ratio, maximum drawdown (and its
+    duration) and CAGR of every point into a DataFrame.
+
+    The price data, and the signals calculated from it, are
+    loaded once by a template price handler. Each backtest
+    streams from a clone of the template, and the workers are
+    forked after it has been loaded, so that they share the
+    prices rather than re-reading the CSV files (unless they are
+    read chunk by chunk). The price handler must implement clone.
+
+    strategy_factory is called as
+    strategy_factory(tickers, events_queue, **params) for each
+    point and returns either the strategy, or a dict of
+    TradingSession keyword arguments holding the "strategy" and
+    any other components to use (e.g. a "position_sizer").
+    Trades are not written to the trade log unless a
+    "compliance" is given.
+    """
+    def __init__(
+        self, config, strategy_factory, tickers,
+        equity, start_date, end_date,
+        price_handler=None, title=None, benchmark=None,
+        batched=True, quiet=True
+    ):
+        self.config = config
+        self.strategy_factory = strategy_factory
+        self.tickers = tickers
+        self.equity = equity
+        self.start_date = start_date
+        self.end_date = end_date
+        self.title = title
+        self.benchmark = benchmark
+        self.batched = batched
+        self.quiet = quiet
+        if price_handler is None:
+            price_handler = YahooDailyCsvBarPriceHandler(
+                config.CSV_DATA_DIR, EventDeque(),
+                tickers, start_date=start_date, end_date=end_date,
+                cache_dir=getattr(config, "CACHE_DIR", None)
+            )
+        if not callable(getattr(price_handler, "clone", None)):
+            raise Exception(
+                "The price handler of a sweep must implement "
+                "clone(events_queue), as the Yahoo daily, IQFeed "
+                "intraday and historic tick CSV handlers do"
+            )
+        self.price_handler = price_handler
+
+    def run_point(self, params):
+        """
+        Runs the backtest of a single point of the grid, returning
+        the parameters together with the performance statistics.
+        """
+        events_queue = EventDeque() if self.batched else queue.Queue()
+        components = self.strategy_factory(
+            self.tickers, events_queue, **params
+        )
+        if not isinstance(components, dict):
+            components = {"strategy": components}
+        if "strategy" not in components:
+            raise Exception("The strategy factory must return a strategy")
+        components.setdefault("compliance", NullCompliance(self.config))
+        session = TradingSession(
+            self.config, tickers=self.tickers, equity=self.equity,
+            start_date=self.start_date, end_date=self.end_date,
+            events_queue=events_queue,
+            price_handler=self.price_handler.clone(events_queue),
+            title=self.title, benchmark=self.benchmark,
+            batched=self.batched, **components
+        )
+        if self.quiet:
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    results = session.start_trading(testing=True)
+        else:
+            results = session.start_trading(testing=True)
+        equity = results["equity"]
+        periods = getattr(session.statistics, "periods", 252)
+        row = dict(params)
+        row["sharpe"] = results["sharpe"]
+        row["max_drawdown"] = results["max_drawdown_pct"]
+        row["max_drawdown_duration"] = results.get("max_drawdown_duration")
+        row["cagr"] = perf.create_cagr(equity / equity.iloc[0], periods)
+        return row
+
+    def run(self, grid, max_workers=None):
+        """
+        Runs every point of grid (see expand_grid), returning a
+        DataFrame with one row per point, in the order of the grid.
+
+        The points are spread over max_workers processes (the
+        number of CPUs by default), or run in this process if
+        max_workers is 1. The workers are forked, so that they
+        inherit the loaded prices, which requires a platform
+        supporting the fork start method.
+        """
+        global _SWEEP
+        points = expand_grid(grid)
+        if max_workers == 1:
+            rows = [self.run_point(params) for params in points]
+        else:
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise Exception(
+                    "Parallel sweeps require the fork start method, "
+                    "use max_workers=1 on this platform"
+                )
+            _SWEEP = self
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("fork")
+                ) as executor:
+                    rows = list(executor.map(_run_point, points))
+            finally:
+                _SWEEP = None
+        columns = sorted(set().union(*points)) if points else []
+        return pd.DataFrame(rows, columns=columns + [
+            "sharpe", "max_drawdown", "max_drawdown_duration", "cagr"
+        ])
@@ -0,0 +1,50 @@
+"""
+Test the slotted events keep the attribute API of the events
+"""
+import pickle
+import unittest
+
+from qstrader.event import (
+    EventType, TickEvent, BarEvent, SignalEvent, OrderEvent, FillEvent
+)
+
+
+class TestEvents(unittest.TestCase):
+    def test_bar_event(self):
+        bev = BarEvent(
+            "GOOG", 0, 86400, 70, 71, 69, 70, 1000, adj_close_price=70
+        )
+        self.assertEqual(bev.type, EventType.BAR)
+        self.assertEqual(bev.typename, "BAR")
+        self.assertEqual(bev.period_readable, "1day")
+        self.assertEqual(
+            BarEvent("GOOG", 0, 7, 1, 1, 1, 1, 1).period_readable, "7sec"
+        )
+        self.assertIsNone(bev.signal)
+        bev.signal = {"buy": True}
+        self.assertEqual(bev.signal["buy"], True)
+        self.assertIn("Period: 1day", str(bev))
+
+    def test_no_instance_dict(self):
+        events = [
+            TickEvent("GOOG", 0, 1, 2),
+            BarEvent("GOOG", 0, 60, 1, 1, 1, 1, 1),
+            SignalEvent("GOOG", "BOT"),
+            OrderEvent("GOOG", "BOT", 100),
+            FillEvent(0, "GOOG", "BOT", 100, "ARCA", 1, 1),
+        ]
+        for event in events:
+            self.assertFalse(hasattr(event, "__dict__"))
+            with self.assertRaises(AttributeError):
+                event.unknown = 1
+
+    def test_pickle(self):
+        order = pickle.loads(pickle.dumps(OrderEvent("GOOG", "SLD", 10)))
+        self.assertEqual(order.type, EventType.ORDER)
+        self.assertEqual(
+            (order.ticker, order.action, order.quantity), ("GOOG", "SLD", 10)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Test the incremental revaluation and the ledger backend of the Portfolio
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.ledger import TradeTable
+from qstrader.portfolio import Portfolio
+from qstrader.price_parser import PriceParser
+
+
+class PriceHandlerMock(object):
+    def __init__(self, tickers):
+        self.prices = dict(
+            (ticker, PriceParser.parse(100.0)) for ticker in tickers
+        )
+
+    def istick(self):
+        return False
+
+    def get_last_close(self, ticker):
+        return self.prices[ticker]
+
+
+class TestIncrementalPortfolio(unittest.TestCase):
+    """
+    Test that revaluing only the position whose price changed
+    keeps the same equity and unrealised PnL as revaluing every
+    open position after each price change
+    """
+    def setUp(self):
+        np.random.seed(42)
+        self.tickers = ["T%02d" % i for i in range(20)]
+        self.price_handler = PriceHandlerMock(self.tickers)
+        self.portfolio = Portfolio(
+            self.price_handler, PriceParser.parse(500000.0), debug=True
+        )
+
+    def test_incremental_matches_full_revaluation(self):
+        portfolio = self.portfolio
+        prices = self.price_handler.prices
+        for step in range(2000):
+            ticker = self.tickers[np.random.randint(len(self.tickers))]
+            if np.random.random() < 0.1:
+                # Trade at the last price, closing out
+                # the position half of the time
+                action = "BOT" if np.random.random() < 0.5 else "SLD"
+                quantity = int(np.random.randint(1, 100))
+                position = portfolio.positions.get(ticker)
+                if position is not None and np.random.random() < 0.5:
+                    action = "SLD" if position.net > 0 else "BOT"
+                    quantity = abs(position.net)
+                portfolio.transact_position(
+                    action, ticker, quantity,
+                    prices[ticker], PriceParser.parse(1.0)
+                )
+            else:
+                # New price, raising if the running totals differ
+                # from a full revaluation in debug mode
+                prices[ticker] = PriceParser.parse(
+                    PriceParser.display(prices[ticker]) *
+                    np.exp(np.random.normal(0.0, 0.01))
+                )
+                portfolio._update_position(ticker)
+        self.assertTrue(len(portfolio.positions) > 0)
+        self.assertTrue(len(portfolio.closed_positions) > 0)
+
+    def test_check_detects_mismatch(self):
+        prices = self.price_handler.prices
+        self.portfolio.transact_position(
+            "BOT", "T00", 100, prices["T00"], PriceParser.parse(1.0)
+        )
+        self.portfolio.transact_position(
+            "BOT", "T01", 100, prices["T01"], PriceParser.parse(1.0)
+        )
+        # A price change which is not applied to the running totals
+        prices["T01"] = PriceParser.parse(110.0)
+        prices["T00"] = PriceParser.parse(90.0)
+        with self.assertRaises(Exception):
+            self.portfolio._update_position("T00")
+
+
+class TestLedgerPortfolio(unittest.TestCase):
+    """
+    Test the array backed ledger of positions gives the same
+    values and closed trades as the dict of Position objects
+    """
+    def test_ledger_matches_positions(self):
+        np.random.seed(42)
+        tickers = ["T%02d" % i for i in range(20)]
+        price_handler = PriceHandlerMock(tickers)
+        prices = price_handler.prices
+        portfolio = Portfolio(price_handler, PriceParser.parse(500000.0))
+        ledger = Portfolio(
+            price_handler, PriceParser.parse(500000.0), ledger=True
+        )
+        # Small enough for the trade table to have to grow
+        ledger.closed_positions = TradeTable(capacity=4)
+        for step in range(3000):
+            ticker = tickers[np.random.randint(len(tickers))]
+            if np.random.random() < 0.2:
+                action = "BOT" if np.random.random() < 0.5 else "SLD"
+                quantity = int(np.random.randint(1, 100))
+                position = portfolio.positions.get(ticker)
+                if position is not None and np.random.random() < 0.5:
+                    action = "SLD" if position.net > 0 else "BOT"
+                    quantity = abs(position.net)
+                for p in (portfolio, ledger):
+                    p.transact_position(
+                        action, ticker, quantity,
+                        prices[ticker], PriceParser.parse(1.0)
+                    )
+            else:
+                prices[ticker] = PriceParser.parse(
+                    PriceParser.display(prices[ticker]) *
+                    np.exp(np.random.normal(0.0, 0.01))
+                )
+                portfolio._update_position(ticker)
+                ledger._update_position(ticker)
+            self.assertEqual(portfolio.equity, ledger.equity)
+            self.assertEqual(portfolio.unrealised_pnl, ledger.unrealised_pnl)
+            self.assertEqual(
+                sorted(portfolio.positions), sorted(ledger.positions)
+            )
+        for ticker in portfolio.positions:
+            self.assertEqual(
+                portfolio.positions[ticker].__dict__,
+                ledger.positions[ticker].to_position().__dict__
+            )
+
+        self.assertIsInstance(ledger.closed_positions, TradeTable)
+        self.assertTrue(len(ledger.closed_positions) > 4)
+        expected = pd.DataFrame(
+            [p.__dict__ for p in portfolio.closed_positions]
+        )
+        trades = ledger.closed_positions.to_frame()
+        self.assertEqual(list(expected.columns), list(trades.columns))
+        for col in expected.columns:
+            np.testing.assert_array_equal(
+                expected[col].values, trades[col].values, err_msg=col
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Test the price parser conversions, scalar and vectorised
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.price_parser import PriceParser
+
+
+class TestPriceParser(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(PriceParser.parse(12500000), 12500000)
+        self.assertEqual(PriceParser.parse(1.25), 12500000)
+        self.assertEqual(PriceParser.parse("1.25"), 12500000)
+        self.assertIsInstance(PriceParser.parse(1.25), int)
+
+    def test_parse_numpy_scalars(self):
+        value = PriceParser.parse(np.int64(12500000))
+        self.assertEqual(value, 12500000)
+        self.assertIsInstance(value, np.int64)
+        value = PriceParser.parse(np.float64(1.25))
+        self.assertEqual(value, 12500000)
+        self.assertIsInstance(value, int)
+
+    def test_display(self):
+        self.assertEqual(PriceParser.display(12500000), 1.25)
+        self.assertEqual(PriceParser.display(12345678, 4), 1.2346)
+        self.assertEqual(PriceParser.display(np.int64(12345678)), 1.23)
+        self.assertEqual(PriceParser.display(1.2345), 1.23)
+        self.assertEqual(PriceParser.display(np.float64(1.2345), 3), 1.234)
+
+    def test_unsupported(self):
+        for x in (None, [1.25], np.float32(1.25)):
+            with self.assertRaises(NotImplementedError):
+                PriceParser.parse(x)
+            with self.assertRaises(NotImplementedError):
+                PriceParser.display(x)
+        with self.assertRaises(NotImplementedError):
+            PriceParser.display(12500000, 2.0)
+
+    def test_parse_array(self):
+        values = [1.25, 101.37, 0.0001, 99999.99]
+        np.testing.assert_array_equal(
+            PriceParser.parse_array(values),
+            [PriceParser.parse(v) for v in values]
+        )
+        ints = np.array([12500000, 1], dtype=np.int32)
+        parsed = PriceParser.parse_array(ints)
+        self.assertEqual(parsed.dtype, np.int64)
+        np.testing.assert_array_equal(parsed, ints)
+        with self.assertRaises(ValueError):
+            PriceParser.parse_array([1.25, np.nan])
+
+    def test_parse_series(self):
+        series = pd.Series([1.25, 2.5], index=["a", "b"], name="close")
+        parsed = PriceParser.parse_array(series)
+        self.assertIsInstance(parsed, pd.Series)
+        self.assertEqual(parsed.name, "close")
+        self.assertEqual(list(parsed.index), ["a", "b"])
+        self.assertEqual(list(parsed), [12500000, 25000000])
+
+    def test_display_array(self):
+        # Exact ties at the rounding digit, as ints and as floats
+        ints = np.array([1250000, 1350000, -1250000, 10050000, 12345678])
+        np.testing.assert_array_equal(
+            PriceParser.display_array(ints),
+            [PriceParser.display(int(v)) for v in ints]
+        )
+        floats = np.array([0.25, 0.75, -0.25, 1.2345])
+        np.testing.assert_array_equal(
+            PriceParser.display_array(floats, 1),
+            [PriceParser.display(float(v), 1) for v in floats]
+        )
+        series = pd.Series(ints, name="close")
+        displayed = PriceParser.display_array(series, 4)
+        self.assertIsInstance(displayed, pd.Series)
+        self.assertEqual(displayed.name, "close")
+        self.assertEqual(displayed.iloc[-1], 1.2346)
+
+
+if __name__ == "__main__":
+    unittest.main()
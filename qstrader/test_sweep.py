@@ -0,0 +1,24 @@
+"""
+Test the parameter sweep checks its price handler can be cloned
+"""
+import unittest
+
+from qstrader.sweep import ParameterSweep
+
+
+class PriceHandlerMock(object):
+    pass
+
+
+class TestParameterSweep(unittest.TestCase):
+    def test_price_handler_without_clone(self):
+        with self.assertRaises(Exception) as context:
+            ParameterSweep(
+                None, None, ["AAA"], 100000.0, None, None,
+                price_handler=PriceHandlerMock()
+            )
+        self.assertIn("clone", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
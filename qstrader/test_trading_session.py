@@ -0,0 +1,152 @@
+"""
+Test the online metrics are updated while a live session runs
+"""
+from datetime import datetime, timedelta
+import unittest
+
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.event import BarEvent
+from qstrader.price_parser import PriceParser
+from qstrader.statistics.online import OnlineMetrics
+from qstrader.trading_session import TradingSession
+
+
+class PriceHandlerMock(object):
+    def __init__(self, events_queue):
+        self.events_queue = events_queue
+        self.time = pd.Timestamp("2017-01-02")
+
+    def stream_next(self):
+        self.time += timedelta(days=1)
+        price = PriceParser.parse(100.0)
+        self.events_queue.put(BarEvent(
+            "AAA", self.time, 86400, price, price, price, price, 1000, price
+        ))
+
+
+class PortfolioMock(object):
+    def __init__(self):
+        self.equity = PriceParser.parse(100000.0)
+
+
+class PortfolioHandlerMock(object):
+    def __init__(self):
+        self.portfolio = PortfolioMock()
+
+    def update_portfolio_value(self, ticker):
+        # Alternately gaining 1% and losing 0.5%
+        if self.portfolio.equity % 2:
+            self.portfolio.equity = self.portfolio.equity * 995 // 1000
+        else:
+            self.portfolio.equity = self.portfolio.equity * 101 // 100 + 1
+
+    def on_signal(self, event):
+        pass
+
+    def on_fill(self, event):
+        pass
+
+
+class StatisticsMock(object):
+    periods = 252
+
+    def update(self, timestamp, portfolio_handler):
+        pass
+
+    def get_results(self):
+        return {"sharpe": 0.0, "max_drawdown_pct": 0.0}
+
+
+class ComplianceMock(object):
+    """
+    A compliance written before close() was called by the
+    trading session, which does not define it.
+    """
+    def record_trade(self, fill):
+        pass
+
+
+class ClosedComplianceMock(ComplianceMock):
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ExecutionHandlerMock(object):
+    def execute_order(self, event):
+        pass
+
+
+class MetricsStrategy(object):
+    """
+    Reads the online metrics of the session on every bar,
+    ending the session after nb_bars bars.
+    """
+    def __init__(self, nb_bars):
+        self.nb_bars = nb_bars
+        self.session = None
+        self.results = []
+
+    def calculate_signals(self, event):
+        metrics = self.session.online_metrics
+        self.results.append(metrics.get_results())
+        if len(self.results) == self.nb_bars:
+            self.session.end_session_time = datetime.now()
+
+
+class FailingStrategy(MetricsStrategy):
+    def calculate_signals(self, event):
+        super(FailingStrategy, self).calculate_signals(event)
+        if len(self.results) == self.nb_bars:
+            raise Exception("strategy failed")
+
+
+class TestLiveSession(unittest.TestCase):
+    def make_session(self, strategy, compliance):
+        events_queue = queue.Queue()
+        session = TradingSession(
+            None, strategy, ["AAA"], 100000.0, None, None, events_queue,
+            session_type="live",
+            end_session_time=datetime.now() + timedelta(seconds=60),
+            price_handler=PriceHandlerMock(events_queue),
+            portfolio_handler=PortfolioHandlerMock(),
+            compliance=compliance,
+            execution_handler=ExecutionHandlerMock(),
+            statistics=StatisticsMock()
+        )
+        strategy.session = session
+        return session
+
+    def test_online_metrics(self):
+        strategy = MetricsStrategy(50)
+        session = self.make_session(strategy, ComplianceMock())
+        self.assertIsInstance(session.online_metrics, OnlineMetrics)
+        session._run_session()
+        self.assertEqual(len(strategy.results), 50)
+        # The metrics read by the strategy are those of the bars
+        # before it, the portfolio being revalued after it
+        self.assertEqual(strategy.results[0]["periods"], 0)
+        self.assertEqual(strategy.results[-1]["periods"], 49)
+        self.assertGreater(strategy.results[-1]["sharpe"], 0.0)
+        self.assertGreater(strategy.results[-1]["max_drawdown"], 0.0)
+        self.assertEqual(session.online_metrics.get_results()["periods"], 50)
+
+    def test_compliance_without_close(self):
+        session = self.make_session(MetricsStrategy(5), ComplianceMock())
+        results = session.start_trading(testing=True)
+        self.assertEqual(results["sharpe"], 0.0)
+
+    def test_compliance_closed_on_failure(self):
+        compliance = ClosedComplianceMock()
+        session = self.make_session(FailingStrategy(5), compliance)
+        with self.assertRaises(Exception):
+            session.start_trading(testing=True)
+        self.assertTrue(compliance.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
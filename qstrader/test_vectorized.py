@@ -0,0 +1,71 @@
+"""
+Test the positions taken by the vectorized backtest
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from qstrader.price_parser import PriceParser
+from qstrader.vectorized import VectorizedBacktest, ib_commission
+
+
+class TestVectorizedBacktest(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        dates = pd.date_range("2010-01-01", periods=500, freq="D")
+        frames = []
+        for symbol in ("AAA", "BBB"):
+            frame = pd.DataFrame({
+                "date": dates,
+                "symbol": symbol,
+                "close": 100.0 * np.exp(
+                    np.cumsum(np.random.normal(0.0, 0.01, len(dates)))
+                ),
+                "buy": np.random.random(len(dates)) < 0.1,
+                "sell": np.random.random(len(dates)) < 0.1,
+            })
+            # Some missing bars
+            frames.append(frame.drop(np.random.choice(len(dates), 20)))
+        self.signals = pd.concat(frames, ignore_index=True)
+        self.signals[["buy", "sell"]] = self.signals[["buy", "sell"]].astype(int)
+
+    def test_positions_follow_signals(self):
+        """
+        The positions held match those of a loop entering on a
+        buy signal and closing on a sell signal
+        """
+        backtest = VectorizedBacktest(self.signals, quantity=10)
+        results = backtest.run()
+        trades = 0
+        for symbol, frame in self.signals.groupby("symbol"):
+            held = 0
+            expected = []
+            for buy, sell in zip(frame["buy"], frame["sell"]):
+                if buy == 1 and not held:
+                    held = 10
+                elif sell == 1 and held:
+                    held = 0
+                    trades += 1
+                expected.append(held)
+            np.testing.assert_array_equal(
+                backtest.holdings.loc[frame["date"], symbol].values, expected
+            )
+        self.assertEqual(len(results["positions"]), trades)
+        self.assertEqual(
+            len(results["equity"]), self.signals["date"].nunique()
+        )
+
+    def test_ib_commission(self):
+        handler = IBSimulatedExecutionHandler(None, None)
+        quantity = np.array([1, 100, 250, 1000, 5000])
+        price = PriceParser.parse(101.25)
+        np.testing.assert_array_equal(
+            ib_commission(quantity, price),
+            [handler.calculate_ib_commission(int(q), price) for q in quantity]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 from __future__ import print_function
-from datetime import datetime
+from datetime import datetime, timedelta
 from .compat import queue
 from .event import EventType
+from .event_queue import EventDeque
 from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
 from .price_parser import PriceParser
 from .position_sizer.fixed import FixedPositionSizer
@@ -9,6 +10,7 @@ from .risk_manager.example import ExampleRiskManager
 from .portfolio_handler import PortfolioHandler
 from .compliance.example import ExampleCompliance
 from .execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from .statistics.online import OnlineMetrics
 from .statistics.tearsheet import TearsheetStatistics
 
 
@@ -25,11 +27,25 @@ class TradingSession(object):
         compliance=None, position_sizer=None,
         execution_handler=None, risk_manager=None,
         statistics=None, sentiment_handler=None,
-        title=None, benchmark=None
+        title=None, benchmark=None, batched=False,
+        sample_every="bar", online_metrics=None
     ):
         """
         Set up the backtest variables according to
         what has been passed in.
+
+        If batched is True the backtest is run with the
+        batched dispatcher, which requires the events_queue
+        to be an EventDeque.
+
+        sample_every sets how often the statistics are updated
+        when backtesting: "bar" updates them on every price event,
+        "timestamp" once per distinct timestamp, and a number of
+        seconds (or a timedelta) once per interval of that length.
+        When sampling, the open positions are revalued only when
+        the statistics are updated or a signal is handled, once
+        every price event of the timestamp (or interval) and the
+        events cascading from them have been handled.
         """
         self.config = config
         self.strategy = strategy
@@ -49,12 +65,30 @@ class TradingSession(object):
         self.title = title
         self.benchmark = benchmark
         self.session_type = session_type
+        self.end_session_time = end_session_time
+        self.batched = batched
+        self.sample_every = sample_every
+        self.online_metrics = online_metrics
         self._config_session()
         self.cur_time = None
+        self._handlers = {
+            EventType.TICK: self._on_price,
+            EventType.BAR: self._on_price,
+            EventType.SENTIMENT: self.strategy.calculate_signals,
+            EventType.SIGNAL: self.portfolio_handler.on_signal,
+            EventType.ORDER: self.execution_handler.execute_order,
+            EventType.FILL: self.portfolio_handler.on_fill,
+        }
 
         if self.session_type == "live":
             if self.end_session_time is None:
                 raise Exception("Must specify an end_session_time when live trading")
+        self._config_sampling()
+        if self.batched:
+            if self.session_type != "backtest":
+                raise Exception("Batched dispatch is only available when backtesting")
+            if not isinstance(self.events_queue, EventDeque):
+                raise Exception("Batched dispatch requires an EventDeque events queue")
 
     def _config_session(self):
         """
@@ -65,7 +99,8 @@ class TradingSession(object):
             self.price_handler = YahooDailyCsvBarPriceHandler(
                 self.config.CSV_DATA_DIR, self.events_queue,
                 self.tickers, start_date=self.start_date,
-                end_date=self.end_date
+                end_date=self.end_date,
+                cache_dir=getattr(self.config, "CACHE_DIR", None)
             )
 
         if self.position_sizer is None:
@@ -80,11 +115,15 @@ class TradingSession(object):
                 self.events_queue,
                 self.price_handler,
                 self.position_sizer,
-                self.risk_manager
+                self.risk_manager,
+                debug=getattr(self.config, "DEBUG", False),
+                ledger=getattr(self.config, "LEDGER", False)
             )
 
         if self.compliance is None:
             self.compliance = ExampleCompliance(self.config)
+        self._compliance_on_price = getattr(self.compliance, "on_price", None)
+        self._compliance_close = getattr(self.compliance, "close", None)
 
         if self.execution_handler is None:
             self.execution_handler = IBSimulatedExecutionHandler(
@@ -99,6 +138,37 @@ class TradingSession(object):
                 self.title, self.benchmark
             )
 
+        if self.online_metrics is None and self.session_type == "live":
+            self.online_metrics = OnlineMetrics(
+                getattr(self.statistics, "periods", 252)
+            )
+
+    def _config_sampling(self):
+        """
+        Sets up the statistics sampling interval, as a number of
+        nanoseconds (0 for every timestamp), or None for every bar.
+        """
+        sample_every = self.sample_every
+        if sample_every == "bar":
+            self._sample_ns = None
+            return
+        if self.session_type != "backtest":
+            raise Exception("Statistics sampling is only available when backtesting")
+        if sample_every == "timestamp":
+            self._sample_ns = 0
+        elif isinstance(sample_every, timedelta):
+            self._sample_ns = int(sample_every.total_seconds() * 10**9)
+        elif isinstance(sample_every, (int, float)) and sample_every > 0:
+            self._sample_ns = int(sample_every * 10**9)
+        else:
+            raise Exception(
+                "sample_every must be 'bar', 'timestamp' or "
+                "a number of seconds, not %r" % (sample_every,)
+            )
+        self._sample_bucket = None
+        self._stale_tickers = set()
+        self._handlers[EventType.SIGNAL] = self._on_signal
+
     def _continue_loop_condition(self):
         if self.session_type == "backtest":
             return self.price_handler.continue_backtest
@@ -118,42 +188,140 @@ class TradingSession(object):
         else:
             print("Running Realtime Session until %s" % self.end_session_time)
 
+        if self.batched:
+            self._run_batched()
+            return
+
         while self._continue_loop_condition():
             try:
                 event = self.events_queue.get(False)
             except queue.Empty:
-                self.price_handler.stream_next()
+                self._stream_next()
             else:
                 if event is not None:
-                    if (
-                        event.type == EventType.TICK or
-                        event.type == EventType.BAR
-                    ):
-                        self.cur_time = event.time
-                        # Generate any sentiment events here
-                        if self.sentiment_handler is not None:
-                            self.sentiment_handler.stream_next(
-                                stream_date=self.cur_time
-                            )
-                        self.strategy.calculate_signals(event)
-                        self.portfolio_handler.update_portfolio_value()
-                        self.statistics.update(event.time, self.portfolio_handler)
-                    elif event.type == EventType.SENTIMENT:
-                        self.strategy.calculate_signals(event)
-                    elif event.type == EventType.SIGNAL:
-                        self.portfolio_handler.on_signal(event)
-                    elif event.type == EventType.ORDER:
-                        self.execution_handler.execute_order(event)
-                    elif event.type == EventType.FILL:
-                        self.portfolio_handler.on_fill(event)
-                    else:
-                        raise NotImplemented("Unsupported event.type '%s'" % event.type)
+                    self._dispatch(event)
+
+    def _run_batched(self):
+        """
+        Backtest-only variant of the session loop. Whenever the
+        EventDeque is empty the price handler streams the next
+        price event, then that event and every event cascading
+        from it (signals, orders, fills) are drained as one batch
+        and dispatched through the handler table.
+
+        The events are handled in exactly the same order as in
+        the queue.Queue loop, so the results are identical, but
+        there is no locking and no queue.Empty raised per bar.
+        """
+        events = self.events_queue
+        popleft = events.popleft
+        stream_next = self.price_handler.stream_next
+        if self._sample_ns is not None:
+            stream_next = self._stream_next
+        dispatch = self._dispatch
+        while self.price_handler.continue_backtest:
+            if not events:
+                stream_next()
+                continue
+            while events:
+                event = popleft()
+                if event is not None:
+                    dispatch(event)
+
+    def _stream_next(self):
+        """
+        Streams the next price event. When sampling, every event
+        already streamed has been handled at this point, so the
+        statistics are updated if the next price event (looked up
+        from the price handler) falls in a later interval.
+        """
+        if self._sample_ns is not None:
+            key = self.price_handler.next_event_time()
+            if key is not None and self._sample_ns > 0:
+                key //= self._sample_ns
+            if key != self._sample_bucket:
+                if self._sample_bucket is not None:
+                    self._sample()
+                self._sample_bucket = key
+        self.price_handler.stream_next()
+
+    def _revalue(self):
+        """
+        Revalues the positions whose prices changed since
+        they were last revalued.
+        """
+        for ticker in self._stale_tickers:
+            self.portfolio_handler.update_portfolio_value(ticker)
+        self._stale_tickers.clear()
+
+    def _sample(self):
+        """
+        Updates the statistics at the time of the last price event.
+        """
+        self._revalue()
+        self._update_statistics(self.cur_time)
+
+    def _update_statistics(self, timestamp):
+        """
+        Updates the statistics, and the online metrics if
+        any, with the current value of the portfolio.
+        """
+        self.statistics.update(timestamp, self.portfolio_handler)
+        if self.online_metrics is not None:
+            self.online_metrics.update(
+                timestamp, PriceParser.display(
+                    self.portfolio_handler.portfolio.equity
+                )
+            )
+
+    def _on_signal(self, event):
+        """
+        Handles a SignalEvent when sampling, revaluing the
+        portfolio first so that orders are sized on its
+        current value.
+        """
+        self._revalue()
+        self.portfolio_handler.on_signal(event)
+
+    def _dispatch(self, event):
+        """
+        Directs the event to the component handling its type.
+        """
+        try:
+            handler = self._handlers[event.type]
+        except KeyError:
+            raise NotImplementedError("Unsupported event.type '%s'" % event.type)
+        handler(event)
+
+    def _on_price(self, event):
+        """
+        Handles a TickEvent or BarEvent, updating the strategy,
+        the portfolio value and the statistics.
+        """
+        self.cur_time = event.time
+        if self._compliance_on_price is not None:
+            self._compliance_on_price(event)
+        # Generate any sentiment events here
+        if self.sentiment_handler is not None:
+            self.sentiment_handler.stream_next(
+                stream_date=self.cur_time
+            )
+        self.strategy.calculate_signals(event)
+        if self._sample_ns is not None:
+            self._stale_tickers.add(event.ticker)
+            return
+        self.portfolio_handler.update_portfolio_value(event.ticker)
+        self._update_statistics(event.time)
 
     def start_trading(self, testing=False):
         """
         Runs either a backtest or live session, and outputs performance when complete.
         """
-        self._run_session()
+        try:
+            self._run_session()
+        finally:
+            if self._compliance_close is not None:
+                self._compliance_close()
         results = self.statistics.get_results()
         print("---------------------------------")
         print("Backtest complete.")
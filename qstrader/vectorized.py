@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from .ledger import ACTIONS, POSITION_DTYPE, POSITION_FIELDS
+from .price_parser import PriceParser
+from .statistics.tearsheet import TearsheetStatistics
+
+
+def ib_commission(quantity, fill_price):
+    """
+    Vectorised IBSimulatedExecutionHandler.calculate_ib_commission,
+    returning the commission of each trade as an int64 price.
+    """
+    quantity = np.asarray(quantity, dtype=np.float64)
+    commission = np.minimum(
+        0.5 * np.asarray(fill_price) * quantity,
+        np.maximum(1.0, 0.005 * quantity)
+    )
+    return PriceParser.parse_array(commission)
+
+
+def _last_true(mask):
+    """
+    Returns, for each cell of a 2D boolean array, the row of
+    the last True cell at or above it in its column (0 if
+    there is none).
+    """
+    rows = np.where(mask, np.arange(len(mask))[:, None], 0)
+    return np.maximum.accumulate(rows, axis=0)
+
+
+class VectorizedBacktest(object):
+    """
+    VectorizedBacktest computes the result of a long-only, signal
+    driven backtest over the whole history at once with NumPy,
+    rather than replaying every bar through the event loop. It is
+    meant for quickly screening strategies (or parameters), whose
+    results can then be confirmed with a TradingSession.
+
+    The signals are given as a DataFrame with one row per bar,
+    holding the date, symbol and close price of the bar with its
+    "buy" and "sell" signals, as produced for every bar by
+    TecnicalAnalysisStrategy.get_historical_signals. A position is
+    entered on a buy signal (of 1) when there is none, and closed
+    on a sell signal when there is one, as the strategies of the
+    examples do.
+
+    Every trade is filled at the close of its bar, with the
+    commission of IBSimulatedExecutionHandler, and the positions
+    are valued at the last close of each symbol. quantity is the
+    sizing rule, either a fixed number of shares per position or
+    the name of a column holding the number of shares to buy at
+    each bar. Prices are kept as integers, and the positions are
+    accounted for as Position does, so that the equity curve, the
+    closed positions and hence the TearsheetStatistics results
+    match those of the event driven backtest.
+    """
+    def __init__(
+        self, signals, equity=10000.0, quantity=100,
+        benchmark=None, periods=252,
+        date_col="date", symbol_col="symbol", price_col="close"
+    ):
+        self.signals = signals
+        self.equity = PriceParser.parse(equity)
+        self.quantity = quantity
+        self.benchmark = benchmark
+        self.periods = periods
+        self.date_col = date_col
+        self.symbol_col = symbol_col
+        self.price_col = price_col
+
+    def _pivot(self, df, values):
+        return df.pivot(
+            index=self.date_col, columns=self.symbol_col, values=values
+        )
+
+    def run(self):
+        """
+        Runs the backtest, returning the results dict of
+        TearsheetStatistics.get_results.
+        """
+        df = self.signals.reset_index(drop=True)
+        df = df.drop_duplicates([self.date_col, self.symbol_col])
+        columns = {
+            "price": PriceParser.parse_array(df[self.price_col].values),
+            "buy": (df["buy"] == 1).values,
+            "sell": (df["sell"] == 1).values,
+        }
+        if isinstance(self.quantity, str):
+            columns["quantity"] = df[self.quantity].values
+        bars = pd.DataFrame(columns)
+        bars[self.date_col] = df[self.date_col].values
+        bars[self.symbol_col] = df[self.symbol_col].values
+
+        # One row per date and column per symbol, holding the close
+        # at each bar and the last close in between
+        price = self._pivot(bars, "price")
+        dates = price.index
+        symbols = price.columns
+        has_bar = price.notna().values
+        close = price.ffill().fillna(0).values.astype(np.int64)
+        buy = self._pivot(bars, "buy").fillna(False).values.astype(bool)
+        sell = self._pivot(bars, "sell").fillna(False).values.astype(bool)
+        buy &= has_bar
+        sell &= has_bar
+
+        # Whether a position is held after each bar. A buy (or sell)
+        # signal alone opens (or keeps) a position (or none), while
+        # both at once reverse it, so the state is that of the last
+        # buy or sell alone, flipped by every reversal since then.
+        cols = np.arange(len(symbols))
+        flips = np.cumsum(buy & sell, axis=0)
+        alone = buy != sell
+        base = np.where(alone, buy.astype(np.int64) - flips, 0)
+        held = (base[_last_true(alone), cols] + flips) % 2
+        held = held.astype(np.int64)
+        change = np.diff(held, axis=0, prepend=0)
+        entries = change == 1
+        exits = change == -1
+
+        # The quantity, average price (including commission) and
+        # commission of each entry, as set by Position
+        if isinstance(self.quantity, str):
+            quantity = self._pivot(bars, "quantity").fillna(0).values
+            quantity = quantity.astype(np.int64)
+        else:
+            quantity = np.full(close.shape, self.quantity, dtype=np.int64)
+        commission = ib_commission(quantity, close)
+        avg_price = np.where(
+            entries,
+            (close * quantity + commission) // np.maximum(quantity, 1), 0
+        )
+        entry = _last_true(entries)
+        entry_quantity = quantity[entry, cols]
+        entry_avg = avg_price[entry, cols]
+
+        # Equity, from the PnL of the closed and open positions,
+        # closing the whole position on exit
+        exit_commission = ib_commission(entry_quantity, close)
+        realised = np.where(
+            exits, entry_quantity * (close - entry_avg) - exit_commission, 0
+        )
+        unrealised = held * entry_quantity * (close - entry_avg)
+        equity = (
+            self.equity + np.cumsum(realised.sum(axis=1)) +
+            unrealised.sum(axis=1)
+        )
+        self.equity_curve = pd.Series(equity, index=dates)
+        self.holdings = pd.DataFrame(
+            held * entry_quantity, index=dates, columns=symbols
+        )
+
+        equity_b = None
+        if self.benchmark is not None:
+            col = symbols.get_loc(self.benchmark)
+            equity_b = pd.Series(
+                PriceParser.display_array(close[:, col]), index=dates
+            )
+        return TearsheetStatistics.create_results(
+            pd.Series(PriceParser.display_array(equity), index=dates),
+            self.periods, positions=self._positions(
+                symbols, close, commission, exit_commission, entry,
+                exits, entry_quantity, entry_avg, realised
+            ), equity_b=equity_b
+        )
+
+    def _positions(
+        self, symbols, close, commission, exit_commission, entry,
+        exits, entry_quantity, entry_avg, realised
+    ):
+        """
+        Returns the closed positions as formatted by
+        TearsheetStatistics, in the order they were closed.
+        """
+        rows, cols = np.nonzero(exits)
+        if len(rows) == 0:
+            return None
+        starts = entry[rows, cols]
+        quantity = entry_quantity[rows, cols]
+        init_price = close[starts, cols]
+        init_commission = commission[starts, cols]
+        exit_price = close[rows, cols]
+        total_commission = init_commission + exit_commission[rows, cols]
+        total_bot = quantity * init_price
+        total_sld = quantity * exit_price
+        data = np.zeros(len(rows), dtype=POSITION_DTYPE)
+        data["action"] = ACTIONS.index("BOT")
+        data["init_price"] = init_price
+        data["init_commission"] = init_commission
+        data["realised_pnl"] = realised[rows, cols]
+        data["buys"] = quantity
+        data["sells"] = quantity
+        data["avg_bot"] = init_price
+        data["avg_sld"] = exit_price
+        data["total_bot"] = total_bot
+        data["total_sld"] = total_sld
+        data["total_commission"] = total_commission
+        data["avg_price"] = entry_avg[rows, cols]
+        data["net_total"] = total_sld - total_bot
+        data["net_incl_comm"] = total_sld - total_bot - total_commission
+        df = pd.DataFrame({
+            "action": "BOT",
+            "ticker": np.asarray(symbols, dtype=object)[cols],
+        })
+        for name in POSITION_FIELDS:
+            df[name] = data[name]
+        return TearsheetStatistics.format_positions(df)
@@ -0,0 +1,104 @@
+"""
+Benchmark the vectorised indicators against the Python loops they replace
+"""
+from __future__ import print_function
+
+import time
+from math import cos, exp, pi, sqrt
+
+import click
+import numpy as np
+import pandas as pd
+
+from strategy.tecnical.indicator_helpers import ehlers_super_smoother
+from strategy.tecnical.indicators import numpy_rolling_mean, rsi, stoch
+from strategy.tecnical.sample_bars import make_bars
+
+
+def loop_rsi(series, window=14):
+    """ The original, element by element, rsi """
+    deltas = np.diff(series)
+    seed = deltas[:window + 1]
+    ups = seed[seed > 0].sum() / window
+    downs = -seed[seed < 0].sum() / window
+    rsival = np.zeros(len(series))
+    rsival[:window] = 100. - 100. / (1. + ups / downs)
+    for i in range(window, len(series)):
+        delta = deltas[i - 1]
+        if delta > 0:
+            upval = delta
+            downval = 0
+        else:
+            upval = 0
+            downval = -delta
+        ups = (ups * (window - 1) + upval) / window
+        downs = (downs * (window - 1.) + downval) / window
+        rsival[i] = 100. - 100. / (1. + ups / downs)
+    return pd.Series(index=series.index, data=rsival)
+
+
+def loop_ehlers_super_smoother(series, smoothing=6):
+    """ The original, element by element, ehlers_super_smoother """
+    magic = pi * sqrt(2) / smoothing
+    a1 = exp(-magic)
+    coeff2 = 2 * a1 * cos(magic)
+    coeff3 = -a1 * a1
+    coeff1 = (1 - coeff2 - coeff3) / 2
+    filtered = series.astype(float)
+    for i in range(2, len(series)):
+        filtered.iloc[i] = coeff1 * (series.iloc[i] + series.iloc[i-1]) + \
+            coeff2 * filtered.iloc[i-1] + coeff3 * filtered.iloc[i-2]
+    return filtered
+
+
+def shifted_stoch(df, window=14, d=3, k=3, fast=False):
+    """ The original stoch, taking the extremes over window shifted copies """
+    highs_ma = pd.concat([df['high'].shift(i)
+                          for i in np.arange(window)], axis=1).max(axis=1)
+    lows_ma = pd.concat([df['low'].shift(i)
+                         for i in np.arange(window)], axis=1).min(axis=1)
+    fast_k = ((df['close'] - lows_ma) / (highs_ma - lows_ma)) * 100
+    fast_d = numpy_rolling_mean(fast_k, d)
+    if fast:
+        return pd.DataFrame(index=df.index, data={'k': fast_k, 'd': fast_d})
+    slow_k = numpy_rolling_mean(fast_k, k)
+    slow_d = numpy_rolling_mean(slow_k, d)
+    return pd.DataFrame(index=df.index, data={'k': slow_k, 'd': slow_d})
+
+
+def timed(func, *args):
+    t0 = time.time()
+    func(*args)
+    return time.time() - t0
+
+
+def run(sizes, seed):
+    print("%10s %10s %14s %14s %10s" % (
+        "indicator", "bars", "loop (ms)", "vector (ms)", "speedup"
+    ))
+    for nb_bars in sizes:
+        bars = make_bars(nb_bars, seed)
+        for name, loop, vector, arg in (
+            ("rsi", loop_rsi, rsi, bars['close']),
+            ("ehlers", loop_ehlers_super_smoother,
+             ehlers_super_smoother, bars['close']),
+            ("stoch", shifted_stoch, stoch, bars),
+        ):
+            loop_time = timed(loop, arg)
+            vector_time = timed(vector, arg)
+            print("%10s %10d %14.2f %14.2f %9.1fx" % (
+                name, nb_bars, loop_time * 1e3, vector_time * 1e3,
+                loop_time / vector_time
+            ))
+
+
+@click.command()
+@click.option('--sizes', default='1000,10000,100000', help='Comma separated numbers of bars')
+@click.option('--seed', default=42, help='Seed')
+def main(sizes, seed):
+    sizes = [int(s) for s in sizes.split(",")]
+    return run(sizes, seed)
+
+
+if __name__ == "__main__":
+    main()
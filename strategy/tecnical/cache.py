@@ -0,0 +1,192 @@
+"""
+Cache of the indicators calculated by TecnicalAnalysisStrategy.
+
+Indicators are keyed by a fingerprint (SHA-1) of the input columns
+they are calculated from, together with the indicator name and
+parameters, so that a cached value is only reused for exactly the
+same data. Values are held in an in-process LRU memo and, if a
+cache directory is given, in one .npz file per indicator on disk,
+evicted least recently used first once the directory grows beyond
+max_bytes.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import talib
+
+_CACHES = {}
+
+
+def fingerprint(*arrays) -> str:
+    """ SHA-1 of the dtype, shape and contents of the arrays """
+    sha1 = hashlib.sha1()
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        sha1.update(("%s%s" % (values.dtype.str, values.shape)).encode())
+        sha1.update(values.data)
+    return sha1.hexdigest()
+
+
+def get_indicator_cache(cache_dir: str = None) -> 'IndicatorCache':
+    """
+    Returns the IndicatorCache of cache_dir (memory only if None),
+    shared by everything in this process using the same directory.
+    """
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = IndicatorCache(cache_dir)
+    return _CACHES[cache_dir]
+
+
+class IndicatorCache(object):
+    """
+    IndicatorCache looks up indicators calculated before from the
+    same inputs with the same parameters, or calculates and stores
+    them. An indicator is stored as a dict of its output arrays,
+    a Series as a single "" entry. It may be shared by threads.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 512 * 2**20,
+                 memo_bytes: int = 64 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memo_bytes = memo_bytes
+        self.memo = OrderedDict()
+        self.memo_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def key(self, name: str, params: dict, inputs: str) -> str:
+        """
+        The key of an indicator, given the fingerprint of its inputs.
+        """
+        description = json.dumps(
+            [self.VERSION, talib.__version__, name, params, inputs],
+            sort_keys=True
+        )
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def get(self, key: str):
+        """ Returns the outputs stored under key, or None """
+        with self.lock:
+            outputs = self.memo.get(key)
+            if outputs is not None:
+                self.memo.move_to_end(key)
+                return outputs
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                outputs = dict((name, npz[name]) for name in npz.files)
+        except (IOError, OSError, ValueError):
+            return None
+        # Mark it as recently used for the eviction
+        os.utime(path, None)
+        self._memoize(key, outputs)
+        return outputs
+
+    def put(self, key: str, outputs: dict):
+        """ Stores the outputs, a dict of arrays, under key """
+        self._memoize(key, outputs)
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        tmp_path = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **outputs)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self._evict()
+
+    def indicator(self, name: str, params: dict, inputs: str, calculate):
+        """
+        Returns the indicator from the cache, or else calculates it
+        with calculate(), returning a Series or DataFrame, and
+        caches it. inputs is the fingerprint of the input data.
+        Cached indicators are returned as an array for a Series and
+        as a dict of arrays for a DataFrame.
+        """
+        key = self.key(name, params, inputs)
+        outputs = self.get(key)
+        with self.lock:
+            if outputs is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if outputs is None:
+            result = calculate()
+            if isinstance(result, pd.DataFrame):
+                outputs = dict(
+                    (str(col), result[col].values) for col in result.columns
+                )
+            else:
+                outputs = {"": np.asarray(result)}
+            self.put(key, outputs)
+        if list(outputs) == [""]:
+            return outputs[""]
+        return outputs
+
+    def clear(self):
+        """ Empties the memo and the cache directory """
+        with self.lock:
+            self.memo.clear()
+            self.memo_size = 0
+            if self.cache_dir is not None:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(".npz"):
+                        os.remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def _memoize(self, key: str, outputs: dict):
+        size = sum(values.nbytes for values in outputs.values())
+        with self.lock:
+            if key in self.memo:
+                return
+            self.memo[key] = outputs
+            self.memo_size += size
+            while self.memo_size > self.memo_bytes and len(self.memo) > 1:
+                _, evicted = self.memo.popitem(last=False)
+                self.memo_size -= sum(
+                    values.nbytes for values in evicted.values()
+                )
+
+    def _evict(self):
+        """
+        Removes the least recently used files of the cache
+        directory until it holds at most max_bytes.
+        """
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
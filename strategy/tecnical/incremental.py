@@ -0,0 +1,359 @@
+"""
+Incremental versions of the indicators used by TecnicalAnalysisStrategy.
+
+Every indicator keeps O(1) state and is updated one bar at a time, so
+that a live or streaming strategy does not have to recompute the whole
+history on every bar. Each one follows the algorithm of the batch
+implementation it replaces (TA-Lib for ADX, BBANDS, EMA, SAR, SMA and
+TEMA, qtpylib for the Bollinger bands on the typical price), returning
+NaN during the same warm-up period.
+"""
+from collections import deque
+from math import nan, sqrt
+
+import talib.abstract as ta
+
+# populate_indicators relies on the default ta.BBANDS period,
+# which differs between TA-Lib releases
+BBANDS_PERIOD = ta.Function('BBANDS').parameters['timeperiod']
+
+
+def _is_zero(value: float) -> bool:
+    """ TA-Lib's TA_IS_ZERO """
+    return -0.00000001 < value < 0.00000001
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+def _directional_movement(high: float, low: float,
+                          prev_high: float, prev_low: float):
+    """ Returns the (+DM, -DM) of a bar for a period of 1 """
+    diff_p = high - prev_high
+    diff_m = prev_low - low
+    if diff_m > 0 and diff_p < diff_m:
+        return 0.0, diff_m
+    if diff_p > 0 and diff_p > diff_m:
+        return diff_p, 0.0
+    return 0.0, 0.0
+
+
+class SMA:
+    """ Simple moving average, from a running sum (ta.SMA) """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.value = nan
+
+    def update(self, price: float) -> float:
+        self.window.append(price)
+        self.total += price
+        if len(self.window) < self.period:
+            return self.value
+        self.value = self.total / self.period
+        self.total -= self.window.popleft()
+        return self.value
+
+
+class EMA:
+    """ Exponential moving average seeded with the SMA of the first period values (ta.EMA) """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = nan
+
+    def update(self, price: float) -> float:
+        if self.count < self.period:
+            self.count += 1
+            self.total += price
+            if self.count == self.period:
+                self.value = self.total / self.period
+            return self.value
+        self.value = (price - self.value) * self.k + self.value
+        return self.value
+
+
+class TEMA:
+    """ Triple exponential moving average, 3 * EMA1 - 3 * EMA2 + EMA3 (ta.TEMA) """
+
+    def __init__(self, period: int) -> None:
+        self.ema1 = EMA(period)
+        self.ema2 = EMA(period)
+        self.ema3 = EMA(period)
+        self.value = nan
+
+    def update(self, price: float) -> float:
+        ema1 = self.ema1.update(price)
+        if ema1 != ema1:
+            return self.value
+        ema2 = self.ema2.update(ema1)
+        if ema2 != ema2:
+            return self.value
+        ema3 = self.ema3.update(ema2)
+        if ema3 != ema3:
+            return self.value
+        self.value = 3.0 * ema1 - 3.0 * ema2 + ema3
+        return self.value
+
+
+class BBands:
+    """
+    Bollinger bands around an SMA, with the standard deviation taken
+    from running sums of the values and their squares (ta.BBANDS)
+    """
+
+    def __init__(self, period: int = 5, nbdev: float = 2.0) -> None:
+        self.sma = SMA(period)
+        self.nbdev = nbdev
+        self.squares = deque()
+        self.total2 = 0.0
+        self.lower = self.middle = self.upper = nan
+
+    def update(self, price: float) -> float:
+        middle = self.sma.update(price)
+        square = price * price
+        self.squares.append(square)
+        self.total2 += square
+        if middle != middle:
+            return self.lower
+        mean2 = self.total2 / self.sma.period
+        self.total2 -= self.squares.popleft()
+        mean2 -= middle * middle
+        stddev = sqrt(mean2) if mean2 >= 0.00000001 else 0.0
+        self.middle = middle
+        self.upper = middle + stddev * self.nbdev
+        self.lower = middle - stddev * self.nbdev
+        return self.lower
+
+
+class BollingerBands:
+    """
+    Bollinger bands with a rolling mean and population standard
+    deviation over window values (qtpylib.bollinger_bands), updated
+    with Welford's method as the window slides
+    """
+
+    def __init__(self, window: int = 20, stds: float = 2.0) -> None:
+        self.window = window
+        self.stds = stds
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.lower = self.mid = self.upper = nan
+
+    def update(self, price: float) -> float:
+        values = self.values
+        values.append(price)
+        if len(values) <= self.window:
+            delta = price - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (price - self.mean)
+        else:
+            old = values.popleft()
+            old_mean = self.mean
+            self.mean += (price - old) / self.window
+            self.m2 += (price - old) * (price - self.mean + old - old_mean)
+        if len(values) < self.window:
+            return self.mid
+        std = sqrt(max(self.m2, 0.0) / self.window)
+        self.mid = self.mean
+        self.upper = self.mean + std * self.stds
+        self.lower = self.mean - std * self.stds
+        return self.mid
+
+
+class ADX:
+    """ Average directional movement index with Wilder smoothing (ta.ADX) """
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self.count = 0
+        self.prev_high = self.prev_low = self.prev_close = nan
+        self.plus_dm = self.minus_dm = self.tr = 0.0
+        self.sum_dx = 0.0
+        self.value = nan
+
+    def _dx(self) -> float:
+        """ Returns the DX of the smoothed DM and TR, or None if undefined """
+        if _is_zero(self.tr):
+            return None
+        minus_di = 100.0 * (self.minus_dm / self.tr)
+        plus_di = 100.0 * (self.plus_dm / self.tr)
+        total = minus_di + plus_di
+        if _is_zero(total):
+            return None
+        return 100.0 * (abs(minus_di - plus_di) / total)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        count = self.count
+        self.count += 1
+        if count == 0:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return self.value
+        period = self.period
+        plus_dm, minus_dm = _directional_movement(
+            high, low, self.prev_high, self.prev_low)
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        if count < period:
+            # Initial sums of the first period - 1 bars
+            self.plus_dm += plus_dm
+            self.minus_dm += minus_dm
+            self.tr += tr
+            return self.value
+        self.minus_dm -= self.minus_dm / period
+        self.plus_dm -= self.plus_dm / period
+        self.minus_dm += minus_dm
+        self.plus_dm += plus_dm
+        self.tr = self.tr - (self.tr / period) + tr
+        dx = self._dx()
+        if count < 2 * period:
+            if dx is not None:
+                self.sum_dx += dx
+            if count == 2 * period - 1:
+                self.value = self.sum_dx / period
+            return self.value
+        if dx is not None:
+            self.value = ((self.value * (period - 1)) + dx) / period
+        return self.value
+
+
+class SAR:
+    """ Parabolic SAR state machine (ta.SAR) """
+
+    def __init__(self, acceleration: float = 0.02, maximum: float = 0.2) -> None:
+        self.acceleration = min(acceleration, maximum)
+        self.maximum = maximum
+        self.af = self.acceleration
+        self.count = 0
+        self.is_long = True
+        self.ep = self.sar = nan
+        self.prev_high = self.prev_low = nan
+        self.value = nan
+
+    def update(self, high: float, low: float) -> float:
+        count = self.count
+        self.count += 1
+        if count == 0:
+            self.prev_high, self.prev_low = high, low
+            return self.value
+        if count == 1:
+            # The initial direction comes from the -DM of the first two bars
+            _, minus_dm = _directional_movement(
+                high, low, self.prev_high, self.prev_low)
+            self.is_long = not minus_dm > 0
+            if self.is_long:
+                self.ep, self.sar = high, self.prev_low
+            else:
+                self.ep, self.sar = low, self.prev_high
+            prev_high, prev_low = high, low
+        else:
+            prev_high, prev_low = self.prev_high, self.prev_low
+        self.prev_high, self.prev_low = high, low
+        af = self.af
+        sar = self.sar
+        ep = self.ep
+        if self.is_long:
+            if low <= sar:
+                # Switch to short
+                self.is_long = False
+                sar = max(ep, prev_high, high)
+                self.value = sar
+                af = self.acceleration
+                ep = low
+                sar = sar + af * (ep - sar)
+                sar = max(sar, prev_high, high)
+            else:
+                self.value = sar
+                if high > ep:
+                    ep = high
+                    af = min(af + self.acceleration, self.maximum)
+                sar = sar + af * (ep - sar)
+                sar = min(sar, prev_low, low)
+        else:
+            if high >= sar:
+                # Switch to long
+                self.is_long = True
+                sar = min(ep, prev_low, low)
+                self.value = sar
+                af = self.acceleration
+                ep = high
+                sar = sar + af * (ep - sar)
+                sar = min(sar, prev_low, low)
+            else:
+                self.value = sar
+                if low < ep:
+                    ep = low
+                    af = min(af + self.acceleration, self.maximum)
+                sar = sar + af * (ep - sar)
+                sar = max(sar, prev_high, high)
+        self.af, self.sar, self.ep = af, sar, ep
+        return self.value
+
+
+class IncrementalTecnicalAnalysis:
+    """
+    Incremental equivalent of TecnicalAnalysisStrategy.analyze_ticker for
+    a single instrument. Each call to update takes one bar and returns the
+    indicators and buy/sell signals populate_indicators, populate_buy_trend
+    and populate_sell_trend would give for that bar, with unset signals
+    as 0 rather than NaN.
+    """
+
+    def __init__(self) -> None:
+        self.adx = ADX(14)
+        self.bbands = BBands(BBANDS_PERIOD, 2.0)
+        self.bollinger = BollingerBands(20, 2.0)
+        self.ema5 = EMA(5)
+        self.ema10 = EMA(10)
+        self.ema50 = EMA(50)
+        self.sar = SAR(0.02, 0.2)
+        self.sma = SMA(5)
+        self.tema = TEMA(9)
+        # (close, bb_middleband, bb_lowerband, sma) of the last two bars
+        self.history = deque(maxlen=2)
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        bollinger = self.bollinger
+        bollinger.update((high + low + close) / 3.)
+        row = {
+            'adx': self.adx.update(high, low, close),
+            'blower': self.bbands.update(close),
+            'bb_lowerband': bollinger.lower,
+            'bb_middleband': bollinger.mid,
+            'bb_upperband': bollinger.upper,
+            'ema5': self.ema5.update(close),
+            'ema10': self.ema10.update(close),
+            'ema50': self.ema50.update(close),
+            'sar': self.sar.update(high, low),
+            'sma': self.sma.update(close),
+            'tema': self.tema.update(close),
+            'trailing_stop': close * 0.90,
+        }
+        current = (close, row['bb_middleband'], row['bb_lowerband'], row['sma'])
+        row['buy'], row['sell'] = self._signals(current)
+        self.history.append(current)
+        return row
+
+    def _signals(self, current: tuple):
+        """ Buy/sell crossings against the bar two bars back, as populate_buy/sell_trend """
+        if len(self.history) < 2:
+            return 0, 0
+        close, mid, lower, sma = current
+        prev_close, prev_mid, prev_lower, prev_sma = self.history[0]
+        buy = (
+            (close > mid and prev_close <= prev_mid) or
+            (close > lower and prev_close < prev_lower) or
+            (sma > mid and prev_sma <= prev_mid)
+        )
+        sell = (
+            (close < mid and prev_close > prev_mid) or
+            (close < lower and prev_close > prev_lower)
+        )
+        return int(buy), int(sell)
@@ -3,6 +3,7 @@ from math import cos, exp, pi, sqrt
 import numpy as np
 import talib as ta
 from pandas import Series
+from scipy.signal import lfilter, lfiltic
 
 
 def went_up(series: Series) -> bool:
@@ -20,11 +21,18 @@ def ehlers_super_smoother(series: Series, smoothing: float = 6) -> Series:
     coeff3 = -a1 * a1
     coeff1 = (1 - coeff2 - coeff3) / 2
 
-    filtered = series.copy()
-
-    for i in range(2, len(series)):
-        filtered.iloc[i] = coeff1 * (series.iloc[i] + series.iloc[i-1]) + \
-            coeff2 * filtered.iloc[i-1] + coeff3 * filtered.iloc[i-2]
+    filtered = series.astype(float)
+    if len(series) < 3:
+        return filtered
+
+    # filtered[i] = coeff1 * (series[i] + series[i-1]) +
+    #     coeff2 * filtered[i-1] + coeff3 * filtered[i-2]
+    # with the first two values passed through
+    values = filtered.values.copy()
+    b, a = [coeff1, coeff1], [1, -coeff2, -coeff3]
+    zi = lfiltic(b, a, y=[values[1], values[0]], x=[values[1], values[0]])
+    values[2:] = lfilter(b, a, values[2:], zi=zi)[0]
+    filtered[:] = values
 
     return filtered
 
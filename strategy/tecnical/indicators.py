@@ -26,6 +26,7 @@ from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 from pandas.core.base import PandasObject
+from scipy.signal import lfilter
 
 # =============================================
 # check min, python version
@@ -371,28 +372,27 @@ def rsi(series, window=14):
     compute the n period relative strength indicator
     """
     # 100-(100/relative_strength)
-    deltas = np.diff(series)
+    values = np.asarray(series, dtype=float)
+    deltas = np.diff(values)
     seed = deltas[:window + 1]
 
     # default values
     ups = seed[seed > 0].sum() / window
     downs = -seed[seed < 0].sum() / window
-    rsival = np.zeros_like(series)
+    rsival = np.zeros(len(values))
     rsival[:window] = 100. - 100. / (1. + ups / downs)
 
-    # period values
-    for i in range(window, len(series)):
-        delta = deltas[i - 1]
-        if delta > 0:
-            upval = delta
-            downval = 0
-        else:
-            upval = 0
-            downval = -delta
-
-        ups = (ups * (window - 1) + upval) / window
-        downs = (downs * (window - 1.) + downval) / window
-        rsival[i] = 100. - 100. / (1. + ups / downs)
+    # period values, smoothed with the recursive filter
+    # y[i] = ((window - 1) * y[i-1] + x[i]) / window
+    if len(values) > window:
+        period_deltas = deltas[window - 1:]
+        upvals = np.where(period_deltas > 0, period_deltas, 0.)
+        downvals = np.where(period_deltas > 0, 0., -period_deltas)
+        decay = (window - 1.) / window
+        b, a = [1. / window], [1., -decay]
+        ups = lfilter(b, a, upvals, zi=[decay * ups])[0]
+        downs = lfilter(b, a, downvals, zi=[decay * downs])[0]
+        rsival[window:] = 100. - 100. / (1. + ups / downs)
 
     # return rsival
     return pd.Series(index=series.index, data=rsival)
@@ -530,13 +530,8 @@ def stoch(df, window=14, d=3, k=3, fast=False):
     compute the n period relative strength indicator
     http://excelta.blogspot.co.il/2013/09/stochastic-oscillator-technical.html
     """
-    highs_ma = pd.concat([df['high'].shift(i)
-                          for i in np.arange(window)], 1).apply(list, 1)
-    highs_ma = highs_ma.T.max().T
-
-    lows_ma = pd.concat([df['low'].shift(i)
-                         for i in np.arange(window)], 1).apply(list, 1)
-    lows_ma = lows_ma.T.min().T
+    highs_ma = df['high'].rolling(window=window, min_periods=1).max()
+    lows_ma = df['low'].rolling(window=window, min_periods=1).min()
 
     fast_k = ((df['close'] - lows_ma) / (highs_ma - lows_ma)) * 100
     fast_d = numpy_rolling_mean(fast_k, d)
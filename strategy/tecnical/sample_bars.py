@@ -0,0 +1,22 @@
+"""
+Random walk bars for the tests and benchmarks of the indicators
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_bars(nb_bars, seed=42):
+    """
+    Returns nb_bars open, high, low, close and volume bars
+    of a log-normal random walk starting around 100.
+    """
+    np.random.seed(seed)
+    close = 100.0 * np.exp(np.cumsum(np.random.normal(0.0, 0.01, nb_bars)))
+    spread = np.abs(np.random.normal(0.0, 0.5, nb_bars))
+    return pd.DataFrame({
+        'open': close + np.random.normal(0.0, 0.2, nb_bars),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': np.random.randint(100, 10000, nb_bars).astype(float),
+    })
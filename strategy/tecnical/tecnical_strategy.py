@@ -6,6 +6,7 @@ from pandas import DataFrame
 
 import strategy.tecnical.indicators as qtpylib
 from .indicator_helpers import fishers_inverse
+from .cache import IndicatorCache, fingerprint
 
 
 class SignalType(Enum):
@@ -25,16 +26,42 @@ class TecnicalAnalysisStrategy:
     # Optimal ticker interval for the strategy
     ticker_interval = '5m'
 
+    def __init__(self, cache: IndicatorCache = None):
+        """
+        If a cache is given the indicators are looked up in it,
+        keyed by the OHLCV data they are calculated from, rather
+        than calculated on every call.
+        """
+        self.cache = cache
+
+    def _indicator(self, inputs: str, name: str, params: dict, calculate):
+        """
+        Returns calculate(), or the indicator name calculated before
+        with the same params from the data whose fingerprint is inputs.
+        """
+        if self.cache is None:
+            return calculate()
+        return self.cache.indicator(name, params, inputs, calculate)
+
     def populate_indicators(self, dataframe: DataFrame) -> DataFrame:
         """
         Adds several different TA indicators to the given DataFrame
         """
+        inputs = None
+        if self.cache is not None:
+            inputs = fingerprint(*(
+                dataframe[col].values
+                for col in ('open', 'high', 'low', 'close', 'volume')
+            ))
+        indicator = lambda name, params, calculate: self._indicator(
+            inputs, name, params, calculate
+        )
 
         # Momentum Indicator
         # ------------------------------------
 
         # ADX - trend and the strong of the trend, no direction
-        dataframe['adx'] = ta.ADX(dataframe)
+        dataframe['adx'] = indicator('ADX', {}, lambda: ta.ADX(dataframe))
 
         # Awesome oscillator - distance between emas, it indicates if the price is going down or up
         # dataframe['ao'] = qtpylib.awesome_oscillator(dataframe)
@@ -96,29 +123,35 @@ class TecnicalAnalysisStrategy:
         # Because ta.BBANDS implementation is broken with small numbers, it actually
         # returns middle band for all the three bands. Switch to qtpylib.bollinger_bands
         # and use middle band instead.
-        dataframe['blower'] = ta.BBANDS(dataframe, nbdevup=2, nbdevdn=2)['lowerband']
+        dataframe['blower'] = indicator(
+            'BBANDS', {'nbdevup': 2, 'nbdevdn': 2},
+            lambda: ta.BBANDS(dataframe, nbdevup=2, nbdevdn=2)
+        )['lowerband']
 
         # Bollinger bands
-        bollinger = qtpylib.bollinger_bands(qtpylib.typical_price(dataframe), window=20, stds=2)
+        bollinger = indicator(
+            'bollinger_bands', {'window': 20, 'stds': 2},
+            lambda: qtpylib.bollinger_bands(qtpylib.typical_price(dataframe), window=20, stds=2)
+        )
         dataframe['bb_lowerband'] = bollinger['lower']
         dataframe['bb_middleband'] = bollinger['mid']
         dataframe['bb_upperband'] = bollinger['upper']
 
         # # EMA - Exponential Moving Average
         # dataframe['ema3'] = ta.EMA(dataframe, timeperiod=3)
-        dataframe['ema5'] = ta.EMA(dataframe, timeperiod=5)
-        dataframe['ema10'] = ta.EMA(dataframe, timeperiod=10)
-        dataframe['ema50'] = ta.EMA(dataframe, timeperiod=50)
+        dataframe['ema5'] = indicator('EMA', {'timeperiod': 5}, lambda: ta.EMA(dataframe, timeperiod=5))
+        dataframe['ema10'] = indicator('EMA', {'timeperiod': 10}, lambda: ta.EMA(dataframe, timeperiod=10))
+        dataframe['ema50'] = indicator('EMA', {'timeperiod': 50}, lambda: ta.EMA(dataframe, timeperiod=50))
         # dataframe['ema100'] = ta.EMA(dataframe, timeperiod=100)
         #
         # # SAR Parabol
-        dataframe['sar'] = ta.SAR(dataframe)
+        dataframe['sar'] = indicator('SAR', {}, lambda: ta.SAR(dataframe))
         #
         # # SMA - Simple Moving Average
-        dataframe['sma'] = ta.SMA(dataframe, timeperiod=5)
+        dataframe['sma'] = indicator('SMA', {'timeperiod': 5}, lambda: ta.SMA(dataframe, timeperiod=5))
         #
         # # TEMA - Triple Exponential Moving Average
-        dataframe['tema'] = ta.TEMA(dataframe, timeperiod=9)
+        dataframe['tema'] = indicator('TEMA', {'timeperiod': 9}, lambda: ta.TEMA(dataframe, timeperiod=9))
         #
         # # Cycle Indicator
         # # ------------------------------------
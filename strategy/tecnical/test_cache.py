@@ -0,0 +1,76 @@
+"""
+Test the indicator cache gives the same signals as calculating them
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from strategy.tecnical.cache import IndicatorCache, fingerprint
+from strategy.tecnical.sample_bars import make_bars
+from strategy.tecnical.tecnical_strategy import TecnicalAnalysisStrategy
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.bars = make_bars(1000)
+        self.expected = TecnicalAnalysisStrategy().analyze_ticker(
+            self.bars.copy()
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_same_signals(self):
+        cache = IndicatorCache(self.cache_dir)
+        strategy = TecnicalAnalysisStrategy(cache)
+        cold = strategy.analyze_ticker(self.bars.copy())
+        self.assertEqual(cache.hits, 0)
+        warm = strategy.analyze_ticker(self.bars.copy())
+        self.assertEqual(cache.hits, cache.misses)
+        # A new process only has the files on disk
+        disk = IndicatorCache(self.cache_dir)
+        from_disk = TecnicalAnalysisStrategy(disk).analyze_ticker(
+            self.bars.copy()
+        )
+        self.assertEqual(disk.misses, 0)
+        for results in (cold, warm, from_disk):
+            pd.testing.assert_frame_equal(results, self.expected)
+
+    def test_changed_data(self):
+        cache = IndicatorCache()
+        strategy = TecnicalAnalysisStrategy(cache)
+        strategy.analyze_ticker(self.bars.copy())
+        bars = self.bars.copy()
+        bars.loc[500, 'close'] += 1.0
+        results = strategy.analyze_ticker(bars)
+        self.assertEqual(cache.hits, 0)
+        expected = TecnicalAnalysisStrategy().analyze_ticker(bars.copy())
+        pd.testing.assert_frame_equal(results, expected)
+
+    def test_eviction(self):
+        values = np.arange(1000, dtype=np.float64)
+        cache = IndicatorCache(
+            self.cache_dir, max_bytes=20000, memo_bytes=20000
+        )
+        keys = [cache.key("SMA", {"timeperiod": i}, fingerprint(values))
+                for i in range(4)]
+        for i, key in enumerate(keys):
+            cache.put(key, {"": values + i})
+            # Make each file older than the next one
+            os.utime(cache._path(key), (i, i))
+        self.assertEqual(list(cache.memo), keys[-2:])
+        self.assertEqual(
+            [os.path.exists(cache._path(key)) for key in keys],
+            [False, False, True, True]
+        )
+        np.testing.assert_array_equal(cache.get(keys[2])[""], values + 2)
+        self.assertIsNone(cache.get(keys[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Test the incremental indicators against the batch strategy
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from strategy.tecnical.incremental import IncrementalTecnicalAnalysis
+from strategy.tecnical.sample_bars import make_bars
+from strategy.tecnical.tecnical_strategy import TecnicalAnalysisStrategy
+
+
+class TestIncrementalTecnicalAnalysis(unittest.TestCase):
+    """
+    Test the incremental engine gives the same indicators and
+    signals as TecnicalAnalysisStrategy.analyze_ticker
+    """
+    def setUp(self):
+        self.bars = make_bars(1000)
+        self.expected = TecnicalAnalysisStrategy().analyze_ticker(
+            self.bars.copy()
+        )
+        engine = IncrementalTecnicalAnalysis()
+        self.results = pd.DataFrame([
+            engine.update(high, low, close) for (high, low, close) in zip(
+                self.bars['high'], self.bars['low'], self.bars['close']
+            )
+        ])
+
+    def test_indicators(self):
+        for col in [
+            'adx', 'blower', 'bb_lowerband', 'bb_middleband',
+            'bb_upperband', 'ema5', 'ema10', 'ema50', 'sar', 'sma',
+            'tema', 'trailing_stop'
+        ]:
+            expected = self.expected[col].values
+            value = self.results[col].values
+            np.testing.assert_array_equal(
+                np.isnan(expected), np.isnan(value), err_msg=col
+            )
+            np.testing.assert_allclose(
+                value, expected, rtol=1e-9, atol=1e-9, err_msg=col
+            )
+
+    def test_signals(self):
+        for col in ['buy', 'sell']:
+            np.testing.assert_array_equal(
+                self.results[col].values,
+                self.expected[col].fillna(0).values,
+                err_msg=col
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Test the vectorised indicators against the Python loops they replace
+"""
+import unittest
+from math import cos, exp, pi, sqrt
+
+import numpy as np
+import pandas as pd
+
+from strategy.tecnical.indicator_helpers import ehlers_super_smoother
+from strategy.tecnical.indicators import numpy_rolling_mean, rsi, stoch
+from strategy.tecnical.sample_bars import make_bars
+
+
+# The original implementations, as they were before being vectorised
+
+
+def loop_rsi(series, window=14):
+    """
+    compute the n period relative strength indicator
+    """
+    # 100-(100/relative_strength)
+    deltas = np.diff(series)
+    seed = deltas[:window + 1]
+
+    # default values
+    ups = seed[seed > 0].sum() / window
+    downs = -seed[seed < 0].sum() / window
+    rsival = np.zeros_like(series)
+    rsival[:window] = 100. - 100. / (1. + ups / downs)
+
+    # period values
+    for i in range(window, len(series)):
+        delta = deltas[i - 1]
+        if delta > 0:
+            upval = delta
+            downval = 0
+        else:
+            upval = 0
+            downval = -delta
+
+        ups = (ups * (window - 1) + upval) / window
+        downs = (downs * (window - 1.) + downval) / window
+        rsival[i] = 100. - 100. / (1. + ups / downs)
+
+    # return rsival
+    return pd.Series(index=series.index, data=rsival)
+
+
+def loop_ehlers_super_smoother(series, smoothing=6):
+    magic = pi * sqrt(2) / smoothing
+    a1 = exp(-magic)
+    coeff2 = 2 * a1 * cos(magic)
+    coeff3 = -a1 * a1
+    coeff1 = (1 - coeff2 - coeff3) / 2
+
+    filtered = series.copy()
+
+    for i in range(2, len(series)):
+        filtered.iloc[i] = coeff1 * (series.iloc[i] + series.iloc[i-1]) + \
+            coeff2 * filtered.iloc[i-1] + coeff3 * filtered.iloc[i-2]
+
+    return filtered
+
+
+def loop_stoch(df, window=14, d=3, k=3, fast=False):
+    """
+    compute the n period relative strength indicator
+    http://excelta.blogspot.co.il/2013/09/stochastic-oscillator-technical.html
+    """
+    # Only the axis is passed by keyword, and the lists expanded
+    # into columns, as apply(list, 1) did on the pandas of the time
+    highs_ma = pd.concat([df['high'].shift(i)
+                          for i in np.arange(window)], axis=1).apply(
+                              list, axis=1, result_type='expand')
+    highs_ma = highs_ma.T.max().T
+
+    lows_ma = pd.concat([df['low'].shift(i)
+                         for i in np.arange(window)], axis=1).apply(
+                             list, axis=1, result_type='expand')
+    lows_ma = lows_ma.T.min().T
+
+    fast_k = ((df['close'] - lows_ma) / (highs_ma - lows_ma)) * 100
+    fast_d = numpy_rolling_mean(fast_k, d)
+
+    if fast:
+        data = {
+            'k': fast_k,
+            'd': fast_d
+        }
+
+    else:
+        slow_k = numpy_rolling_mean(fast_k, k)
+        slow_d = numpy_rolling_mean(slow_k, d)
+        data = {
+            'k': slow_k,
+            'd': slow_d
+        }
+
+    return pd.DataFrame(index=df.index, data=data)
+
+
+class TestVectorisedIndicators(unittest.TestCase):
+    """
+    Test rsi, ehlers_super_smoother and stoch give the same
+    values as the original element by element implementations
+    """
+    def setUp(self):
+        self.bars = make_bars(2000)
+        # Flat runs, so that some windows have no gains or no losses
+        self.bars.loc[100:130, ['high', 'low', 'close']] = 100.0
+
+    def assert_same(self, value, expected, msg=None):
+        np.testing.assert_array_equal(
+            np.isnan(value), np.isnan(expected), err_msg=msg
+        )
+        np.testing.assert_allclose(
+            value, expected, rtol=1e-9, atol=1e-9, err_msg=msg
+        )
+
+    def test_rsi(self):
+        close = self.bars['close']
+        for window in [2, 5, 14, 30]:
+            value = rsi(close, window)
+            self.assertTrue(value.index.equals(close.index))
+            self.assert_same(
+                value.values, loop_rsi(close, window).values, str(window)
+            )
+
+    def test_rsi_short_series(self):
+        close = self.bars['close']
+        for length in [1, 10, 14, 15]:
+            self.assert_same(
+                rsi(close[:length], 14).values,
+                loop_rsi(close[:length], 14).values, str(length)
+            )
+
+    def test_rsi_accessor(self):
+        close = self.bars['close']
+        self.assert_same(close.rsi(14).values, rsi(close, 14).values)
+
+    def test_ehlers_super_smoother(self):
+        close = self.bars['close']
+        for smoothing in [3, 6, 10]:
+            value = ehlers_super_smoother(close, smoothing)
+            self.assertTrue(value.index.equals(close.index))
+            self.assert_same(
+                value.values,
+                loop_ehlers_super_smoother(close, smoothing).values,
+                str(smoothing)
+            )
+        for length in [0, 1, 2, 3]:
+            self.assert_same(
+                ehlers_super_smoother(close[:length]).values,
+                loop_ehlers_super_smoother(close[:length]).values,
+                str(length)
+            )
+
+    def test_stoch(self):
+        for fast in [True, False]:
+            for window in [3, 14]:
+                value = stoch(self.bars, window, fast=fast)
+                expected = loop_stoch(self.bars, window, fast=fast)
+                for col in ['k', 'd']:
+                    self.assert_same(
+                        value[col].values, expected[col].values,
+                        "%s %s %s" % (fast, window, col)
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()